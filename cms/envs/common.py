@@ -556,6 +556,11 @@ MODULESTORE = {
     }
 }
 
+# Maximum size, in bytes of pickled data, of the split modulestore course structures
+# that each worker keeps deserialized in memory in front of the
+# 'course_structure_cache'. Set to 0 to disable the in-process tier.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES = 128 * 1024 * 1024
+
 # Modulestore-level field override providers. These field override providers don't
 # require student context.
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ()
@@ -1172,8 +1177,15 @@ EVENT_TRACKING_BACKENDS = {
                 }
             },
             'processors': [
-                {'ENGINE': 'track.shim.LegacyFieldMappingProcessor'},
-                {'ENGINE': 'track.shim.PrefixedEventProcessor'}
+                {
+                    'ENGINE': 'track.shim.ProcessorChain',
+                    'OPTIONS': {
+                        'processors': [
+                            {'ENGINE': 'track.shim.LegacyFieldMappingProcessor'},
+                            {'ENGINE': 'track.shim.PrefixedEventProcessor'}
+                        ]
+                    }
+                }
             ]
         }
     },
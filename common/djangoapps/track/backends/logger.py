@@ -34,6 +34,23 @@ class LoggerBackend(BaseBackend):
         self.event_logger = logging.getLogger(name)
 
     def send(self, event):
+        self.event_logger.info(self._serialize(event))
+
+    def send_many(self, events):
+        """
+        Log a batch of events, one record per event.  Events that cannot
+        be serialized are skipped rather than losing the rest of the batch.
+        """
+        for event in events:
+            try:
+                event_str = self._serialize(event)
+            except UnicodeDecodeError:
+                # Already logged by _serialize.
+                continue
+            self.event_logger.info(event_str)
+
+    def _serialize(self, event):
+        """Returns the event as a JSON string, truncated to TRACK_MAX_EVENT."""
         try:
             event_str = json.dumps(event, cls=DateTimeJSONEncoder)
         except UnicodeDecodeError:
@@ -45,6 +62,4 @@ class LoggerBackend(BaseBackend):
         # TODO: remove trucation of the serialized event, either at a
         # higher level during the emittion of the event, or by
         # providing warnings when the events exceed certain size.
-        event_str = event_str[:settings.TRACK_MAX_EVENT]
-
-        self.event_logger.info(event_str)
+        return event_str[:settings.TRACK_MAX_EVENT]
@@ -87,11 +87,21 @@ class MongoBackend(BaseBackend):
 
     def send(self, event):
         """Insert the event in to the Mongo collection"""
+        self._insert(event)
+
+    def send_many(self, events):
+        """Insert the events in to the Mongo collection in a single batch"""
+        if events:
+            # Keep inserting the rest of the batch if one event fails.
+            self._insert(events, continue_on_error=True)
+
+    def _insert(self, doc_or_docs, **kwargs):
+        """Insert one or more events, logging any error"""
         try:
-            self.collection.insert(event, manipulate=False)
+            self.collection.insert(doc_or_docs, manipulate=False, **kwargs)
         except (PyMongoError, BSONError):
-            # The event will be lost in case of a connection error or any error
-            # that occurs when trying to insert the event into Mongo.
+            # The events will be lost in case of a connection error or any error
+            # that occurs when trying to insert the events into Mongo.
             # pymongo will re-connect/re-authenticate automatically
             # during the next event.
             msg = 'Error inserting to MongoDB event tracker backend'
@@ -0,0 +1,184 @@
+"""
+Event tracker backend that queues events in process and sends them to
+another backend in batches, from a background thread.
+
+Wrapping a backend with it takes its writes out of the request thread::
+
+  TRACKING_BACKENDS = {
+      'mongo': {
+          'ENGINE': 'track.backends.queued.QueuedBackend',
+          'OPTIONS': {
+              'backend': {
+                  'ENGINE': 'track.backends.mongodb.MongoBackend',
+                  'OPTIONS': {...}
+              },
+              'batch_size': 100,
+              'flush_interval': 1.0,
+              'max_queue_size': 10000,
+          }
+      }
+  }
+
+When the queue is full, new events are dropped and counted rather than
+blocking the request.  Queued events are flushed when the process exits.
+
+"""
+
+from __future__ import absolute_import
+
+import atexit
+import logging
+import os
+import threading
+import time
+from Queue import Empty, Full, Queue
+
+from dogapi import dog_stats_api
+
+from track.backends import BaseBackend
+
+log = logging.getLogger(__name__)
+
+# Put on the queue to stop the worker thread once the events before it are sent.
+_STOP = object()
+
+
+class QueuedBackend(BaseBackend):
+    """Event tracker backend that sends events to another backend in batches"""
+
+    def __init__(self, backend, batch_size=100, flush_interval=1.0, max_queue_size=10000,
+                 shutdown_timeout=5.0, **kwargs):
+        """
+        Configure the queue and the backend events are sent to.
+
+        :Parameters:
+
+          - `backend`: dictionary with the `ENGINE` and `OPTIONS` of the
+            backend the events are sent to.
+          - `batch_size`: maximum number of events sent at once.
+          - `flush_interval`: maximum number of seconds an event waits for
+            its batch to fill up before it is sent.
+          - `max_queue_size`: maximum number of queued events; further
+            events are dropped until the queue drains.
+          - `shutdown_timeout`: number of seconds to wait for queued
+            events to be sent when the process exits.
+
+        """
+        super(QueuedBackend, self).__init__(**kwargs)
+
+        # Imported here since the tracker instantiates this backend on import.
+        from track.tracker import _instantiate_backend_from_name
+        self.backend_name = backend['ENGINE']
+        self.backend = _instantiate_backend_from_name(self.backend_name, backend.get('OPTIONS', {}))
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.shutdown_timeout = shutdown_timeout
+        self.dropped_count = 0
+
+        self._lock = threading.Lock()
+        self._queue = None
+        self._worker = None
+        self._worker_pid = None
+
+        atexit.register(self.close)
+
+    def send(self, event):
+        """Queue the event, dropping it if the queue is full"""
+        queue = self._get_queue()
+        try:
+            queue.put_nowait(event)
+        except Full:
+            self._record_dropped(1)
+
+    def close(self):
+        """
+        Stop the worker thread once the queued events are sent, waiting at
+        most shutdown_timeout seconds.
+        """
+        with self._lock:
+            queue, worker = self._queue, self._worker
+            self._queue = self._worker = self._worker_pid = None
+        if worker is None or not worker.is_alive():
+            return
+
+        try:
+            queue.put(_STOP, timeout=self.shutdown_timeout)
+        except Full:
+            log.warning('Tracking event queue for %s is still full at shutdown', self.backend_name)
+            return
+        worker.join(self.shutdown_timeout)
+
+    def _get_queue(self):
+        """
+        Returns the event queue, starting its worker thread if needed.
+
+        Threads do not survive a fork, so a process forked from one that
+        already started a worker starts its own, with an empty queue.
+        """
+        if self._worker_pid != os.getpid():
+            with self._lock:
+                if self._worker_pid != os.getpid():
+                    self._queue = Queue(maxsize=self.max_queue_size)
+                    self._worker = threading.Thread(
+                        target=self._run, args=(self._queue,), name='tracking-{}'.format(self.backend_name)
+                    )
+                    self._worker.daemon = True
+                    self._worker.start()
+                    self._worker_pid = os.getpid()
+        return self._queue
+
+    def _run(self, queue):
+        """Send the queued events in batches until stopped."""
+        stopped = False
+        while not stopped:
+            batch, stopped = self._next_batch(queue)
+            if batch:
+                self._send_batch(batch)
+
+    def _next_batch(self, queue):
+        """
+        Returns the next batch of events, once batch_size events are queued
+        or flush_interval seconds after its first event, and whether the
+        worker was stopped.
+        """
+        event = queue.get()
+        if event is _STOP:
+            return [], True
+
+        batch = [event]
+        deadline = time.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.time()
+            if timeout <= 0:
+                break
+            try:
+                event = queue.get(timeout=timeout)
+            except Empty:
+                break
+            if event is _STOP:
+                return batch, True
+            batch.append(event)
+        return batch, False
+
+    def _send_batch(self, batch):
+        """Send a batch of events to the backend, counting them as dropped on error."""
+        dog_stats_api.histogram('track.queued.batch_size', len(batch), tags=[self._backend_tag])
+        try:
+            with dog_stats_api.timer('track.queued.send_many', tags=[self._backend_tag]):
+                self.backend.send_many(batch)
+        except Exception:  # pylint: disable=broad-except
+            log.exception('Error sending a batch of %d events to tracking backend %s', len(batch), self.backend_name)
+            self._record_dropped(len(batch))
+
+    def _record_dropped(self, count):
+        """Count events that were not sent to the backend."""
+        with self._lock:
+            self.dropped_count += count
+        dog_stats_api.increment('track.queued.dropped', count, tags=[self._backend_tag])
+
+    @property
+    def _backend_tag(self):
+        """Tag identifying the backend in metrics."""
+        return u'backend:{}'.format(self.backend_name)
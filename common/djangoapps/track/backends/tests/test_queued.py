@@ -0,0 +1,83 @@
+"""Tests for the queued event tracker backend."""
+from __future__ import absolute_import
+
+from django.test import TestCase
+from mock import patch
+
+from track.backends import BaseBackend
+from track.backends.queued import QueuedBackend
+
+
+class TestQueuedBackend(TestCase):
+    """Tests sending events to another backend in batches."""
+
+    def create_backend(self, **options):
+        """Returns a QueuedBackend sending events to a RecordingBackend."""
+        backend = QueuedBackend(
+            backend={'ENGINE': 'track.backends.tests.test_queued.RecordingBackend'},
+            **options
+        )
+        self.addCleanup(backend.close)
+        return backend
+
+    def test_batches(self):
+        backend = self.create_backend(batch_size=2, flush_interval=60)
+        events = [{'test': i} for i in range(5)]
+        for event in events:
+            backend.send(event)
+        backend.close()
+
+        self.assertEqual(backend.backend.batches, [events[0:2], events[2:4], events[4:]])
+        self.assertEqual(backend.dropped_count, 0)
+
+    def test_flush_interval(self):
+        backend = self.create_backend(batch_size=100, flush_interval=0)
+        backend.send({'test': 1})
+        backend.close()
+
+        self.assertEqual(backend.backend.batches, [[{'test': 1}]])
+
+    def test_queue_full(self):
+        backend = self.create_backend(max_queue_size=2)
+        # Events are not consumed if the worker does not run.
+        with patch.object(QueuedBackend, '_run'):
+            for i in range(5):
+                backend.send({'test': i})
+
+        self.assertEqual(backend.dropped_count, 3)
+        self.assertEqual(backend.backend.batches, [])
+
+    def test_backend_error(self):
+        backend = self.create_backend(batch_size=2, flush_interval=60)
+        backend.backend.error = True
+        for i in range(3):
+            backend.send({'test': i})
+        backend.close()
+
+        self.assertEqual(backend.dropped_count, 3)
+
+    def test_send_after_close(self):
+        backend = self.create_backend()
+        backend.send({'test': 1})
+        backend.close()
+        backend.send({'test': 2})
+        backend.close()
+
+        self.assertEqual(backend.backend.batches, [[{'test': 1}], [{'test': 2}]])
+
+
+class RecordingBackend(BaseBackend):
+    """Backend recording the batches of events it is sent."""
+
+    def __init__(self, **options):
+        super(RecordingBackend, self).__init__(**options)
+        self.batches = []
+        self.error = False
+
+    def send(self, event):
+        self.send_many([event])
+
+    def send_many(self, events):
+        if self.error:
+            raise Exception('Backend error')
+        self.batches.append(list(events))
@@ -1,9 +1,15 @@
 """Map new event context values to old top-level field values. Ensures events can be parsed by legacy parsers."""
 
 import json
+import logging
+
+from dogapi import dog_stats_api
+from eventtracking.processors.exceptions import EventEmissionExit
 
 from .transformers import EventTransformerRegistry
 
+log = logging.getLogger(__name__)
+
 CONTEXT_FIELDS_TO_INCLUDE = [
     'username',
     'session',
@@ -14,6 +20,10 @@ CONTEXT_FIELDS_TO_INCLUDE = [
     'accept_language'
 ]
 
+# These fields are present elsewhere in the event once the shim context is removed.
+# client_id is only used for Segment web analytics and does not concern researchers.
+CONTEXT_FIELDS_TO_REMOVE = frozenset(CONTEXT_FIELDS_TO_INCLUDE + ['client_id'])
+
 
 class LegacyFieldMappingProcessor(object):
     """Ensures all required fields are included in emitted events"""
@@ -63,11 +73,7 @@ def remove_shim_context(event):
     """
     if 'context' in event:
         context = event['context']
-        # These fields are present elsewhere in the event at this point
-        context_fields_to_remove = set(CONTEXT_FIELDS_TO_INCLUDE)
-        # This field is only used for Segment web analytics and does not concern researchers
-        context_fields_to_remove.add('client_id')
-        for field in context_fields_to_remove:
+        for field in CONTEXT_FIELDS_TO_REMOVE:
             if field in context:
                 del context[field]
 
@@ -101,9 +107,44 @@ class PrefixedEventProcessor(object):
         If the event is registered with the EventTransformerRegistry, transform
         it.  Otherwise do nothing to it, and continue processing.
         """
-        try:
-            event = EventTransformerRegistry.create_transformer(event)
-        except KeyError:
+        transformer_class = EventTransformerRegistry.mapping.get(event.get(u'name'))
+        if transformer_class is None:
             return
+        event = transformer_class(event)
         event.transform()
         return event
+
+
+class ProcessorChain(object):
+    """
+    Runs a list of processors, built once when the tracker is configured,
+    as a single processor.
+
+    The processors are run in turn exactly as a RoutingBackend runs its own
+    processors, and the time each of them takes is reported to datadog,
+    tagged with the name of the processor, as the `track.processor` metric.
+    Events dropped by a processor, and its errors, are counted as the
+    `track.processor.exit` and `track.processor.error` metrics.
+    """
+
+    def __init__(self, processors):
+        self.stages = tuple(
+            (processor, [u'processor:{}'.format(type(processor).__name__)])
+            for processor in processors
+        )
+
+    def __call__(self, event):
+        for processor, tags in self.stages:
+            try:
+                with dog_stats_api.timer('track.processor', tags=tags):
+                    modified_event = processor(event)
+            except EventEmissionExit:
+                dog_stats_api.increment('track.processor.exit', tags=tags)
+                raise
+            except Exception:  # pylint: disable=broad-except
+                dog_stats_api.increment('track.processor.error', tags=tags)
+                log.exception('Failed to execute processor: %s', str(processor))
+            else:
+                if modified_event is not None:
+                    event = modified_event
+        return event
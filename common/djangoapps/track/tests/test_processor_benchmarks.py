@@ -0,0 +1,137 @@
+"""
+Benchmarks of the tracking log event processors, comparing processors run
+separately, as a RoutingBackend runs them, to the same processors run by a
+ProcessorChain.
+
+Like the modulestore benchmarks in xmodule.modulestore.perf_tests, these
+are skipped unless the MODULESTORE_BENCHMARKS environment variable is set,
+and write their results as JSON, including the number of events processed
+per second.
+"""
+import time
+from copy import deepcopy
+from unittest import TestCase, skipUnless
+
+import ddt
+from eventtracking.backends.routing import RoutingBackend
+
+from xmodule.modulestore.perf_tests.benchmark import BenchmarkRecorder, benchmarks_enabled
+
+from . import FROZEN_TIME, InMemoryBackend
+from ..shim import LegacyFieldMappingProcessor, PrefixedEventProcessor, ProcessorChain
+
+# Number of events processed by each timing.
+EVENT_COUNT = 1000
+# Number of timings of each benchmark.
+REPEAT = 5
+
+CONTEXT = {
+    u'accept_language': u'en-US,en;q=0.8',
+    u'agent': u'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/60.0 Safari/537.36',
+    u'client_id': u'1234567890.1234567890',
+    u'course_id': u'course-v1:edX+DemoX+Demo_Course',
+    u'host': u'courses.edx.org',
+    u'ip': u'10.0.0.1',
+    u'org_id': u'edX',
+    u'path': u'/event',
+    u'referer': u'https://courses.edx.org/courses/course-v1:edX+DemoX+Demo_Course/courseware/',
+    u'session': u'0123456789abcdef0123456789abcdef',
+    u'user_id': 42,
+    u'username': u'learner',
+}
+
+EVENTS = {
+    'browser_video': {
+        u'name': u'play_video',
+        u'timestamp': FROZEN_TIME,
+        u'data': {u'id': u'0b9e39477cf34507a7a48f74be381fdd', u'currentTime': 12.5, u'code': u'html5'},
+        u'context': dict(CONTEXT, event_source=u'browser', page=u'https://courses.edx.org/courses/'),
+    },
+    'mobile_video': {
+        u'name': u'edx.video.position.changed',
+        u'timestamp': FROZEN_TIME,
+        u'data': {
+            u'module_id': u'block-v1:edX+DemoX+Demo_Course+type@video+block@0b9e39477cf34507a7a48f74be381fdd',
+            u'current_time': 12.5,
+            u'old_time': 2.5,
+            u'new_time': 12.5,
+            u'seek_type': u'skip',
+            u'requested_skip_interval': 10,
+            u'code': u'mobile',
+        },
+        u'context': dict(
+            CONTEXT,
+            event_source=u'mobile',
+            application={u'name': u'edx.mobileapp.android', u'version': u'2.0'},
+        ),
+    },
+    'server_problem': {
+        u'name': u'problem_check',
+        u'timestamp': FROZEN_TIME,
+        u'data': {
+            u'problem_id': u'block-v1:edX+DemoX+Demo_Course+type@problem+block@d2e35c1d294b4ba0b3b1048615605d2a',
+            u'answers': {u'd2e35c1d294b4ba0b3b1048615605d2a_2_1': u'choice_2'},
+            u'correct_map': {
+                u'd2e35c1d294b4ba0b3b1048615605d2a_2_1': {
+                    u'correctness': u'correct', u'npoints': None, u'msg': u'', u'hint': u'', u'hintmode': None,
+                    u'queuestate': None,
+                },
+            },
+            u'grade': 1,
+            u'max_grade': 1,
+            u'success': u'correct',
+            u'attempts': 1,
+            u'state': {u'student_answers': {}, u'seed': 1, u'done': None, u'correct_map': {}, u'input_state': {}},
+        },
+        u'context': dict(
+            CONTEXT,
+            module={u'display_name': u'Multiple Choice', u'usage_key': u'block-v1:edX+DemoX+Demo_Course'},
+        ),
+    },
+}
+
+
+@ddt.ddt
+@skipUnless(benchmarks_enabled(), "Event processor benchmarks are disabled.")
+class EventProcessorBenchmarks(TestCase):
+    """
+    Times the processing of representative video and problem events by the
+    tracking log processors.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def setUp(self):
+        super(EventProcessorBenchmarks, self).setUp()
+        self.recorder = BenchmarkRecorder('event_processors')
+
+    def _routing_backend(self, chain):
+        """
+        Returns a RoutingBackend running the tracking log processors, either
+        separately or as a ProcessorChain.
+        """
+        processors = [LegacyFieldMappingProcessor(), PrefixedEventProcessor()]
+        if chain:
+            processors = [ProcessorChain(processors)]
+        return RoutingBackend(backends={'mem': InMemoryBackend()}, processors=processors)
+
+    @ddt.data(*sorted(EVENTS))
+    def test_events_per_second(self, event_type):
+        for chain in (False, True):
+            backend = self._routing_backend(chain)
+            timings = []
+            for __ in xrange(REPEAT):
+                # Processors modify events in place, so each is processed from its own copy.
+                events = [deepcopy(EVENTS[event_type]) for __ in xrange(EVENT_COUNT)]
+                start = time.time()
+                for event in events:
+                    backend.send(event)
+                timings.append(time.time() - start)
+                backend.backends['mem'].events = []
+
+            self.recorder.record(
+                'process_events', None, timings,
+                event_type=event_type, chain=chain, event_count=EVENT_COUNT,
+                events_per_second=EVENT_COUNT / min(timings),
+            )
@@ -1,16 +1,19 @@
 """Ensure emitted events contain the fields legacy processors expect to find."""
 
 from collections import namedtuple
+from copy import deepcopy
 
 import ddt
+from django.test import TestCase
 from django.test.utils import override_settings
-from mock import sentinel
+from eventtracking.processors.exceptions import EventEmissionExit
+from mock import Mock, sentinel
 
 from openedx.core.lib.tests.assertions.events import assert_events_equal
 
 from . import FROZEN_TIME, EventTrackingTestCase
 from .. import transformers
-from ..shim import PrefixedEventProcessor
+from ..shim import LegacyFieldMappingProcessor, PrefixedEventProcessor, ProcessorChain
 
 LEGACY_SHIM_PROCESSOR = [
     {
@@ -257,6 +260,16 @@ class EventTransformerRegistryTestCase(EventTrackingTestCase):
         event = {'name': event_name}
         with self.assertRaises(KeyError):
             self.registry.create_transformer(event)
+        self.assertIsNone(self.registry.mapping.get(event_name))
+
+    def test_prefix_changes(self):
+        mapping = transformers.DottedPathMapping()
+        mapping['edx.ui.'] = sentinel.ui
+        mapping['edx.ui.lms.'] = sentinel.lms
+        self.assertEqual(mapping.get('edx.ui.lms.sequence'), sentinel.lms)
+
+        del mapping['edx.ui.lms.']
+        self.assertEqual(mapping.get('edx.ui.lms.sequence'), sentinel.ui)
 
 
 @ddt.ddt
@@ -318,3 +331,37 @@ class PrefixedEventProcessorTestCase(EventTrackingTestCase):
         self.assertEqual(result[u'event_type'], u'seq_goto')
         self.assertEqual(result[u'event'][u'old'], 2)
         self.assertEqual(result[u'event'][u'new'], 5)
+
+
+class ProcessorChainTestCase(TestCase):
+    """
+    Test ProcessorChain
+    """
+
+    def test_same_as_separate_processors(self):
+        event = {
+            u'name': u'edx.ui.lms.sequence.next_selected',
+            u'timestamp': FROZEN_TIME,
+            u'data': {u'current_tab': 1, u'tab_count': 5, u'id': u'ABCDEFG'},
+            u'context': {u'event_source': u'browser', u'username': u'test', u'course_id': u'a/b/c'},
+        }
+        processors = [LegacyFieldMappingProcessor(), PrefixedEventProcessor()]
+
+        expected_event = deepcopy(event)
+        for processor in processors:
+            expected_event = processor(expected_event) or expected_event
+
+        self.assertEqual(ProcessorChain(processors)(deepcopy(event)), expected_event)
+        self.assertEqual(expected_event[u'event_type'], u'seq_next')
+
+    def test_processor_error(self):
+        failing_processor = Mock(side_effect=ValueError)
+        chain = ProcessorChain([failing_processor, Mock(return_value=sentinel.modified_event)])
+        self.assertEqual(chain(sentinel.event), sentinel.modified_event)
+
+    def test_event_emission_exit(self):
+        last_processor = Mock()
+        chain = ProcessorChain([Mock(side_effect=EventEmissionExit), last_processor])
+        with self.assertRaises(EventEmissionExit):
+            chain(sentinel.event)
+        self.assertFalse(last_processor.called)
@@ -13,6 +13,9 @@ from opaque_keys.edx.keys import UsageKey
 
 log = logging.getLogger(__name__)
 
+# Returned by DottedPathMapping._find when no key matches.
+_NOT_FOUND = object()
+
 
 class DottedPathMapping(object):
     """
@@ -34,6 +37,9 @@ class DottedPathMapping(object):
     def __init__(self, registry=None):
         self._match_registry = {}
         self._prefix_registry = {}
+        # Prefixes reverse-sorted, so that the longest matching prefix is
+        # found first.  Kept up to date as prefixes are added and removed.
+        self._sorted_prefixes = ()
         self.update(registry or {})
 
     def __contains__(self, key):
@@ -44,24 +50,22 @@ class DottedPathMapping(object):
             return False
 
     def __getitem__(self, key):
-        if key in self._match_registry:
-            return self._match_registry[key]
-        if isinstance(key, basestring):
-            # Reverse-sort the keys to find the longest matching prefix.
-            for prefix in sorted(self._prefix_registry, reverse=True):
-                if key.startswith(prefix):
-                    return self._prefix_registry[prefix]
-        raise KeyError('Key {} not found in {}'.format(key, type(self)))
+        value = self._find(key)
+        if value is _NOT_FOUND:
+            raise KeyError('Key {} not found in {}'.format(key, type(self)))
+        return value
 
     def __setitem__(self, key, value):
         if key.endswith('.'):
             self._prefix_registry[key] = value
+            self._sort_prefixes()
         else:
             self._match_registry[key] = value
 
     def __delitem__(self, key):
         if key.endswith('.'):
             del self._prefix_registry[key]
+            self._sort_prefixes()
         else:
             del self._match_registry[key]
 
@@ -70,10 +74,27 @@ class DottedPathMapping(object):
         Return `self[key]` if it exists, otherwise, return `None` or `default`
         if it is specified.
         """
-        try:
-            self[key]
-        except KeyError:
-            return default
+        value = self._find(key)
+        return default if value is _NOT_FOUND else value
+
+    def _find(self, key):
+        """
+        Return the value of the exact match or the longest matching prefix
+        of `key`, or `_NOT_FOUND` if there is none.
+        """
+        if key in self._match_registry:
+            return self._match_registry[key]
+        if isinstance(key, basestring):
+            for prefix in self._sorted_prefixes:
+                if key.startswith(prefix):
+                    return self._prefix_registry[prefix]
+        return _NOT_FOUND
+
+    def _sort_prefixes(self):
+        """
+        Update the reverse-sorted prefixes after the prefix registry changed.
+        """
+        self._sorted_prefixes = tuple(sorted(self._prefix_registry, reverse=True))
 
     def update(self, dict_):
         """
@@ -7,6 +7,8 @@ Uses pyparsing to parse. Main function as of now is evaluator().
 import math
 import numbers
 import operator
+import threading
+from collections import OrderedDict
 
 import numpy
 import scipy.constants
@@ -75,6 +77,9 @@ DEFAULT_VARIABLES = {
     'q': scipy.constants.e  # Fund. Charge: 1.602176565e-19 (Coulombs)
 }
 
+# Maximum number of compiled expressions kept by compile_expression.
+COMPILED_EXPRESSION_CACHE_SIZE = 1024
+
 # We eliminated the following extreme suffixes:
 #   P (1e15), E (1e18), Z (1e21), Y (1e24),
 #   f (1e-15), a (1e-18), z (1e-21), y (1e-24)
@@ -242,34 +247,267 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
     if math_expr.strip() == "":
         return float('nan')
 
-    # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
-
-    # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
+    return compile_expression(math_expr, case_sensitive)(variables, functions)
 
-    # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
 
-    # Create a recursion to evaluate the tree.
+def _casifier(case_sensitive):
+    """
+    Return the function normalizing the case of variable and function names.
+    """
     if case_sensitive:
-        casify = lambda x: x
+        return lambda x: x
     else:
-        casify = lambda x: x.lower()  # Lowercase for case insens.
+        return lambda x: x.lower()  # Lowercase for case insens.
+
+
+def _build_grammar():
+    """
+    Build the pyparsing grammar of algebraic expressions.
+
+    The grammar keeps all operators in the tree and does not parse any
+    strings of numbers into their float versions. Nodes are grouped to
+    reflect parenthesis and order of operations, and named after the
+    evaluation action that applies to them.
+    """
+    # 0.33 or 7 or .34 or 16.
+    number_part = Word(nums)
+    inner_number = (number_part + Optional("." + Optional(number_part))) | ("." + number_part)
+    # pyparsing allows spaces between tokens--`Combine` prevents that.
+    inner_number = Combine(inner_number)
+
+    # SI suffixes and percent.
+    number_suffix = MatchFirst(Literal(k) for k in SUFFIXES.keys())
+
+    # 0.33k or 17
+    plus_minus = Literal('+') | Literal('-')
+    number = Group(
+        Optional(plus_minus) +
+        inner_number +
+        Optional(CaselessLiteral("E") + Optional(plus_minus) + number_part) +
+        Optional(number_suffix)
+    )
+    number = number("number")
+
+    # Predefine recursive variables.
+    expr = Forward()
+
+    # Handle variables passed in. They must start with letters/underscores
+    # and may contain numbers afterward.
+    inner_varname = Word(alphas + "_", alphanums + "_")
+    varname = Group(inner_varname)("variable")
+
+    # Same thing for functions.
+    function = Group(inner_varname + Suppress("(") + expr + Suppress(")"))("function")
+
+    atom = number | function | varname | "(" + expr + ")"
+    atom = Group(atom)("atom")
+
+    # Do the following in the correct order to preserve order of operation.
+    pow_term = atom + ZeroOrMore("^" + atom)
+    pow_term = Group(pow_term)("power")
+
+    par_term = pow_term + ZeroOrMore('||' + pow_term)  # 5k || 4k
+    par_term = Group(par_term)("parallel")
+
+    prod_term = par_term + ZeroOrMore((Literal('*') | Literal('/')) + par_term)  # 7 * 5 / 4
+    prod_term = Group(prod_term)("product")
+
+    sum_term = Optional(plus_minus) + prod_term + ZeroOrMore(plus_minus + prod_term)  # -5 + 4 - 3
+    sum_term = Group(sum_term)("sum")
+
+    # Finish the recursion.
+    expr << sum_term  # pylint: disable=pointless-statement
+    return expr + stringEnd
+
+
+# The grammar is built once; parsing with it doesn't modify it.
+ALGEBRA_GRAMMAR = _build_grammar()
+
+# Operators of the tree nodes with several operands.
+_SUM_OPERATORS = (('+', operator.add), ('-', operator.sub))
+_PRODUCT_OPERATORS = (('*', operator.mul), ('/', operator.truediv))
 
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
 
-    return math_interpreter.reduce_tree(evaluate_actions)
+def eval_parallel_array(operands):
+    """
+    Compute the parallel resistors operator element-wise over arrays.
+
+    Like `eval_parallel`, give NaN wherever there is a zero among the
+    inputs. Unlike it, take only the operands, without the '||' marks.
+    """
+    if len(operands) == 1:
+        return operands[0]
+    has_zero = reduce(numpy.logical_or, [numpy.equal(operand, 0) for operand in operands])
+    operands = [numpy.where(numpy.equal(operand, 0), 1., operand) for operand in operands]
+    return numpy.where(has_zero, float('nan'), 1. / sum(1. / operand for operand in operands))
+
+
+def _compile_operations(node, operators, initial, casify, vectorized):
+    """
+    Compile a sum or product node into a function applying each operator,
+    in turn, to the running result and the operand following the operator,
+    as `eval_sum` and `eval_product` do. The result starts out as `initial`
+    and the operator as that of the first entry in `operators`.
+    """
+    operations = []
+    current_op = operators[0][1]
+    for child in node:
+        if isinstance(child, ParseResults):
+            operations.append((current_op, _compile_node(child, casify, vectorized)))
+        else:
+            current_op = dict(operators)[child]
+
+    def evaluate(variables, functions):
+        """
+        Apply the operations.
+        """
+        result = initial
+        for apply_op, operand in operations:
+            result = apply_op(result, operand(variables, functions))
+        return result
+    return evaluate
+
+
+def _compile_node(node, casify, vectorized=False):
+    """
+    Return a function of (variables, functions) evaluating the given parse tree node.
+
+    Numbers are converted and operators are looked up once, here, and the
+    nodes that merely wrap a single child are skipped, so that evaluation
+    doesn't walk the tree. If `vectorized`, the values of the variables may
+    also be arrays of sample points.
+    """
+    node_name = node.getName()
+    if node_name == 'number':
+        value = eval_number(node)
+        return lambda variables, functions: value
+
+    if node_name == 'variable':
+        varname = casify(node[0])
+        return lambda variables, functions: variables[varname]
+
+    if node_name == 'function':
+        funcname = casify(node[0])
+        argument = _compile_node(node[1], casify, vectorized)
+        return lambda variables, functions: functions[funcname](argument(variables, functions))
+
+    # The value of an atom is that of its only non-terminal child;
+    # the others are parentheses.
+    operands = [k for k in node if isinstance(k, ParseResults)]
+    if node_name == 'atom' or (node_name in ('power', 'parallel') and len(operands) == 1):
+        return _compile_node(operands[0], casify, vectorized)
+
+    if node_name == 'sum':
+        return _compile_operations(node, _SUM_OPERATORS, 0.0, casify, vectorized)
+
+    if node_name == 'product':
+        return _compile_operations(node, _PRODUCT_OPERATORS, 1.0, casify, vectorized)
+
+    operands = [_compile_node(k, casify, vectorized) for k in operands]
+    if node_name == 'power':
+        # Exponentiate right to left, as `eval_power` does.
+        operands.reverse()
+        return lambda variables, functions: reduce(
+            lambda a, b: b ** a, [operand(variables, functions) for operand in operands]
+        )
+
+    if node_name == 'parallel':
+        action = eval_parallel_array if vectorized else eval_parallel
+        return lambda variables, functions: action([operand(variables, functions) for operand in operands])
+
+    raise Exception(u"Unknown branch name '{}'".format(node_name))  # pragma: no cover
+
+
+class CompiledExpression(object):
+    """
+    A math expression, parsed and compiled into a callable.
+
+    Parsing dominates the cost of evaluating an expression, so a compiled
+    expression is meant to be evaluated many times, e.g. at each sample
+    point of a FormulaResponse. Use `compile_expression` to get one.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        math_interpreter = ParseAugmenter(math_expr, case_sensitive)
+        math_interpreter.parse_algebra()
+
+        self.math_expr = math_expr
+        self.case_sensitive = case_sensitive
+        self.variables_used = math_interpreter.variables_used
+        self.functions_used = math_interpreter.functions_used
+        self._check_variables = math_interpreter.check_variables
+        self._tree = math_interpreter.tree
+        self._evaluate = _compile_node(self._tree, _casifier(case_sensitive))
+        # Compiled when first needed, by evaluate_array.
+        self._evaluate_array = None
+
+    def __call__(self, variables, functions=None):
+        """
+        Evaluate the expression with the given variables and functions,
+        as `evaluator` does.
+        """
+        # Get our variables together.
+        all_variables, all_functions = add_defaults(variables, functions or {}, self.case_sensitive)
+
+        # ...and check them
+        self._check_variables(all_variables, all_functions)
+
+        return self._evaluate(all_variables, all_functions)
+
+    def evaluate_array(self, variables, num_samples, functions=None):
+        """
+        Evaluate the expression at `num_samples` sample points at once.
+
+        The values of `variables` are arrays holding the value of the
+        variable at each sample point; the expression is evaluated once,
+        over those arrays. Return an array of the num_samples results.
+
+        Floating point errors raise FloatingPointError rather than giving
+        inf or NaN, since evaluating a single point may raise a different
+        error (e.g. ZeroDivisionError) or none at all. Callers needing the
+        exact errors and results of `__call__` should fall back to it,
+        point by point, whenever this raises.
+        """
+        if self._evaluate_array is None:
+            self._evaluate_array = _compile_node(self._tree, _casifier(self.case_sensitive), vectorized=True)
+
+        all_variables, all_functions = add_defaults(variables, functions or {}, self.case_sensitive)
+        self._check_variables(all_variables, all_functions)
+
+        with numpy.errstate(all='raise', under='ignore'):
+            result = numpy.asarray(self._evaluate_array(all_variables, all_functions))
+
+        if result.shape != (num_samples,):
+            # The result doesn't depend on any of the sample points.
+            result = result * numpy.ones(num_samples)
+        return result
+
+
+_compiled_expressions = OrderedDict()
+_compiled_expressions_lock = threading.Lock()
+
+
+def compile_expression(math_expr, case_sensitive=False):
+    """
+    Return the CompiledExpression for `math_expr`.
+
+    The most recently used COMPILED_EXPRESSION_CACHE_SIZE expressions are
+    cached, so that evaluating the same expression again skips parsing.
+    Raises pyparsing.ParseException if the expression can't be parsed.
+    """
+    key = (math_expr, case_sensitive)
+    with _compiled_expressions_lock:
+        compiled = _compiled_expressions.pop(key, None)
+        if compiled is not None:
+            # Re-insert it as the most recently used.
+            _compiled_expressions[key] = compiled
+            return compiled
+
+    compiled = CompiledExpression(math_expr, case_sensitive)
+    with _compiled_expressions_lock:
+        _compiled_expressions[key] = compiled
+        while len(_compiled_expressions) > COMPILED_EXPRESSION_CACHE_SIZE:
+            _compiled_expressions.popitem(last=False)
+    return compiled
 
 
 class ParseAugmenter(object):
@@ -292,86 +530,31 @@ class ParseAugmenter(object):
         self.variables_used = set()
         self.functions_used = set()
 
-        def vpa(tokens):
-            """
-            When a variable is recognized, store it in `variables_used`.
-            """
-            varname = tokens[0][0]
-            self.variables_used.add(varname)
-
-        def fpa(tokens):
-            """
-            When a function is recognized, store it in `functions_used`.
-            """
-            varname = tokens[0][0]
-            self.functions_used.add(varname)
-
-        self.variable_parse_action = vpa
-        self.function_parse_action = fpa
-
     def parse_algebra(self):
         """
         Parse an algebraic expression into a tree.
 
         Store a `pyparsing.ParseResult` in `self.tree` with proper groupings to
-        reflect parenthesis and order of operations. Leave all operators in the
-        tree and do not parse any strings of numbers into their float versions.
+        reflect parenthesis and order of operations, using ALGEBRA_GRAMMAR.
+        Leave all operators in the tree and do not parse any strings of
+        numbers into their float versions. Then record the variables and
+        functions used in the tree.
 
         Adding the groups and result names makes the `repr()` of the result
         really gross. For debugging, use something like
           print OBJ.tree.asXML()
         """
-        # 0.33 or 7 or .34 or 16.
-        number_part = Word(nums)
-        inner_number = (number_part + Optional("." + Optional(number_part))) | ("." + number_part)
-        # pyparsing allows spaces between tokens--`Combine` prevents that.
-        inner_number = Combine(inner_number)
-
-        # SI suffixes and percent.
-        number_suffix = MatchFirst(Literal(k) for k in SUFFIXES.keys())
-
-        # 0.33k or 17
-        plus_minus = Literal('+') | Literal('-')
-        number = Group(
-            Optional(plus_minus) +
-            inner_number +
-            Optional(CaselessLiteral("E") + Optional(plus_minus) + number_part) +
-            Optional(number_suffix)
-        )
-        number = number("number")
+        self.tree = ALGEBRA_GRAMMAR.parseString(self.math_expr)[0]
 
-        # Predefine recursive variables.
-        expr = Forward()
-
-        # Handle variables passed in. They must start with letters/underscores
-        # and may contain numbers afterward.
-        inner_varname = Word(alphas + "_", alphanums + "_")
-        varname = Group(inner_varname)("variable")
-        varname.setParseAction(self.variable_parse_action)
-
-        # Same thing for functions.
-        function = Group(inner_varname + Suppress("(") + expr + Suppress(")"))("function")
-        function.setParseAction(self.function_parse_action)
-
-        atom = number | function | varname | "(" + expr + ")"
-        atom = Group(atom)("atom")
-
-        # Do the following in the correct order to preserve order of operation.
-        pow_term = atom + ZeroOrMore("^" + atom)
-        pow_term = Group(pow_term)("power")
-
-        par_term = pow_term + ZeroOrMore('||' + pow_term)  # 5k || 4k
-        par_term = Group(par_term)("parallel")
-
-        prod_term = par_term + ZeroOrMore((Literal('*') | Literal('/')) + par_term)  # 7 * 5 / 4
-        prod_term = Group(prod_term)("product")
-
-        sum_term = Optional(plus_minus) + prod_term + ZeroOrMore(plus_minus + prod_term)  # -5 + 4 - 3
-        sum_term = Group(sum_term)("sum")
-
-        # Finish the recursion.
-        expr << sum_term  # pylint: disable=pointless-statement
-        self.tree = (expr + stringEnd).parseString(self.math_expr)[0]
+        nodes = [self.tree]
+        while nodes:
+            node = nodes.pop()
+            node_name = node.getName()
+            if node_name == 'variable':
+                self.variables_used.add(node[0])
+            elif node_name == 'function':
+                self.functions_used.add(node[0])
+            nodes.extend(k for k in node if isinstance(k, ParseResults))
 
     def reduce_tree(self, handle_actions, terminal_converter=None):
         """
@@ -417,10 +600,7 @@ class ParseAugmenter(object):
 
         Otherwise, raise an UndefinedVariable containing all bad variables.
         """
-        if self.case_sensitive:
-            casify = lambda x: x
-        else:
-            casify = lambda x: x.lower()  # Lowercase for case insens.
+        casify = _casifier(self.case_sensitive)
 
         # Test if casify(X) is valid, but return the actual bad input (i.e. X)
         bad_vars = set(var for var in self.variables_used
@@ -3,6 +3,8 @@ Unit tests for calc.py
 """
 
 import unittest
+
+from mock import patch
 import numpy
 import calc
 from pyparsing import ParseException
@@ -559,3 +561,115 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+
+class CompiledExpressionTest(unittest.TestCase):
+    """
+    Run tests for calc.compile_expression and the expressions it returns.
+    """
+
+    def setUp(self):
+        super(CompiledExpressionTest, self).setUp()
+        calc._compiled_expressions.clear()  # pylint: disable=protected-access
+        self.addCleanup(calc._compiled_expressions.clear)  # pylint: disable=protected-access
+
+    def test_reusable(self):
+        """
+        A compiled expression can be evaluated with different variables.
+        """
+        compiled = calc.compile_expression('x^2 + sin(y) + 2k')
+        self.assertEqual(compiled({'x': 3, 'y': 0}), 2009.0)
+        self.assertEqual(compiled({'x': 4, 'y': 0}), 2016.0)
+        self.assertEqual(compiled.variables_used, {'x', 'y'})
+        self.assertEqual(compiled.functions_used, {'sin'})
+
+    def test_custom_functions(self):
+        compiled = calc.compile_expression('f(x) * F(x)', case_sensitive=True)
+        functions = {'f': lambda x: x, 'F': lambda x: x + 1}
+        self.assertEqual(compiled({'x': 2}, functions), 6)
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'F f'):
+            compiled({'x': 2})
+
+    def test_checks_variables(self):
+        compiled = calc.compile_expression('r1 + r2')
+        self.assertEqual(compiled({'R1': 1, 'r2': 2}), 3)
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'r2'):
+            compiled({'r1': 1})
+
+    def test_cached(self):
+        compiled = calc.compile_expression('x + 1')
+        self.assertIs(calc.compile_expression('x + 1'), compiled)
+        self.assertIsNot(calc.compile_expression('x + 1', case_sensitive=True), compiled)
+
+    def test_parse_error_not_cached(self):
+        with self.assertRaises(ParseException):
+            calc.compile_expression('x +')
+        self.assertEqual(len(calc._compiled_expressions), 0)  # pylint: disable=protected-access
+
+    def test_least_recently_used_evicted(self):
+        with patch.object(calc, 'COMPILED_EXPRESSION_CACHE_SIZE', 2):
+            first = calc.compile_expression('x + 1')
+            second = calc.compile_expression('x + 2')
+            # use the first expression again, so the second is evicted
+            self.assertIs(calc.compile_expression('x + 1'), first)
+            calc.compile_expression('x + 3')
+
+            self.assertIs(calc.compile_expression('x + 1'), first)
+            self.assertIsNot(calc.compile_expression('x + 2'), second)
+
+    def test_matches_reduce_tree(self):
+        """
+        Compiled expressions evaluate to the same values as reducing the
+        parse tree with the evaluation actions.
+        """
+        variables = {'x': 2, 'y': 3.5, 'R1': 4}
+        for math_expr in ('x', '-x', '(x)', 'x*y/2', '2^3^2', 'R1||x', '1.5e3*y - x + 3%', 'sqrt(x^2)*ln(e)'):
+            compiled = calc.compile_expression(math_expr)
+            math_interpreter = calc.ParseAugmenter(math_expr)
+            math_interpreter.parse_algebra()
+            all_variables, all_functions = calc.add_defaults(variables, {}, False)
+            expected = math_interpreter.reduce_tree({
+                'number': calc.eval_number,
+                'variable': lambda x: all_variables[x[0].lower()],
+                'function': lambda x: all_functions[x[0].lower()](x[1]),
+                'atom': calc.eval_atom,
+                'power': calc.eval_power,
+                'parallel': calc.eval_parallel,
+                'product': calc.eval_product,
+                'sum': calc.eval_sum,
+            })
+            self.assertEqual(compiled(variables), expected, math_expr)
+            self.assertEqual(type(compiled(variables)), type(expected), math_expr)
+
+    def test_evaluate_array(self):
+        """
+        Evaluating over arrays of sample points gives the same results as
+        evaluating each sample point in turn.
+        """
+        x_values = numpy.array([0.5, 1.0, 2.0])
+        y_values = numpy.array([-1.0, 3.0, 0.25])
+        for math_expr in ('x*y - x/y', 'x^y^2', 'x||y', '(x + i*y)^2', 'sin(x)*cosh(y) + 5%', '7', 'fact(3)*x'):
+            compiled = calc.compile_expression(math_expr)
+            result = compiled.evaluate_array({'x': x_values, 'y': y_values}, 3)
+            self.assertEqual(result.shape, (3,))
+            expected = [compiled({'x': x, 'y': y}) for x, y in zip(x_values, y_values)]
+            numpy.testing.assert_allclose(result, expected, err_msg=math_expr)
+
+    def test_evaluate_array_parallel_with_zero(self):
+        compiled = calc.compile_expression('x||y')
+        result = compiled.evaluate_array({'x': numpy.array([0.0, 1.0]), 'y': numpy.array([1.0, 1.0])}, 2)
+        self.assertTrue(numpy.isnan(result[0]))
+        self.assertEqual(result[1], 0.5)
+
+    def test_evaluate_array_errors(self):
+        """
+        Floating point errors raise, since evaluating a single point
+        might raise a different error.
+        """
+        variables = {'x': numpy.array([0.0, 1.0])}
+        with self.assertRaises(FloatingPointError):
+            calc.compile_expression('1/x').evaluate_array(variables, 2)
+        with self.assertRaises(FloatingPointError):
+            calc.compile_expression('(x-1)^0.5').evaluate_array(variables, 2)
+        with self.assertRaises(calc.UndefinedVariable):
+            calc.compile_expression('x*y').evaluate_array(variables, 2)
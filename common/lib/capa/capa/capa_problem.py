@@ -13,9 +13,11 @@ Main module which shows problems (of "capa" type).
 This is used by capa_module.
 """
 
+import hashlib
 import logging
 import os.path
 import re
+import threading
 from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime
@@ -29,7 +31,7 @@ import capa.inputtypes as inputtypes
 import capa.responsetypes as responsetypes
 import capa.xqueue_interface as xqueue_interface
 from capa.correctmap import CorrectMap
-from capa.safe_exec import safe_exec
+from capa.safe_exec import safe_exec, safe_exec_batch
 from capa.util import contextualize_text, convert_files_to_filenames
 from openedx.core.djangolib.markup import HTML
 from xmodule.stringify import stringify_children
@@ -69,8 +71,15 @@ html_problem_semantics = [
     "openendedrubric",
 ]
 
+# Maximum number of parsed problem templates kept per process; see
+# LoncapaProblem._parse_problem_text.
+PROBLEM_TEMPLATE_CACHE_SIZE = 256
+
 log = logging.getLogger(__name__)
 
+_problem_templates = OrderedDict()
+_problem_templates_lock = threading.Lock()
+
 #-----------------------------------------------------------------------------
 # main class for this module
 
@@ -171,15 +180,8 @@ class LoncapaProblem(object):
         self.done = state.get('done', False)
         self.input_state = state.get('input_state', {})
 
-        # Convert startouttext and endouttext to proper <text></text>
-        problem_text = re.sub(r"startouttext\s*/", "text", problem_text)
-        problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
-        self.problem_text = problem_text
-
         # parse problem XML file into an element tree
-        self.tree = etree.XML(problem_text)
-
-        self.make_xml_compatible(self.tree)
+        self.problem_text, self.tree = self._parse_problem_text(problem_text)
 
         # handle any <include file="foo"> tags
         self._process_includes()
@@ -214,6 +216,40 @@ class LoncapaProblem(object):
 
             self.extracted_tree = self._extract_html(self.tree)
 
+    def _parse_problem_text(self, problem_text):
+        """
+        Returns the problem text, with startouttext and endouttext converted,
+        and a copy of its XML tree, adjusted by make_xml_compatible.
+
+        None of this depends on the learner, so the results are cached per
+        process as a template, keyed by a hash of the problem text, and each
+        problem gets a deep copy of the template's tree to transform further.
+        The most recently used PROBLEM_TEMPLATE_CACHE_SIZE templates are kept.
+        """
+        encoded_text = problem_text.encode('utf-8') if isinstance(problem_text, unicode) else problem_text
+        key = hashlib.sha1(encoded_text).hexdigest()
+        with _problem_templates_lock:
+            template = _problem_templates.pop(key, None)
+            if template is not None:
+                # Re-insert it as the most recently used.
+                _problem_templates[key] = template
+
+        if template is None:
+            # Convert startouttext and endouttext to proper <text></text>
+            problem_text = re.sub(r"startouttext\s*/", "text", problem_text)
+            problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
+            tree = etree.XML(problem_text)
+            self.make_xml_compatible(tree)
+
+            template = (problem_text, tree)
+            with _problem_templates_lock:
+                _problem_templates[key] = template
+                while len(_problem_templates) > PROBLEM_TEMPLATE_CACHE_SIZE:
+                    _problem_templates.popitem(last=False)
+
+        problem_text, tree = template
+        return problem_text, deepcopy(tree)
+
     def make_xml_compatible(self, tree):
         """
         Adjust tree xml in-place for compatibility before creating
@@ -696,9 +732,7 @@ class LoncapaProblem(object):
 
         Problem XML goes to Python execution context. Runs everything in script tags.
         """
-        context = {}
-        context['seed'] = self.seed
-        context['anonymous_student_id'] = self.capa_system.anonymous_student_id
+        context = self._initial_context(self.seed, self.capa_system.anonymous_student_id)
         all_code = ''
 
         python_path = []
@@ -751,6 +785,42 @@ class LoncapaProblem(object):
         context['extra_files'] = extra_files or None
         return context
 
+    @staticmethod
+    def _initial_context(seed, anonymous_student_id):
+        """
+        Returns the context the script code of a problem is executed in,
+        for the given seed and student.
+        """
+        return {
+            'seed': seed,
+            'anonymous_student_id': anonymous_student_id,
+        }
+
+    def precompute_contexts(self, student_seeds):
+        """
+        Executes the script code of this problem for each of the given
+        (anonymous_student_id, seed) pairs, running it for many students in
+        the same sandboxed process, and caches the resulting contexts.  The
+        same problem then finds its context in the cache when it is
+        instantiated for any of those students.
+
+        Does nothing if there is no cache to put the contexts in.
+        """
+        cache = self.capa_system.cache
+        if not (cache and self.context['script_code']):
+            return
+        safe_exec_batch(
+            [
+                (self.context['script_code'], self._initial_context(seed, anonymous_student_id), seed)
+                for anonymous_student_id, seed in student_seeds
+            ],
+            python_path=self.context['python_path'],
+            extra_files=self.context['extra_files'],
+            cache=cache,
+            slug=self.problem_id,
+            unsafely=self.capa_system.can_execute_unsafe_code(),
+        )
+
     def _extract_html(self, problemtree):  # private
         """
         Main (private) function which converts Problem XML tree to HTML.
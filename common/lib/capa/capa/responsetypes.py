@@ -39,13 +39,14 @@ import capa.safe_exec as safe_exec
 import capa.xqueue_interface as xqueue_interface
 import dogstats_wrapper as dog_stats_api
 # specific library imports
-from calc import UndefinedVariable, evaluator
+from calc import UndefinedVariable, compile_expression, evaluator
 from cmath import isnan
 from openedx.core.djangolib.markup import HTML, Text
 
 from . import correctmap
 from .registry import TagRegistry
 from .util import (
+    compare_arrays_with_tolerance,
     compare_with_tolerance,
     contextualize_text,
     convert_files_to_filenames,
@@ -3082,14 +3083,21 @@ class FormulaResponse(LoncapaResponse):
         )
         return CorrectMap(self.answer_id, correctness)
 
-    def tupleize_answers(self, answer, var_dict_list):
+    def tupleize_answers(self, answer, var_dict_list, vectorized=True):
         """
         Takes in an answer and a list of dictionaries mapping variables to values.
         Each dictionary represents a test case for the answer.
-        Returns a tuple of formula evaluation results.
+        Returns a sequence of formula evaluation results: a numpy array if
+        `vectorized` and the answer could be evaluated for all the test cases
+        at once, otherwise a list.
         """
         _ = self.capa_system.i18n.ugettext
 
+        if vectorized:
+            out = self.evaluate_test_cases(answer, var_dict_list)
+            if out is not None:
+                return out
+
         out = []
         for var_dict in var_dict_list:
             try:
@@ -3141,6 +3149,27 @@ class FormulaResponse(LoncapaResponse):
                 )
         return out
 
+    def evaluate_test_cases(self, answer, var_dict_list):
+        """
+        Evaluates the answer for all the test cases at once, over arrays of
+        the values of each variable. Returns an array of the results, or None
+        if that's not possible, e.g. the answer is invalid or evaluating it
+        raises floating point errors, in which case tupleize_answers evaluates
+        each test case in turn, raising the appropriate StudentInputError.
+        """
+        if not var_dict_list:
+            return None
+
+        variables = {
+            var: numpy.array([var_dict[var] for var_dict in var_dict_list])
+            for var in var_dict_list[0]
+        }
+        try:
+            compiled = compile_expression(answer, case_sensitive=self.case_sensitive)
+            return compiled.evaluate_array(variables, len(var_dict_list))
+        except Exception:  # pylint: disable=broad-except
+            return None
+
     def randomize_variables(self, samples):
         """
         Returns a list of dictionaries mapping variables to random values in range,
@@ -3173,8 +3202,11 @@ class FormulaResponse(LoncapaResponse):
         student_result = self.tupleize_answers(given, var_dict_list)
         instructor_result = self.tupleize_answers(expected, var_dict_list)
 
-        correct = all(compare_with_tolerance(student, instructor, self.tolerance)
-                      for student, instructor in zip(student_result, instructor_result))
+        if isinstance(student_result, numpy.ndarray) and isinstance(instructor_result, numpy.ndarray):
+            correct = compare_arrays_with_tolerance(student_result, instructor_result, self.tolerance).all()
+        else:
+            correct = all(compare_with_tolerance(student, instructor, self.tolerance)
+                          for student, instructor in zip(student_result, instructor_result))
         if correct:
             return "correct"
         else:
@@ -1,12 +1,23 @@
 """Capa's specialized use of codejail.safe_exec."""
 
+from codejail import jail_code
 from codejail.safe_exec import safe_exec as codejail_safe_exec
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import json_safe, SafeExecException
 from . import lazymod
 from dogapi import dog_stats_api
 
+import copy
 import hashlib
+import json
+import logging
+import os.path
+import threading
+import weakref
+from collections import OrderedDict
+from time import time
+
+log = logging.getLogger(__name__)
 
 # Establish the Python environment for Capa.
 # Capa assumes float-friendly division always.
@@ -49,6 +60,82 @@ for name, modname in ASSUMED_IMPORTS:
 
 LAZY_IMPORTS = "".join(LAZY_IMPORTS)
 
+# The number of results of executing code kept in this process, in front of
+# each shared cache passed to safe_exec.
+SAFE_EXEC_LOCAL_CACHE_SIZE = 1024
+
+# The number of pieces of code whose hashes are kept for computing cache keys.
+CODE_HASH_CACHE_SIZE = 256
+
+# Maps each shared cache to the OrderedDict of results recently read from
+# or written to it by this process, least recently used first.
+_local_results = weakref.WeakKeyDictionary()
+_local_results_lock = threading.Lock()
+
+# Maps code to an md5 hasher that has been fed its repr, least recently
+# used first.  Problems execute the same code with many different globals
+# and seeds, so the hash of the code is only computed once.
+_code_hashers = OrderedDict()
+_code_hashers_lock = threading.Lock()
+
+# The most jobs safe_exec_batch runs in one sandboxed process.  The jail's
+# resource limits apply to the process as a whole, so this is kept small
+# enough for a batch of typical problem scripts to stay well within them.
+SAFE_EXEC_BATCH_SIZE = 20
+
+# The script run in the sandbox by safe_exec_batch.  It reads a list of
+# [code, globals] jobs from stdin and writes a list of [error message,
+# globals] results to stdout, executing every job in its own globals so
+# that one job can't see, or break, another.  After every job, sys.modules
+# and sys.path are restored to what they were before the first one, so
+# that each job imports its modules afresh, with its own seeded "random",
+# just as it would in a process of its own.  The python path is set up
+# by lines inserted at the start of the script.
+BATCH_RUNNER = """\
+import json
+import sys
+import traceback
+
+
+class DevNull(object):
+    def write(self, *args, **kwargs):
+        pass
+
+    def flush(self, *args, **kwargs):
+        pass
+sys.stdout = DevNull()
+
+ok_types = (type(None), int, long, float, str, unicode, list, tuple, dict)
+bad_keys = ("__builtins__",)
+
+
+def jsonable(v):
+    if not isinstance(v, ok_types):
+        return False
+    try:
+        json.dumps(v)
+    except Exception:
+        return False
+    return True
+
+jobs = json.load(sys.stdin)
+modules_before_jobs = dict(sys.modules)
+path_before_jobs = list(sys.path)
+results = []
+for code, g_dict in jobs:
+    try:
+        exec code in g_dict
+    except BaseException:
+        emsg = traceback.format_exc()
+    else:
+        emsg = None
+    results.append([emsg, dict((k, v) for k, v in g_dict.iteritems() if jsonable(v) and k not in bad_keys)])
+    sys.modules.clear()
+    sys.modules.update(modules_before_jobs)
+    sys.path[:] = path_before_jobs
+json.dump(results, sys.__stdout__)
+"""
+
 
 def update_hash(hasher, obj):
     """
@@ -73,6 +160,81 @@ def update_hash(hasher, obj):
         hasher.update(repr(obj))
 
 
+def _cache_key(code, safe_globals, random_seed):
+    """
+    Returns the key under which the result of executing `code` with the
+    JSON-safe globals `safe_globals` and `random_seed` is cached.
+    """
+    with _code_hashers_lock:
+        code_hasher = _code_hashers.pop(code, None)
+        if code_hasher is None:
+            code_hasher = hashlib.md5()
+            code_hasher.update(repr(code))
+            if len(_code_hashers) >= CODE_HASH_CACHE_SIZE:
+                _code_hashers.popitem(last=False)
+        _code_hashers[code] = code_hasher
+
+    md5er = code_hasher.copy()
+    update_hash(md5er, safe_globals)
+    return "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
+
+
+def _cache_get(cache, key):
+    """
+    Returns the cached (exception message, JSON-safe globals) result for
+    `key`, or None.  Results recently used in this process are returned
+    without a round trip to the shared `cache`.
+    """
+    with _local_results_lock:
+        local_results = _local_results.get(cache)
+        cached = local_results.pop(key, None) if local_results is not None else None
+        if cached is not None:
+            local_results[key] = cached
+
+    if cached is not None:
+        dog_stats_api.increment('capa.safe_exec.cache.hit', tags=[u'tier:local'])
+        emsg, cleaned_results = cached
+        # Callers are free to change the globals they are given.
+        return emsg, copy.deepcopy(cleaned_results)
+
+    start = time()
+    cached = cache.get(key)
+    dog_stats_api.histogram('capa.safe_exec.cache.get.time', time() - start)
+    if cached is None:
+        dog_stats_api.increment('capa.safe_exec.cache.miss')
+        return None
+
+    dog_stats_api.increment('capa.safe_exec.cache.hit', tags=[u'tier:shared'])
+    _remember_result(cache, key, cached)
+    return cached
+
+
+def _cache_set(cache, key, result):
+    """
+    Caches the (exception message, JSON-safe globals) `result` for `key`, both
+    in the shared `cache` and in this process.
+    """
+    cache.set(key, result)
+    _remember_result(cache, key, result)
+
+
+def _remember_result(cache, key, result):
+    """
+    Keeps a copy of the given result in this process, in front of the
+    shared `cache`.
+    """
+    emsg, cleaned_results = result
+    result = emsg, copy.deepcopy(cleaned_results)
+    with _local_results_lock:
+        local_results = _local_results.get(cache)
+        if local_results is None:
+            local_results = _local_results[cache] = OrderedDict()
+        local_results.pop(key, None)
+        if len(local_results) >= SAFE_EXEC_LOCAL_CACHE_SIZE:
+            local_results.popitem(last=False)
+        local_results[key] = result
+
+
 @dog_stats_api.timed('capa.safe_exec.time')
 def safe_exec(
     code,
@@ -102,7 +264,8 @@ def safe_exec(
 
     `cache` is an object with .get(key) and .set(key, value) methods.  It will be used
     to cache the execution, taking into account the code, the values of the globals,
-    and the random seed.
+    and the random seed.  Results recently read from or written to it are also kept
+    in this process, so that they can be reused without going to `cache`.
 
     `slug` is an arbitrary string, a description that's meaningful to the
     caller, that will be used in log messages.
@@ -112,12 +275,8 @@ def safe_exec(
     """
     # Check the cache for a previous result.
     if cache:
-        safe_globals = json_safe(globals_dict)
-        md5er = hashlib.md5()
-        md5er.update(repr(code))
-        update_hash(md5er, safe_globals)
-        key = "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
-        cached = cache.get(key)
+        key = _cache_key(code, json_safe(globals_dict), random_seed)
+        cached = _cache_get(cache, key)
         if cached is not None:
             # We have a cached result.  The result is a pair: the exception
             # message, if any, else None; and the resulting globals dictionary.
@@ -151,8 +310,138 @@ def safe_exec(
     # the globals dict might not be entirely serializable.
     if cache:
         cleaned_results = json_safe(globals_dict)
-        cache.set(key, (emsg, cleaned_results))
+        _cache_set(cache, key, (emsg, cleaned_results))
 
     # If an exception happened, raise it now.
     if emsg:
         raise e
+
+
+@dog_stats_api.timed('capa.safe_exec.batch.time')
+def safe_exec_batch(
+    jobs,
+    python_path=None,
+    extra_files=None,
+    cache=None,
+    slug=None,
+    unsafely=False,
+):
+    """
+    Execute a number of pieces of python code safely, as if by calling
+    safe_exec for each of them, but running up to SAFE_EXEC_BATCH_SIZE of
+    them in the same sandboxed process.
+
+    `jobs` is a list of (code, globals_dict, random_seed) tuples.  As with
+    safe_exec, changes the code makes to the globals are visible in the job's
+    `globals_dict` when this function returns.  The other arguments are those
+    of safe_exec, and apply to all of the jobs.
+
+    Results are read from, and put in, `cache` under the same keys as
+    safe_exec uses, so a job executed here is a cache hit for safe_exec and
+    vice versa.
+
+    Returns a list with an item for each job: the SafeExecException raised
+    by the job's code, or None if it ran successfully.
+
+    """
+    errors = [None] * len(jobs)
+    pending = []
+    for index, (code, globals_dict, random_seed) in enumerate(jobs):
+        key = None
+        if cache:
+            key = _cache_key(code, json_safe(globals_dict), random_seed)
+            cached = _cache_get(cache, key)
+            if cached is not None:
+                emsg, cleaned_results = cached
+                globals_dict.update(cleaned_results)
+                if emsg:
+                    errors[index] = SafeExecException(emsg)
+                continue
+        pending.append((index, key))
+
+    for start in xrange(0, len(pending), SAFE_EXEC_BATCH_SIZE):
+        batch = pending[start:start + SAFE_EXEC_BATCH_SIZE]
+        batch_jobs = [jobs[index] for index, _ in batch]
+        if unsafely:
+            results = [_exec_job(codejail_not_safe_exec, job, python_path, extra_files, slug) for job in batch_jobs]
+        elif not jail_code.is_configured("python"):
+            # codejail's safe_exec falls back to executing unsafely, so there's no process to share.
+            results = [_exec_job(codejail_safe_exec, job, python_path, extra_files, slug) for job in batch_jobs]
+        else:
+            results = _jail_batch(batch_jobs, python_path, extra_files, slug)
+
+        for (index, key), (emsg, cleaned_results) in zip(batch, results):
+            jobs[index][1].update(cleaned_results)
+            if emsg:
+                errors[index] = SafeExecException(emsg)
+            if cache:
+                _cache_set(cache, key, (emsg, cleaned_results))
+
+    return errors
+
+
+def _exec_job(exec_fn, job, python_path, extra_files, slug):
+    """
+    Executes a single safe_exec_batch job with `exec_fn`, and returns its
+    exception message, if any, else None; and its JSON-safe resulting globals.
+    """
+    code, globals_dict, random_seed = job
+    try:
+        exec_fn(
+            CODE_PROLOG % random_seed + LAZY_IMPORTS + code, globals_dict,
+            python_path=python_path, extra_files=extra_files, slug=slug,
+        )
+    except SafeExecException as e:
+        emsg = e.message
+    else:
+        emsg = None
+    return emsg, json_safe(globals_dict)
+
+
+def _jail_batch(batch_jobs, python_path, extra_files, slug):
+    """
+    Executes the given safe_exec_batch jobs in a single sandboxed process,
+    and returns a list of (exception message or None, JSON-safe globals)
+    pairs, one for each job.
+
+    If the process as a whole fails, for instance because the jobs together
+    exceeded the jail's limits, each job is executed in a process of its own.
+    """
+    files = []
+    path_code = []
+    extra_names = set(name for name, _ in extra_files or ())
+    for pydir in python_path or ():
+        pybase = os.path.basename(pydir)
+        path_code.append("sys.path.append(%r)\n" % pybase)
+        if pybase not in extra_names:
+            files.append(pydir)
+
+    stdin = json.dumps([
+        [CODE_PROLOG % random_seed + LAZY_IMPORTS + code, json_safe(globals_dict)]
+        for code, globals_dict, random_seed in batch_jobs
+    ])
+    res = jail_code.jail_code(
+        "python", code="import sys\n" + "".join(path_code) + BATCH_RUNNER, stdin=stdin,
+        files=files, slug=slug, extra_files=extra_files,
+    )
+    if res.status == 0:
+        try:
+            results = json.loads(res.stdout)
+        except ValueError:
+            pass
+        else:
+            return [
+                (
+                    None if emsg is None else (
+                        "Couldn't execute jailed code: stdout: '', stderr: {stderr!r} with status code: 1"
+                    ).format(stderr=emsg),
+                    cleaned_results,
+                )
+                for emsg, cleaned_results in results
+            ]
+
+    log.warning(
+        "Batch of %d jobs failed in the sandbox (%s), executing them one at a time.",
+        len(batch_jobs), slug,
+    )
+    return [_exec_job(codejail_safe_exec, job, python_path, extra_files, slug) for job in batch_jobs]
@@ -0,0 +1,7 @@
+"""
+A module that draws a random number when it's imported, from the seeded
+generator that safe_exec puts in place of the random module.
+"""
+import random
+
+THE_CONST = random.randint(0, 999999)
@@ -7,9 +7,11 @@ import random
 import textwrap
 import unittest
 
+from mock import patch
 from nose.plugins.skip import SkipTest
 
-from capa.safe_exec import safe_exec, update_hash
+from capa.safe_exec import safe_exec, safe_exec_batch, update_hash
+from capa.safe_exec import safe_exec as safe_exec_module
 from codejail.safe_exec import SafeExecException
 from codejail.jail_code import is_configured
 
@@ -177,6 +179,204 @@ class TestSafeExecCaching(unittest.TestCase):
                 self.fail("Tried executing code with non-ASCII unicode: {0}".format(code))
 
 
+class CountingDictCache(DictCache):
+    """A DictCache that counts the calls to get, for testing."""
+
+    def __init__(self, d):
+        super(CountingDictCache, self).__init__(d)
+        self.gets = 0
+
+    def get(self, key):
+        self.gets += 1
+        return super(CountingDictCache, self).get(key)
+
+
+class TestSafeExecLocalCaching(unittest.TestCase):
+    """Test the in-process results kept in front of the cache passed to safe_exec."""
+
+    def setUp(self):
+        super(TestSafeExecLocalCaching, self).setUp()
+        # pylint: disable=protected-access
+        safe_exec_module._local_results.clear()
+        safe_exec_module._code_hashers.clear()
+        self.addCleanup(safe_exec_module._local_results.clear)
+        self.addCleanup(safe_exec_module._code_hashers.clear)
+
+    def test_local_hit(self):
+        cache = CountingDictCache({})
+        safe_exec("a = [int(math.pi)]", {}, cache=cache)
+        self.assertEqual(cache.gets, 1)
+
+        g = {}
+        safe_exec("a = [int(math.pi)]", g, cache=cache)
+        self.assertEqual(g['a'], [3])
+        self.assertEqual(cache.gets, 1)
+
+        # Changing the globals returned doesn't change the cached result.
+        g['a'].append(4)
+        g = {}
+        safe_exec("a = [int(math.pi)]", g, cache=cache)
+        self.assertEqual(g['a'], [3])
+
+    def test_shared_hit_kept_locally(self):
+        shared = {}
+        safe_exec("a = 17", {}, cache=DictCache(shared))
+
+        cache = CountingDictCache(shared)
+        for _ in xrange(3):
+            g = {}
+            safe_exec("a = 17", g, cache=cache)
+            self.assertEqual(g['a'], 17)
+        self.assertEqual(cache.gets, 1)
+
+    def test_exceptions_kept_locally(self):
+        cache = CountingDictCache({})
+        for _ in xrange(2):
+            with self.assertRaises(SafeExecException):
+                safe_exec("1/0", {}, cache=cache)
+        self.assertEqual(cache.gets, 1)
+
+    def test_least_recently_used_evicted(self):
+        cache = CountingDictCache({})
+        with patch.object(safe_exec_module, 'SAFE_EXEC_LOCAL_CACHE_SIZE', 1):
+            safe_exec("a = 1", {}, cache=cache)
+            safe_exec("a = 2", {}, cache=cache)
+            safe_exec("a = 2", {}, cache=cache)
+            self.assertEqual(cache.gets, 2)
+            safe_exec("a = 1", {}, cache=cache)
+            self.assertEqual(cache.gets, 3)
+
+    def test_metrics(self):
+        cache = DictCache({})
+        with patch.object(safe_exec_module, 'dog_stats_api') as mock_dog_stats_api:
+            safe_exec("a = 1", {}, cache=cache)
+            safe_exec("a = 1", {}, cache=cache)
+            safe_exec("a = 1", {}, cache=DictCache(cache.cache))
+        self.assertEqual(
+            [call[0] for call in mock_dog_stats_api.increment.call_args_list],
+            [('capa.safe_exec.cache.miss',), ('capa.safe_exec.cache.hit',), ('capa.safe_exec.cache.hit',)],
+        )
+        self.assertEqual(
+            [call[1].get('tags') for call in mock_dog_stats_api.increment.call_args_list],
+            [None, [u'tier:local'], [u'tier:shared']],
+        )
+        self.assertEqual(mock_dog_stats_api.histogram.call_count, 2)
+
+    def test_cache_key(self):
+        # pylint: disable=protected-access
+        code = "a = random.random()"
+        safe_globals = {'seed': 1, 'b': [1, 2]}
+        md5er = hashlib.md5()
+        md5er.update(repr(code))
+        update_hash(md5er, safe_globals)
+        expected = "safe_exec.1.%s" % md5er.hexdigest()
+
+        # The hash of the code is reused, and keys are unchanged by it.
+        for _ in xrange(2):
+            self.assertEqual(safe_exec_module._cache_key(code, safe_globals, 1), expected)
+        self.assertEqual(len(safe_exec_module._code_hashers), 1)
+        self.assertNotEqual(safe_exec_module._cache_key(code, {'seed': 2}, 1), expected)
+
+
+class TestSafeExecBatch(unittest.TestCase):
+    """Test safe_exec_batch, executing many jobs at once."""
+
+    def make_jobs(self, seeds):
+        """Returns a job drawing a random number for each of the given seeds."""
+        return [("a = random.randint(0, 999)\nb = 1/2", {'seed': seed}, seed) for seed in seeds]
+
+    def test_results_match_safe_exec(self):
+        jobs = self.make_jobs([1, 2, 3])
+        errors = safe_exec_batch(jobs)
+        self.assertEqual(errors, [None, None, None])
+        for code, globals_dict, seed in jobs:
+            expected = {'seed': seed}
+            safe_exec(code, expected, random_seed=seed)
+            self.assertEqual(globals_dict, expected)
+
+    def test_modules_are_imported_per_job(self):
+        # Unsandboxed code shares this process's modules, whether it's batched or not.
+        if not is_configured("python"):
+            raise SkipTest
+
+        # A module using random at import time gets each job's seeded generator.
+        pylib = os.path.dirname(__file__) + "/test_files/pylib"
+        jobs = [("import random_constant; a = random_constant.THE_CONST", {}, seed) for seed in [1, 2, 3]]
+        errors = safe_exec_batch(jobs, python_path=[pylib])
+        self.assertEqual(errors, [None, None, None])
+        for code, globals_dict, seed in jobs:
+            expected = {}
+            safe_exec(code, expected, python_path=[pylib], random_seed=seed)
+            self.assertEqual(globals_dict, expected)
+        self.assertEqual(len(set(globals_dict['a'] for _, globals_dict, _ in jobs)), 3)
+
+    def test_exceptions_are_per_job(self):
+        jobs = [("a = 1", {}, 1), ("a = 1/0", {}, 2), ("import math; a = int(math.e)", {}, 3)]
+        errors = safe_exec_batch(jobs)
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[1], SafeExecException)
+        self.assertIn("ZeroDivisionError", errors[1].message)
+        self.assertIsNone(errors[2])
+        self.assertEqual([globals_dict.get('a') for _, globals_dict, _ in jobs], [1, None, 2])
+
+    def test_jobs_are_isolated(self):
+        jobs = [("a = 1", {}, 1), ("b = a", {}, 1)]
+        errors = safe_exec_batch(jobs)
+        self.assertIsNone(errors[0])
+        self.assertIn("NameError", errors[1].message)
+
+    def test_caching_shared_with_safe_exec(self):
+        cache = {}
+        jobs = self.make_jobs([1, 2])
+        jobs.append(("1/0", {}, 3))
+        safe_exec_batch(jobs, cache=DictCache(cache))
+        self.assertEqual(len(cache), 3)
+
+        # safe_exec finds the results of the batch in the cache.
+        for key in cache:
+            emsg, cleaned_results = cache[key]
+            cache[key] = (emsg, dict(cleaned_results, cached=True))
+        g = {'seed': 1}
+        safe_exec(jobs[0][0], g, random_seed=1, cache=DictCache(cache))
+        self.assertTrue(g['cached'])
+        with self.assertRaises(SafeExecException):
+            safe_exec("1/0", {}, random_seed=3, cache=DictCache(cache))
+
+        # And vice versa, cached results aren't executed again.
+        jobs = self.make_jobs([1, 2, 4])
+        # pylint: disable=protected-access
+        with patch.object(safe_exec_module, 'codejail_safe_exec', wraps=safe_exec_module.codejail_safe_exec) as exec_:
+            with patch.object(safe_exec_module, '_jail_batch', wraps=safe_exec_module._jail_batch) as mock_batch:
+                safe_exec_batch(jobs, cache=DictCache(cache))
+        executed = exec_.call_count + sum(len(call[0][0]) for call in mock_batch.call_args_list)
+        self.assertEqual(executed, 1)
+        self.assertTrue(jobs[0][1]['cached'])
+        self.assertNotIn('cached', jobs[2][1])
+
+    def test_batches(self):
+        jobs = self.make_jobs(range(5))
+        with patch.object(safe_exec_module, 'SAFE_EXEC_BATCH_SIZE', 2):
+            errors = safe_exec_batch(jobs)
+        self.assertEqual(errors, [None] * 5)
+        self.assertTrue(all('a' in globals_dict for _, globals_dict, _ in jobs))
+
+    def test_unsafely(self):
+        jobs = [("import os; files = os.listdir('/')", {}, 1)]
+        safe_exec_batch(jobs, unsafely=True)
+        self.assertEqual(jobs[0][1]['files'], os.listdir('/'))
+
+    def test_jailed_batch_failure_falls_back(self):
+        # Can't run a jailed batch if CodeJail isn't configured for python.
+        if not is_configured("python"):
+            raise SkipTest
+
+        jobs = self.make_jobs([1, 2])
+        with patch.object(safe_exec_module, 'BATCH_RUNNER', 'import sys; sys.exit(1)'):
+            errors = safe_exec_batch(jobs)
+        self.assertEqual(errors, [None, None])
+        self.assertTrue(all('a' in globals_dict for _, globals_dict, _ in jobs))
+
+
 class TestUpdateHash(unittest.TestCase):
     """Test the safe_exec.update_hash function to be sure it canonicalizes properly."""
 
@@ -0,0 +1,64 @@
+"""
+Benchmark of FormulaResponse sample evaluation.
+
+Compares evaluating an answer at all the sample points at once, over
+arrays, with evaluating it at each sample point in turn. Run with
+
+    python -m capa.tests.benchmark_formularesponse
+"""
+import timeit
+
+from capa.tests.helpers import new_loncapa_problem
+from capa.tests.response_xml_factory import FormulaResponseXMLFactory
+
+ANSWERS = (
+    'x+2*y',
+    'x^2*sin(y) + x||y',
+    'sqrt(x)*e^(i*y) - 3k',
+    '(x^3 - 2*x*y + y^2)/(1 + cosh(x/y))',
+)
+SAMPLE_COUNTS = (10, 100, 1000)
+
+# Each timing is the best of this many runs.
+REPEAT = 5
+
+
+def time_answer(answer, num_samples, repeat=REPEAT):
+    """
+    Returns the best times, in seconds, of evaluating the given answer at
+    num_samples sample points, sample by sample and vectorized.
+    """
+    xml = FormulaResponseXMLFactory().build_xml(
+        sample_dict={'x': (1, 5), 'y': (-3, 3)},
+        num_samples=num_samples,
+        tolerance='0.01',
+        answer=answer,
+    )
+    responder = new_loncapa_problem(xml).responders.values()[0]
+    var_dict_list = responder.randomize_variables(responder.samples)
+
+    return tuple(
+        min(timeit.repeat(
+            lambda vectorized=vectorized: responder.tupleize_answers(answer, var_dict_list, vectorized),
+            number=1,
+            repeat=repeat,
+        ))
+        for vectorized in (False, True)
+    )
+
+
+def main():
+    """
+    Prints the timings of each answer for each number of samples.
+    """
+    print '{:<40} {:>8} {:>12} {:>12} {:>8}'.format('answer', 'samples', 'pointwise', 'vectorized', 'speedup')
+    for answer in ANSWERS:
+        for num_samples in SAMPLE_COUNTS:
+            pointwise, vectorized = time_answer(answer, num_samples)
+            print '{:<40} {:>8} {:>11.2f}ms {:>11.2f}ms {:>7.1f}x'.format(
+                answer, num_samples, pointwise * 1000, vectorized * 1000, pointwise / vectorized,
+            )
+
+
+if __name__ == '__main__':
+    main()
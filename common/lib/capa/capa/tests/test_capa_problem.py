@@ -4,9 +4,12 @@ Test capa problem.
 import ddt
 import textwrap
 from lxml import etree
+from mock import patch
 import unittest
 
-from capa.tests.helpers import new_loncapa_problem
+from capa import capa_problem
+from capa.safe_exec.tests.test_safe_exec import DictCache
+from capa.tests.helpers import new_loncapa_problem, test_capa_system
 
 
 @ddt.ddt
@@ -590,3 +593,100 @@ class CAPAMultiInputProblemTest(unittest.TestCase):
             description_element = multi_inputs_group.xpath('//p[@id="{}"]'.format(description_id))
             self.assertEqual(len(description_element), 1)
             self.assertEqual(description_element[0].text, descriptions[index])
+
+
+class CAPAProblemTemplateTest(unittest.TestCase):
+    """ Tests for the cache of parsed problem templates """
+
+    XML = textwrap.dedent("""
+        <problem>
+            <startouttext/>Pick a color.<endouttext/>
+            <optionresponse>
+                <optioninput>
+                    <option correct="False">red</option>
+                    <option correct="True">blue</option>
+                </optioninput>
+            </optionresponse>
+        </problem>
+    """)
+
+    def setUp(self):
+        super(CAPAProblemTemplateTest, self).setUp()
+        patcher = patch.object(
+            capa_problem.LoncapaProblem, 'make_xml_compatible',
+            autospec=True, side_effect=capa_problem.LoncapaProblem.make_xml_compatible,
+        )
+        self.mock_make_xml_compatible = patcher.start()
+        self.addCleanup(patcher.stop)
+        capa_problem._problem_templates.clear()  # pylint: disable=protected-access
+        self.addCleanup(capa_problem._problem_templates.clear)  # pylint: disable=protected-access
+
+    def test_template_reused(self):
+        first_problem = new_loncapa_problem(self.XML, seed=1)
+        second_problem = new_loncapa_problem(self.XML, seed=2)
+        self.assertEqual(self.mock_make_xml_compatible.call_count, 1)
+
+        for problem in (first_problem, second_problem):
+            self.assertIn('<text>Pick a color.</text>', problem.problem_text)
+            optioninput = problem.tree.find('.//optioninput')
+            self.assertEqual(optioninput.get('options'), "('red','blue')")
+            self.assertEqual(optioninput.get('correct'), 'blue')
+
+    def test_problems_get_own_trees(self):
+        first_problem = new_loncapa_problem(self.XML)
+        first_problem.tree.find('.//optioninput').set('correct', 'red')
+        first_problem.tree.append(etree.Element('extra'))
+
+        second_problem = new_loncapa_problem(self.XML)
+        self.assertIsNot(second_problem.tree, first_problem.tree)
+        self.assertEqual(second_problem.tree.find('.//optioninput').get('correct'), 'blue')
+        self.assertIsNone(second_problem.tree.find('extra'))
+
+    def test_least_recently_used_evicted(self):
+        other_xml = self.XML.replace('Pick a color.', 'Pick another color.')
+        with patch.object(capa_problem, 'PROBLEM_TEMPLATE_CACHE_SIZE', 1):
+            new_loncapa_problem(self.XML)
+            new_loncapa_problem(other_xml)
+            new_loncapa_problem(other_xml)
+            self.assertEqual(self.mock_make_xml_compatible.call_count, 2)
+            new_loncapa_problem(self.XML)
+            self.assertEqual(self.mock_make_xml_compatible.call_count, 3)
+
+
+class CAPAProblemPrecomputeContextsTest(unittest.TestCase):
+    """ Tests for executing the script code of a problem for many students at once """
+
+    XML = textwrap.dedent("""
+        <problem>
+            <script type="loncapa/python">
+        answer = random.randint(0, 999)
+        student = anonymous_student_id
+            </script>
+            <p>Enter $answer.</p>
+        </problem>
+    """)
+
+    def setUp(self):
+        super(CAPAProblemPrecomputeContextsTest, self).setUp()
+        self.cache = {}
+        self.capa_system = test_capa_system()
+        self.capa_system.cache = DictCache(self.cache)
+
+    def test_contexts_cached_for_students(self):
+        problem = new_loncapa_problem(self.XML, capa_system=self.capa_system, seed=1)
+        problem.precompute_contexts([('other', 2), ('another', 3)])
+        self.assertEqual(len(self.cache), 3)
+
+        self.capa_system.anonymous_student_id = 'other'
+        other_problem = new_loncapa_problem(self.XML, capa_system=self.capa_system, seed=2)
+        self.assertEqual(len(self.cache), 3)
+        self.assertEqual(other_problem.context['student'], 'other')
+
+        uncached_problem = new_loncapa_problem(self.XML, capa_system=test_capa_system(), seed=2)
+        self.assertEqual(other_problem.context['answer'], uncached_problem.context['answer'])
+
+    def test_no_cache(self):
+        problem = new_loncapa_problem(self.XML, seed=1)
+        with patch.object(capa_problem, 'safe_exec_batch') as mock_safe_exec_batch:
+            problem.precompute_contexts([('other', 2)])
+        self.assertFalse(mock_safe_exec_batch.called)
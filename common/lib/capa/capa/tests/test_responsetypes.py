@@ -14,6 +14,7 @@ import unittest
 import zipfile
 
 import mock
+import numpy
 from pytz import UTC
 import requests
 
@@ -23,6 +24,7 @@ import calc
 from capa.responsetypes import LoncapaProblemError, \
     StudentInputError, ResponseError
 from capa.correctmap import CorrectMap
+from capa.util import compare_with_tolerance
 from capa.tests.response_xml_factory import (
     AnnotationResponseXMLFactory,
     ChoiceResponseXMLFactory,
@@ -619,6 +621,53 @@ class FormulaResponseTest(ResponseTest):
         self.assertTrue(problem.responders.values()[0].validate_answer('14*x'))
         self.assertFalse(problem.responders.values()[0].validate_answer('3*y+2*x'))
 
+    def test_vectorized_evaluation(self):
+        """
+        Test that evaluating all the samples at once gives the same results
+        as evaluating each sample in turn.
+        """
+        problem = self.build_problem(
+            sample_dict={'x': (1, 5), 'y': (-3, 3)},
+            num_samples=20,
+            tolerance="0.01",
+            answer="x^2*sin(y)",
+        )
+        responder = problem.responders.values()[0]
+        var_dict_list = responder.randomize_variables(responder.samples)
+
+        for answer in ('x^2*sin(y) + x||y', 'sqrt(x)*e^(i*y) - 3k', '5', 'fact(3)*x/y^-2', 'X*Y'):
+            vectorized = responder.tupleize_answers(answer, var_dict_list)
+            pointwise = responder.tupleize_answers(answer, var_dict_list, vectorized=False)
+            self.assertIsInstance(vectorized, numpy.ndarray)
+            self.assertEqual(len(vectorized), len(pointwise))
+            for vectorized_result, pointwise_result in zip(vectorized, pointwise):
+                self.assertTrue(compare_with_tolerance(vectorized_result, pointwise_result), answer)
+
+    def test_vectorized_evaluation_fallback(self):
+        """
+        Test that answers which can't be evaluated over all the samples at
+        once raise the same errors as when evaluated sample by sample.
+        """
+        problem = self.build_problem(
+            sample_dict={'x': (1, 2)},
+            num_samples=10,
+            tolerance="1%",
+            answer="x",
+        )
+        responder = problem.responders.values()[0]
+        var_dict_list = responder.randomize_variables(responder.samples)
+
+        # Division by zero, non-integer factorial and undefined variables
+        for answer in ('1/(x-x)', 'fact(x)', 'x*z', '2 +'):
+            self.assertIsNone(responder.evaluate_test_cases(answer, var_dict_list))
+            with self.assertRaises(StudentInputError):
+                responder.tupleize_answers(answer, var_dict_list)
+
+        # Floating point errors that don't raise when evaluating a single
+        # sample fall back to sample by sample evaluation.
+        self.assertIsNone(responder.evaluate_test_cases('sqrt(-x)', var_dict_list))
+        self.assertTrue(all(numpy.isnan(responder.tupleize_answers('sqrt(-x)', var_dict_list))))
+
 
 class StringResponseTest(ResponseTest):  # pylint: disable=missing-docstring
     xml_factory_class = StringResponseXMLFactory
@@ -2,10 +2,18 @@
 Tests capa util
 """
 import unittest
+
+import numpy
 from lxml import etree
 
 from capa.tests.helpers import test_capa_system
-from capa.util import compare_with_tolerance, sanitize_html, get_inner_html_from_xpath, remove_markup
+from capa.util import (
+    compare_arrays_with_tolerance,
+    compare_with_tolerance,
+    sanitize_html,
+    get_inner_html_from_xpath,
+    remove_markup,
+)
 
 
 class UtilTest(unittest.TestCase):
@@ -106,6 +114,27 @@ class UtilTest(unittest.TestCase):
         result = compare_with_tolerance(111.0, complex(100.0, 0), '10%', True)
         self.assertTrue(result)
 
+    def test_compare_arrays_with_tolerance(self):
+        infinity = float('Inf')
+        pairs = [
+            (100.0, 100.0), (100.001, 100.0), (101.0, 100.0), (109.9, 100.0), (110.1, 100.0),
+            (111.0, 100.0), (112.0, 100.0), (100.01, 100.0), (100.002, 100.0), (0.4, 0.44),
+            (110.0, 100.0), (-100.0, 100.0), (0.0, 0.0), (1e-20, 0.0),
+            (infinity, 100.0), (100.0, infinity), (infinity, infinity), (float('nan'), 1.0),
+            (complex(100.0, 1.0), complex(100.0, 0)), (complex(3, 4), complex(3, 4.001)),
+        ]
+        student_array, instructor_array = (numpy.array(values) for values in zip(*pairs))
+        for tolerance, relative_tolerance in (
+                ('0.001%', False), ('10%', False), ('10%', True), ('10.0', False),
+                ('0.1', True), (10.0, False), (0.1, True), (0.001, False), ('0.01%', False),
+        ):
+            result = compare_arrays_with_tolerance(student_array, instructor_array, tolerance, relative_tolerance)
+            expected = [
+                compare_with_tolerance(student, instructor, tolerance, relative_tolerance)
+                for student, instructor in pairs
+            ]
+            self.assertEqual(list(result), expected, (tolerance, relative_tolerance))
+
     def test_sanitize_html(self):
         """
         Test for html sanitization with bleach.
@@ -5,6 +5,7 @@ import re
 from decimal import Decimal
 
 import bleach
+import numpy
 from lxml import etree
 
 from calc import evaluator
@@ -17,6 +18,10 @@ from openedx.core.djangolib.markup import HTML
 # Utility functions used in CAPA responsetypes
 default_tolerance = '0.001%'
 
+# Relative width of the band around the tolerance bound within which
+# compare_arrays_with_tolerance defers to compare_with_tolerance.
+TOLERANCE_BOUND_MARGIN = 1e-9
+
 
 def compare_with_tolerance(student_complex, instructor_complex, tolerance=default_tolerance, relative_tolerance=False):
     """
@@ -94,6 +99,50 @@ def compare_with_tolerance(student_complex, instructor_complex, tolerance=defaul
         return abs(student_complex - instructor_complex) <= tolerance
 
 
+def compare_arrays_with_tolerance(student_array, instructor_array, tolerance=default_tolerance,
+                                  relative_tolerance=False):
+    """
+    Compare student_array to instructor_array element-wise, as compare_with_tolerance
+    compares two numbers, and return an array of booleans.
+
+    Elements whose difference is clearly within or clearly beyond the
+    tolerance are compared with array operations. compare_with_tolerance
+    compares real numbers as Decimals of their string representations, so
+    elements near the bound, or that aren't finite, are passed to it so
+    that the results are the same.
+    """
+    student_array = numpy.asarray(student_array)
+    instructor_array = numpy.asarray(instructor_array)
+    magnitude = numpy.maximum(numpy.abs(student_array), numpy.abs(instructor_array))
+
+    bound = tolerance
+    relative_bound = relative_tolerance
+    if isinstance(bound, str):
+        if bound == default_tolerance:
+            relative_bound = True
+        if bound.endswith('%'):
+            bound = evaluator(dict(), dict(), bound[:-1]) * 0.01
+            if not relative_bound:
+                bound = bound * numpy.abs(instructor_array)
+        else:
+            bound = evaluator(dict(), dict(), bound)
+
+    if relative_bound:
+        bound = bound * magnitude
+
+    with numpy.errstate(all='ignore'):
+        difference = numpy.abs(student_array - instructor_array)
+        margin = TOLERANCE_BOUND_MARGIN * (magnitude + numpy.abs(bound))
+        decided = numpy.isfinite(difference) & numpy.isfinite(margin) & (numpy.abs(difference - bound) > margin)
+        result = decided & (difference <= bound)
+
+    for index in numpy.flatnonzero(~decided):
+        result.flat[index] = compare_with_tolerance(
+            student_array.flat[index], instructor_array.flat[index], tolerance, relative_tolerance,
+        )
+    return result
+
+
 def contextualize_text(text, context):  # private
     """
     Takes a string with variables. E.g. $a+$b.
@@ -294,6 +294,12 @@ class StaticContent(object):
     def stream_data(self):
         yield self._data
 
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Stream the data between first_byte and last_byte (included)
+        """
+        yield self._data[first_byte:last_byte + 1]
+
     @staticmethod
     def serialize_asset_key_with_slash(asset_key):
         """
@@ -348,6 +354,30 @@ class StaticContentStream(StaticContent):
         return content
 
 
+class StaticContentMetadata(object):
+    """
+    The metadata of a piece of static content, without its data, which
+    is all that's needed to decide whether, and how, to serve it.
+    """
+    def __init__(self, loc, content_type, last_modified_at=None, length=None, locked=False, content_digest=None):
+        self.location = loc
+        self.content_type = content_type
+        self.last_modified_at = last_modified_at
+        self.length = length
+        self.locked = locked
+        self.content_digest = content_digest
+
+    @classmethod
+    def from_content(cls, content):
+        """
+        Returns the metadata of the given StaticContent.
+        """
+        return cls(
+            content.location, content.content_type, last_modified_at=content.last_modified_at,
+            length=content.length, locked=content.locked, content_digest=content.content_digest,
+        )
+
+
 class ContentStore(object):
     '''
     Abstraction for all ContentStore providers (e.g. MongoDB)
@@ -358,6 +388,19 @@ class ContentStore(object):
     def find(self, filename):
         raise NotImplementedError
 
+    def find_metadata(self, location, throw_on_not_found=True):
+        """
+        Returns the StaticContentMetadata of the content at the given location.
+
+        Providers that can look up metadata without opening the content should
+        override this.
+        """
+        content = self.find(location, throw_on_not_found=throw_on_not_found, as_stream=True)
+        if content is None:
+            return None
+        content.close()
+        return StaticContentMetadata.from_content(content)
+
     def get_all_content_for_course(self, course_key, start=0, maxresults=-1, sort=None, filter_params=None):
         '''
         Returns a list of static assets for a course, followed by the total number of assets.
@@ -2,6 +2,8 @@ from __future__ import absolute_import
 from importlib import import_module
 
 from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
 
 _CONTENTSTORE = {}
 
@@ -25,6 +27,18 @@ def contentstore(name='default'):
         if 'ADDITIONAL_OPTIONS' in settings.CONTENTSTORE:
             if name in settings.CONTENTSTORE['ADDITIONAL_OPTIONS']:
                 options.update(settings.CONTENTSTORE['ADDITIONAL_OPTIONS'][name])
+        options.setdefault('metadata_cache', _metadata_cache())
         _CONTENTSTORE[name] = class_(**options)
 
     return _CONTENTSTORE[name]
+
+
+def _metadata_cache():
+    """
+    Returns the cache for the metadata of assets: the course_assets cache
+    if there is one, else the default cache.
+    """
+    try:
+        return caches['course_assets']
+    except InvalidCacheBackendError:
+        return caches['default']
@@ -1,8 +1,14 @@
 """
 MongoDB/GridFS-level code for the contentstore.
 """
+import hashlib
+import logging
 import os
 import json
+import time
+from datetime import datetime
+from multiprocessing.pool import ThreadPool
+
 import pymongo
 import gridfs
 from gridfs.errors import NoFile
@@ -16,23 +22,42 @@ from xmodule.exceptions import NotFoundError
 from xmodule.modulestore.django import ASSET_IGNORE_REGEX
 from xmodule.util.misc import escape_invalid_characters
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
-from .content import StaticContent, ContentStore, StaticContentStream
+from .content import StaticContent, ContentStore, StaticContentMetadata, StaticContentStream
+
+log = logging.getLogger(__name__)
+
+# The number of assets copied, or exported, at the same time by bulk transfers.
+ASSET_TRANSFER_WORKERS = 4
+
+# The most GridFS chunks copied in a single insert.  Chunks are 255KB by
+# default, so this bounds the memory used by each transfer worker.
+CHUNK_COPY_BATCH_SIZE = 16
+
+# The most GridFS files inserted in a single insert.
+FILES_INSERT_BATCH_SIZE = 100
 
 
 class MongoContentStore(ContentStore):
     """
     MongoDB-backed ContentStore.
     """
+    # The fields of an asset's GridFS file that make up its StaticContentMetadata.
+    METADATA_FIELDS = ('contentType', 'uploadDate', 'length', 'locked', 'md5')
+
     # pylint: disable=unused-argument, bad-continuation
     def __init__(
         self, host, db,
-        port=27017, tz_aware=True, user=None, password=None, bucket='fs', collection=None, **kwargs
+        port=27017, tz_aware=True, user=None, password=None, bucket='fs', collection=None, metadata_cache=None,
+        **kwargs
     ):
         """
         Establish the connection with the mongo backend and connect to the collections
 
         :param collection: ignores but provided for consistency w/ other doc_store_config patterns
+        :param metadata_cache: a django cache in which the metadata of assets is cached, if given
         """
+        self.metadata_cache = metadata_cache
+
         # GridFS will throw an exception if the Database is wrapped in a MongoProxy. So don't wrap it.
         # The appropriate methods below are marked as autoretry_read - those methods will handle
         # the AutoReconnect errors.
@@ -100,6 +125,7 @@ class MongoContentStore(ContentStore):
             else:
                 fp.write(content.data)
 
+        self._invalidate_metadata(content_id)
         return content
 
     def delete(self, location_or_id):
@@ -110,6 +136,48 @@ class MongoContentStore(ContentStore):
             location_or_id, _ = self.asset_db_key(location_or_id)
         # Deletes of non-existent files are considered successful
         self.fs.delete(location_or_id)
+        self._invalidate_metadata(location_or_id)
+
+    @autoretry_read()
+    def find_metadata(self, location, throw_on_not_found=True):
+        """
+        Returns the StaticContentMetadata of the asset at the given location,
+        read from the metadata cache if it's there.  The asset's GridFS file
+        isn't opened.
+        """
+        content_id, __ = self.asset_db_key(location)
+        cache_key = self._metadata_cache_key(content_id)
+        item = self.metadata_cache.get(cache_key) if self.metadata_cache is not None else None
+        if item is None:
+            item = self.fs_files.find_one({'_id': content_id}, {field: True for field in self.METADATA_FIELDS})
+            if item is None:
+                if throw_on_not_found:
+                    raise NotFoundError(content_id)
+                return None
+            item = {field: item.get(field) for field in self.METADATA_FIELDS}
+            if self.metadata_cache is not None:
+                self.metadata_cache.set(cache_key, item)
+
+        return StaticContentMetadata(
+            location, item['contentType'], last_modified_at=item['uploadDate'], length=item['length'],
+            locked=item['locked'] or False, content_digest=item['md5'],
+        )
+
+    @staticmethod
+    def _metadata_cache_key(content_id):
+        """
+        Returns the key of the cached metadata of the asset with the given database _id.
+        """
+        return 'contentstore.metadata.{}'.format(
+            hashlib.md5(json.dumps(content_id, sort_keys=True)).hexdigest()
+        )
+
+    def _invalidate_metadata(self, content_id):
+        """
+        Removes the cached metadata of the asset with the given database _id.
+        """
+        if self.metadata_cache is not None:
+            self.metadata_cache.delete(self._metadata_cache_key(content_id))
 
     @autoretry_read()
     def find(self, location, throw_on_not_found=True, as_stream=False):
@@ -153,14 +221,28 @@ class MongoContentStore(ContentStore):
                 return None
 
     def export(self, location, output_directory):
-        content = self.find(location)
+        """
+        Writes the asset at the given location to the output_directory, a
+        GridFS chunk at a time, and returns the number of bytes written.
+        """
+        content_id, __ = self.asset_db_key(location)
+        try:
+            fp = self.fs.get(content_id)
+        except NoFile:
+            raise NotFoundError(content_id)
 
-        filename = content.name
-        if content.import_path is not None:
-            output_directory = output_directory + '/' + os.path.dirname(content.import_path)
+        filename = fp.displayname
+        import_path = getattr(fp, 'import_path', None)
+        if import_path is not None:
+            output_directory = output_directory + '/' + os.path.dirname(import_path)
 
         if not os.path.exists(output_directory):
-            os.makedirs(output_directory)
+            try:
+                os.makedirs(output_directory)
+            except OSError:
+                # Another transfer worker created it first.
+                if not os.path.isdir(output_directory):
+                    raise
 
         # Escape invalid char from filename.
         export_name = escape_invalid_characters(name=filename, invalid_char_list=['/', '\\'])
@@ -168,36 +250,47 @@ class MongoContentStore(ContentStore):
         disk_fs = OSFS(output_directory)
 
         with disk_fs.open(export_name, 'wb') as asset_file:
-            asset_file.write(content.data)
+            chunk = fp.read(fp.chunk_size)
+            while chunk:
+                asset_file.write(chunk)
+                chunk = fp.read(fp.chunk_size)
+        return fp.length
 
     def export_all_for_course(self, course_key, output_directory, assets_policy_file):
         """
         Export all of this course's assets to the output_directory. Export all of the assets'
         attributes to the policy file.
 
+        Up to ASSET_TRANSFER_WORKERS assets are exported at the same time.
+
         Args:
             course_key (CourseKey): the :class:`CourseKey` identifying the course
             output_directory: the directory under which to put all the asset files
             assets_policy_file: the filename for the policy file which should be in the same
                 directory as the other policy files.
         """
+        start = time.time()
         policy = {}
         assets, __ = self.get_all_content_for_course(course_key)
 
         for asset in assets:
-            # TODO: On 6/19/14, I had to put a try/except around this
-            # to export a course. The course failed on JSON files in
-            # the /static/ directory placed in it with an import.
-            #
-            # If this hasn't been looked at in a while, remove this comment.
-            #
-            # When debugging course exports, this might be a good place
-            # to look. -- pmitros
-            self.export(asset['asset_key'], output_directory)
             for attr, value in asset.iteritems():
                 if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
                     policy.setdefault(asset['asset_key'].name, {})[attr] = value
 
+        # TODO: On 6/19/14, I had to put a try/except around this
+        # to export a course. The course failed on JSON files in
+        # the /static/ directory placed in it with an import.
+        #
+        # If this hasn't been looked at in a while, remove this comment.
+        #
+        # When debugging course exports, this might be a good place
+        # to look. -- pmitros
+        exported_bytes = _map_with_workers(
+            lambda asset: self.export(asset['asset_key'], output_directory), assets
+        )
+        _log_transfer(u'Exported', course_key, output_directory, len(assets), sum(exported_bytes), start)
+
         with open(assets_policy_file, 'w') as f:
             json.dump(policy, f, sort_keys=True, indent=4)
 
@@ -225,6 +318,7 @@ class MongoContentStore(ContentStore):
             assets_to_delete = assets_to_delete + items.count()
             for asset in items:
                 self.fs.delete(asset[prefix])
+                self._invalidate_metadata(asset['_id'])
 
             self.fs_files.remove(query)
         return assets_to_delete
@@ -309,6 +403,7 @@ class MongoContentStore(ContentStore):
         asset_db_key, __ = self.asset_db_key(location)
         # catch upsert error and raise NotFoundError if asset doesn't exist
         result = self.fs_files.update({'_id': asset_db_key}, {"$set": attr_dict}, upsert=False)
+        self._invalidate_metadata(asset_db_key)
         if not result.get('updatedExisting', True):
             raise NotFoundError(asset_db_key)
 
@@ -333,41 +428,78 @@ class MongoContentStore(ContentStore):
         """
         See :meth:`.ContentStore.copy_all_course_assets`
 
-        This implementation fairly expensively copies all of the data
+        The GridFS chunks of the assets are copied as they are, in batches, without
+        reassembling the assets, and up to ASSET_TRANSFER_WORKERS assets are copied at
+        the same time.  As with GridFS itself, the file of each copy is inserted only once
+        all of its chunks are, so that no partial copy is ever visible.
         """
+        start = time.time()
         source_query = query_for_course(source_course_key)
-        # it'd be great to figure out how to do all of this on the db server and not pull the bits over
-        for asset in self.fs_files.find(source_query):
-            asset_key = self.make_id_son(asset)
-            # don't convert from string until fs access
-            source_content = self.fs.get(asset_key)
-            if isinstance(asset_key, basestring):
-                asset_key = AssetKey.from_string(asset_key)
-                __, asset_key = self.asset_db_key(asset_key)
-            asset_key['org'] = dest_course_key.org
-            asset_key['course'] = dest_course_key.course
-            if getattr(dest_course_key, 'deprecated', False):  # remove the run if exists
-                if 'run' in asset_key:
-                    del asset_key['run']
-                asset_id = asset_key
-            else:  # add the run, since it's the last field, we're golden
-                asset_key['run'] = dest_course_key.run
-                asset_id = unicode(
-                    dest_course_key.make_asset_key(asset_key['category'], asset_key['name']).for_branch(None)
-                )
+        copies = [
+            (self.make_id_son(asset), self._copied_file(asset, dest_course_key))
+            for asset in self.fs_files.find(source_query)
+        ]
+
+        _map_with_workers(lambda copy: self._copy_chunks(copy[0], copy[1]['_id']), copies)
+        copied_files = [copied_file for __, copied_file in copies]
+        for index in xrange(0, len(copied_files), FILES_INSERT_BATCH_SIZE):
+            self.fs_files.insert(copied_files[index:index + FILES_INSERT_BATCH_SIZE])
+
+        _log_transfer(
+            u'Copied', source_course_key, dest_course_key, len(copied_files),
+            sum(copied_file['length'] for copied_file in copied_files), start,
+        )
 
-            self.fs.put(
-                source_content.read(),
-                _id=asset_id, filename=asset['filename'], content_type=asset['contentType'],
-                displayname=asset['displayname'], content_son=asset_key,
-                # thumbnail is not technically correct but will be functionally correct as the code
-                # only looks at the name which is not course relative.
-                thumbnail_location=asset['thumbnail_location'],
-                import_path=asset['import_path'],
-                # getattr b/c caching may mean some pickled instances don't have attr
-                locked=asset.get('locked', False)
+    def _copied_file(self, asset, dest_course_key):
+        """
+        Returns the GridFS file of the copy of the given asset, from its
+        fs.files entry, in the course with the given dest_course_key.
+        """
+        asset_key = self.make_id_son(asset)
+        if isinstance(asset_key, basestring):
+            asset_key = AssetKey.from_string(asset_key)
+            __, asset_key = self.asset_db_key(asset_key)
+        else:
+            asset_key = SON(asset_key)
+        asset_key['org'] = dest_course_key.org
+        asset_key['course'] = dest_course_key.course
+        if getattr(dest_course_key, 'deprecated', False):  # remove the run if exists
+            if 'run' in asset_key:
+                del asset_key['run']
+            asset_id = asset_key
+        else:  # add the run, since it's the last field, we're golden
+            asset_key['run'] = dest_course_key.run
+            asset_id = unicode(
+                dest_course_key.make_asset_key(asset_key['category'], asset_key['name']).for_branch(None)
             )
 
+        return {
+            '_id': asset_id, 'filename': asset['filename'], 'contentType': asset['contentType'],
+            'displayname': asset['displayname'], 'content_son': asset_key,
+            # thumbnail is not technically correct but will be functionally correct as the code
+            # only looks at the name which is not course relative.
+            'thumbnail_location': asset['thumbnail_location'],
+            'import_path': asset['import_path'],
+            # getattr b/c caching may mean some pickled instances don't have attr
+            'locked': asset.get('locked', False),
+            'chunkSize': asset['chunkSize'], 'length': asset['length'], 'md5': asset['md5'],
+            'uploadDate': datetime.utcnow(),
+        }
+
+    def _copy_chunks(self, source_id, dest_id):
+        """
+        Copies the GridFS chunks of the file with the given source_id to the
+        file with the given dest_id, CHUNK_COPY_BATCH_SIZE chunks at a time.
+        """
+        batch = []
+        for chunk in self.chunks.find({'files_id': source_id}).sort('n', pymongo.ASCENDING):
+            batch.append({'files_id': dest_id, 'n': chunk['n'], 'data': chunk['data']})
+            if len(batch) >= CHUNK_COPY_BATCH_SIZE:
+                self.chunks.insert(batch)
+                batch = []
+        if batch:
+            self.chunks.insert(batch)
+
     def delete_all_course_assets(self, course_key):
         """
         Delete all assets identified via this course_key. Dangerous operation which may remove assets
@@ -379,6 +511,7 @@ class MongoContentStore(ContentStore):
         for asset in matching_assets:
             asset_key = self.make_id_son(asset)
             self.fs.delete(asset_key)
+            self._invalidate_metadata(asset_key)
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
@@ -503,6 +636,33 @@ class MongoContentStore(ContentStore):
         )
 
 
+def _map_with_workers(function, items):
+    """
+    Returns the results of calling function on each of the items, calling
+    it from up to ASSET_TRANSFER_WORKERS threads at the same time.
+    """
+    if len(items) <= 1:
+        return [function(item) for item in items]
+    pool = ThreadPool(min(ASSET_TRANSFER_WORKERS, len(items)))
+    try:
+        return pool.map(function, items)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _log_transfer(action, source, destination, num_assets, num_bytes, start):
+    """
+    Logs the throughput of a bulk transfer of assets started at start.
+    """
+    duration = time.time() - start
+    log.info(
+        u'%s %d assets (%d bytes) from %s to %s in %.2f seconds (%.2f MB/s)',
+        action, num_assets, num_bytes, source, destination, duration,
+        num_bytes / 1048576.0 / duration if duration else 0,
+    )
+
+
 def query_for_course(course_key, category=None):
     """
     Construct a SON object that will query for all assets possibly limited to the given type
@@ -0,0 +1,82 @@
+"""
+Records the timings of modulestore performance tests as JSON.
+
+Each timed operation is appended as a single line of JSON to the file
+named by the MODULESTORE_BENCHMARK_RESULTS environment variable, so that
+the results of successive runs - e.g. of successive releases, labeled
+with MODULESTORE_BENCHMARK_LABEL - can be collected in the same file and
+compared to find regressions.
+"""
+import datetime
+import json
+import os
+import platform
+import time
+from contextlib import contextmanager
+
+# Set to run the benchmark suites; they're skipped otherwise.
+ENABLED_ENV = 'MODULESTORE_BENCHMARKS'
+RESULTS_FILE_ENV = 'MODULESTORE_BENCHMARK_RESULTS'
+LABEL_ENV = 'MODULESTORE_BENCHMARK_LABEL'
+
+DEFAULT_RESULTS_FILE = 'modulestore_benchmarks.json'
+
+
+def benchmarks_enabled():
+    """
+    Returns whether the benchmark suites should be run.
+    """
+    return bool(os.environ.get(ENABLED_ENV))
+
+
+class BenchmarkRecorder(object):
+    """
+    Times operations and appends the results to the results file.
+    """
+    def __init__(self, suite, results_file=None, label=None):
+        self.suite = suite
+        self.results_file = results_file or os.environ.get(RESULTS_FILE_ENV, DEFAULT_RESULTS_FILE)
+        self.label = label or os.environ.get(LABEL_ENV)
+        self.started = datetime.datetime.utcnow().isoformat()
+
+    @contextmanager
+    def timer(self, benchmark, store, **params):
+        """
+        Records the time taken by the wrapped code, run once.
+        """
+        start = time.time()
+        yield
+        self.record(benchmark, store, [time.time() - start], **params)
+
+    def repeat(self, benchmark, store, func, repeat=5, **params):
+        """
+        Records the times taken by repeat calls of func and returns the result.
+        """
+        timings = []
+        for __ in xrange(repeat):
+            start = time.time()
+            func()
+            timings.append(time.time() - start)
+        return self.record(benchmark, store, timings, **params)
+
+    def record(self, benchmark, store, timings, **params):
+        """
+        Appends the given timings, in seconds, to the results file and returns the result.
+        """
+        sorted_timings = sorted(timings)
+        result = {
+            'suite': self.suite,
+            'benchmark': benchmark,
+            'store': store,
+            'params': params,
+            'label': self.label,
+            'started': self.started,
+            'python': platform.python_version(),
+            'timings': timings,
+            'min': sorted_timings[0],
+            'median': sorted_timings[len(sorted_timings) // 2],
+            'max': sorted_timings[-1],
+        }
+        with open(self.results_file, 'a') as results_file:
+            results_file.write(json.dumps(result, sort_keys=True) + '\n')
+        return result
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""
+Generates the OLX of a large course for modulestore performance tests.
+
+The course is a complete tree: each chapter has the same number of
+sequentials, each sequential the same number of verticals, and each
+vertical the same number of leaves, alternating between html and problem
+blocks. Block names are derived from their positions, so the generated
+course is the same on every run.
+"""
+import os
+
+from lxml import etree
+
+try:
+    import click
+except ImportError:
+    click = None
+
+# The course shape used by default: 10 chapters of 10 sequentials of
+# 10 verticals of 9 leaves, i.e. 10,111 blocks including the course.
+DEFAULT_COURSE_SHAPE = (10, 10, 10, 9)
+
+# Categories of the blocks at each level of the course tree, below the course.
+LEVEL_CATEGORIES = ('chapter', 'sequential', 'vertical')
+LEAF_CATEGORIES = ('html', 'problem')
+
+PROBLEM_XML = (
+    '<multiplechoiceresponse>'
+    '<choicegroup type="MultipleChoice">'
+    '<choice correct="false">Apple</choice>'
+    '<choice correct="true">Banana</choice>'
+    '<choice correct="false">Cherry</choice>'
+    '</choicegroup>'
+    '</multiplechoiceresponse>'
+)
+
+
+def course_block_count(course_shape=DEFAULT_COURSE_SHAPE):
+    """
+    Returns the number of blocks, including the course itself, in a
+    course of the given shape.
+    """
+    count = 1
+    level_size = 1
+    for num_children in course_shape:
+        level_size *= num_children
+        count += level_size
+    return count
+
+
+def _add_leaf(parent, url_name, index):
+    """
+    Adds an html or problem block, alternately, to the given parent element.
+    """
+    category = LEAF_CATEGORIES[index % len(LEAF_CATEGORIES)]
+    leaf = etree.SubElement(parent, category, url_name=url_name, display_name=url_name)
+    if category == 'problem':
+        leaf.append(etree.fromstring(PROBLEM_XML))
+        leaf.set('weight', '1')
+        leaf.set('max_attempts', '3')
+    else:
+        etree.SubElement(leaf, 'p').text = u'Content of {}.'.format(url_name)
+
+
+def _add_children(parent, parent_name, course_shape, depth=0):
+    """
+    Recursively adds the children of the given element for the given course shape.
+    """
+    num_children = course_shape[depth]
+    for index in xrange(num_children):
+        url_name = '{}_{}'.format(parent_name, index)
+        if depth < len(LEVEL_CATEGORIES):
+            child = etree.SubElement(
+                parent, LEVEL_CATEGORIES[depth], url_name=url_name, display_name=url_name,
+            )
+            if LEVEL_CATEGORIES[depth] == 'sequential':
+                child.set('graded', 'true')
+                child.set('format', 'Homework')
+            _add_children(child, url_name, course_shape, depth + 1)
+        else:
+            _add_leaf(parent, url_name, index)
+
+
+def make_course_xml(data_dir, course_dir, course_shape=DEFAULT_COURSE_SHAPE, org='perf', course='course', run='run'):
+    """
+    Writes the OLX of a course of the given shape to data_dir/course_dir, so
+    that it can be imported with
+    import_course_from_xml(store, user_id, data_dir, source_dirs=[course_dir]).
+
+    Arguments:
+        course_shape (tuple) - The number of chapters in the course, followed
+            by the number of children of each block at each level below it.
+    """
+    if len(course_shape) != len(LEVEL_CATEGORIES) + 1:
+        raise ValueError('course_shape must have {} levels.'.format(len(LEVEL_CATEGORIES) + 1))
+
+    root_dir = os.path.join(data_dir, course_dir)
+    if not os.path.isdir(os.path.join(root_dir, 'course')):
+        os.makedirs(os.path.join(root_dir, 'course'))
+
+    course_pointer = etree.Element('course', org=org, course=course, url_name=run)
+    etree.ElementTree(course_pointer).write(os.path.join(root_dir, 'course.xml'))
+
+    course_root = etree.Element('course', display_name='Performance Test Course')
+    _add_children(course_root, 'block', course_shape)
+    etree.ElementTree(course_root).write(os.path.join(root_dir, 'course', '{}.xml'.format(run)), encoding='utf-8')
+
+
+if click is not None:
+    # pylint: disable=bad-continuation
+    @click.command()
+    @click.argument('data_dir', type=click.Path(file_okay=False))
+    @click.option('--course_dir',
+                  default='perf_course',
+                  help="Name of the course directory created within DATA_DIR.",
+                  required=False
+                  )
+    @click.option('--shape',
+                  type=(click.INT, click.INT, click.INT, click.INT),
+                  default=DEFAULT_COURSE_SHAPE,
+                  help="Number of chapters, sequentials per chapter, verticals per sequential and leaves per vertical.",
+                  required=False
+                  )
+    def cli(data_dir, course_dir, shape):
+        """
+        Generates the OLX of a large course within DATA_DIR.
+        """
+        make_course_xml(data_dir, course_dir, shape)
+        print "Generated {} blocks in {}.".format(course_block_count(shape), os.path.join(data_dir, course_dir))
+
+if __name__ == '__main__':
+    if click is not None:
+        cli()  # pylint: disable=no-value-for-parameter
+    else:
+        print "Aborted! Module 'click' is not installed."
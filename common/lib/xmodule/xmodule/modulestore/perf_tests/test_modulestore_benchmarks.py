@@ -0,0 +1,157 @@
+"""
+Benchmarks of common modulestore operations on a large generated course.
+
+The benchmarks run against the old mongo and split modulestores (behind
+the mixed modulestore) using a local mongod, like the other performance
+tests, and are skipped unless the MODULESTORE_BENCHMARKS environment
+variable is set. Results are written as JSON; see benchmark.py.
+"""
+import unittest
+from shutil import rmtree
+from tempfile import mkdtemp
+
+import ddt
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.perf_tests.benchmark import BenchmarkRecorder, benchmarks_enabled
+from xmodule.modulestore.perf_tests.generate_course_xml import (
+    DEFAULT_COURSE_SHAPE,
+    course_block_count,
+    make_course_xml,
+)
+from xmodule.modulestore.tests.utils import MIXED_MODULESTORE_SETUPS, SHORT_NAME_MAP
+from xmodule.modulestore.xml_importer import import_course_from_xml
+
+COURSE_DIR = 'perf_course'
+USER_ID = ModuleStoreEnum.UserID.test
+
+# Number of times each read benchmark is repeated.
+READ_REPEAT = 5
+
+# Number of blocks created and updated by the bulk_operations benchmark.
+BULK_WRITE_BLOCKS = 100
+
+
+@ddt.ddt
+@unittest.skipUnless(benchmarks_enabled(), "Modulestore benchmarks are disabled.")
+class ModulestoreBenchmarks(unittest.TestCase):
+    """
+    Times reads and writes on a course of DEFAULT_COURSE_SHAPE
+    imported into each modulestore.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @classmethod
+    def setUpClass(cls):
+        super(ModulestoreBenchmarks, cls).setUpClass()
+        cls.data_dir = mkdtemp()
+        make_course_xml(cls.data_dir, COURSE_DIR, DEFAULT_COURSE_SHAPE)
+        cls.num_blocks = course_block_count(DEFAULT_COURSE_SHAPE)
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.data_dir, ignore_errors=True)
+        super(ModulestoreBenchmarks, cls).tearDownClass()
+
+    def setUp(self):
+        super(ModulestoreBenchmarks, self).setUp()
+        self.recorder = BenchmarkRecorder('modulestore')
+
+    @ddt.data(*MIXED_MODULESTORE_SETUPS)
+    def test_benchmarks(self, store_builder):
+        store_name = SHORT_NAME_MAP[store_builder]
+        with store_builder.build() as (contentstore, store):
+            course_key = store.make_course_key('perf', 'course', 'run')
+
+            with self.recorder.timer('import_xml', store_name, num_blocks=self.num_blocks):
+                import_course_from_xml(
+                    store,
+                    USER_ID,
+                    self.data_dir,
+                    source_dirs=[COURSE_DIR],
+                    static_content_store=contentstore,
+                    target_id=course_key,
+                    create_if_not_present=True,
+                    raise_on_failure=True,
+                )
+
+            self._benchmark_reads(store, store_name, course_key)
+            self._benchmark_writes(store, store_name, course_key)
+
+    def _benchmark_reads(self, store, store_name, course_key):
+        """
+        Times get_course, get_items and get_item.
+        """
+        for depth in (0, 1, 2, None):
+            self.recorder.repeat(
+                'get_course', store_name, lambda depth=depth: self._get_course_tree(store, course_key, depth),
+                READ_REPEAT, depth=depth,
+            )
+
+        for qualifiers in ({'category': 'problem'}, {'category': 'vertical'}, {'name': 'block_5_5_5_5'}):
+            self.recorder.repeat(
+                'get_items', store_name,
+                lambda qualifiers=qualifiers: store.get_items(course_key, qualifiers=qualifiers),
+                READ_REPEAT, qualifiers=qualifiers,
+            )
+        self.recorder.repeat(
+            'get_items', store_name,
+            lambda: store.get_items(course_key, qualifiers={'category': 'sequential'}, settings={'graded': True}),
+            READ_REPEAT, qualifiers={'category': 'sequential'}, settings={'graded': True},
+        )
+
+        deep_block_key = course_key.make_usage_key('problem', 'block_9_9_9_7')
+        self.recorder.repeat(
+            'get_item', store_name, lambda: store.get_item(deep_block_key).data, READ_REPEAT, depth=0,
+        )
+        self.recorder.repeat(
+            'get_item', store_name, lambda: store.get_item(deep_block_key).get_parent().get_parent(), READ_REPEAT,
+            depth=0, parents=2,
+        )
+
+    def _benchmark_writes(self, store, store_name, course_key):
+        """
+        Times bulk_operations writes and publish.
+        """
+        vertical_key = course_key.make_usage_key('vertical', 'block_0_0_0')
+        with store.branch_setting(ModuleStoreEnum.Branch.draft_preferred, course_key):
+            with self.recorder.timer('bulk_operations_create', store_name, num_blocks=BULK_WRITE_BLOCKS):
+                with store.bulk_operations(course_key):
+                    for index in xrange(BULK_WRITE_BLOCKS):
+                        store.create_child(
+                            USER_ID, vertical_key, 'html', block_id='bulk_{}'.format(index),
+                            fields={'data': u'<p>Block {}</p>'.format(index)},
+                        )
+
+            with self.recorder.timer('bulk_operations_update', store_name, num_blocks=BULK_WRITE_BLOCKS):
+                with store.bulk_operations(course_key):
+                    for index in xrange(BULK_WRITE_BLOCKS):
+                        block = store.get_item(course_key.make_usage_key('html', 'bulk_{}'.format(index)))
+                        block.display_name = u'Updated {}'.format(index)
+                        store.update_item(block, USER_ID)
+
+            chapter_key = course_key.make_usage_key('chapter', 'block_0')
+            with self.recorder.timer('publish', store_name, category='chapter'):
+                store.publish(chapter_key, USER_ID)
+
+            with self.recorder.timer('publish', store_name, category='vertical'):
+                store.publish(vertical_key, USER_ID)
+
+    @staticmethod
+    def _get_course_tree(store, course_key, depth):
+        """
+        Loads the course to the given depth and visits the loaded blocks,
+        since some stores only load blocks when they're accessed.
+        """
+        def visit(block, remaining_depth):
+            """
+            Visits the given block and its descendants up to remaining_depth.
+            """
+            if remaining_depth == 0 or not block.has_children:
+                return
+            for child in block.get_children():
+                visit(child, None if remaining_depth is None else remaining_depth - 1)
+
+        visit(store.get_course(course_key, depth=depth), depth)
@@ -80,6 +80,7 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
         self.course_id = course_entry.course_key
         self.lazy = lazy
         self.module_data = module_data
+        self.definition_loader = modulestore.get_definition_loader()
         self.default_class = default_class
         self.local_modules = {}
         self._services['library_tools'] = LibraryToolsService(modulestore)
@@ -198,6 +199,7 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
                 block_key.type,
                 definition_id,
                 convert_fields,
+                bulk_loader=self.definition_loader,
             )
         else:
             definition_loader = None
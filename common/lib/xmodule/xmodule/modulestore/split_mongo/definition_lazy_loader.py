@@ -1,6 +1,10 @@
+from collections import OrderedDict
 from opaque_keys.edx.locator import DefinitionLocator
 import copy
 
+from xmodule.modulestore.exceptions import ItemNotFoundError
+from xmodule.modulestore.split_mongo.mongo_connection import TIMER
+
 
 class DefinitionLazyLoader(object):
     """
@@ -9,16 +13,21 @@ class DefinitionLazyLoader(object):
     object doesn't force access during init but waits until client wants the
     definition. Only works if the modulestore is a split mongo store.
     """
-    def __init__(self, modulestore, course_key, block_type, definition_id, field_converter):
+    def __init__(self, modulestore, course_key, block_type, definition_id, field_converter, bulk_loader=None):
         """
         Simple placeholder for yet-to-be-fetched data
         :param modulestore: the pymongo db connection with the definitions
         :param definition_locator: the id of the record in the above to fetch
+        :param bulk_loader: the DefinitionBulkLoader to fetch through, if any. The
+            definition is queued on it so that it's fetched along with its neighbors.
         """
         self.modulestore = modulestore
         self.course_key = course_key
         self.definition_locator = DefinitionLocator(block_type, definition_id)
         self.field_converter = field_converter
+        self.bulk_loader = bulk_loader
+        if bulk_loader is not None:
+            bulk_loader.add_pending(course_key, definition_id)
 
     def fetch(self):
         """
@@ -28,5 +37,104 @@ class DefinitionLazyLoader(object):
         # get_definition may return a cached value perhaps from another course or code path
         # so, we copy the result here so that updates don't cross-pollinate nor change the cached
         # value in such a way that we can't tell that the definition's been updated.
-        definition = self.modulestore.get_definition(self.course_key, self.definition_locator.definition_id)
+        if self.bulk_loader is not None:
+            definition = self.bulk_loader.get_definition(self.course_key, self.definition_locator.definition_id)
+        else:
+            definition = self.modulestore.get_definition(self.course_key, self.definition_locator.definition_id)
         return copy.deepcopy(definition)
+
+
+class DefinitionBulkLoader(object):
+    """
+    Fetches definitions for DefinitionLazyLoaders in batches.
+
+    Each lazily loaded block queues its definition id as pending when it's
+    instantiated. The first fetch of any pending definition then loads it
+    together with the other pending definitions of the same course in a
+    single query, rather than one query per block, and memoizes the results.
+    Definitions are never changed in place (an update creates a new
+    definition id), so memoized definitions never go stale.
+
+    The split modulestore keeps one loader per request; see
+    SplitMongoModuleStore.get_definition_loader.
+
+    Each batch reports the number of definitions it fetched, and the number of
+    queries it saved compared to fetching each of them individually, through
+    the split modulestore's query timer.
+    """
+    # Maximum number of definitions fetched by a single query.
+    BATCH_SIZE = 250
+
+    def __init__(self, modulestore):
+        self.modulestore = modulestore
+        self._definitions = {}
+        # course_key -> ordered set of pending definition ids
+        self._pending = {}
+
+        # Number of definitions fetched, and the number of queries used to fetch them.
+        self.definitions_fetched = 0
+        self.round_trips = 0
+
+    @property
+    def round_trips_saved(self):
+        """
+        The number of queries saved compared to fetching each
+        fetched definition individually.
+        """
+        return self.definitions_fetched - self.round_trips
+
+    def add_pending(self, course_key, definition_id):
+        """
+        Queues the given definition to be fetched with the next batch for course_key.
+        """
+        if definition_id not in self._definitions:
+            self._pending.setdefault(course_key, OrderedDict())[definition_id] = None
+
+    def get_definition(self, course_key, definition_id):
+        """
+        Returns the given definition, respecting the active bulk operation
+        on course_key. Fetches it along with the definitions pending for
+        course_key, unless it's already been fetched.
+
+        Raises ItemNotFoundError if there is no such definition. Missing
+        pending definitions only raise once they are requested themselves.
+        """
+        # cast string to ObjectId if necessary
+        definition_id = course_key.as_object_id(definition_id)
+        if definition_id not in self._definitions:
+            self._fetch_batch(course_key, definition_id)
+        definition = self._definitions[definition_id]
+        if definition is None:
+            raise ItemNotFoundError(u'Definition: {}'.format(definition_id))
+        return definition
+
+    def _fetch_batch(self, course_key, definition_id):
+        """
+        Fetches the given definition and up to BATCH_SIZE - 1 of the most
+        recently queued definitions pending for course_key.
+        """
+        pending = self._pending.get(course_key, OrderedDict())
+        pending.pop(definition_id, None)
+        batch = [definition_id]
+        while pending and len(batch) < self.BATCH_SIZE:
+            pending_id, __ = pending.popitem()
+            if pending_id not in self._definitions:
+                batch.append(pending_id)
+
+        self.definitions_fetched += len(batch)
+        self.round_trips += 1
+        with TIMER.timer("DefinitionBulkLoader.fetch_batch", course_key) as tagger:
+            tagger.measure('definitions', len(batch))
+            tagger.measure('round_trips_saved', len(batch) - 1)
+            for definition in self.modulestore.get_definitions(course_key, batch):
+                self._definitions[definition['_id']] = definition
+        # Remember missing definitions as well, so they aren't queried again.
+        for batch_id in batch:
+            self._definitions.setdefault(batch_id, None)
+
+    def clear(self):
+        """
+        Forgets all fetched and pending definitions.
+        """
+        self._definitions.clear()
+        self._pending.clear()
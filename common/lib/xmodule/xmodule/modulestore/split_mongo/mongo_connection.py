@@ -4,10 +4,12 @@ Segregation of pymongo functions from the data modeling mechanisms for split mod
 import datetime
 import cPickle as pickle
 import math
+import threading
 import zlib
 import pymongo
 import pytz
 import re
+from collections import OrderedDict
 from contextlib import contextmanager
 from time import time
 
@@ -15,6 +17,7 @@ from time import time
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
@@ -225,28 +228,125 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+class StructureLRUCache(object):
+    """
+    A bounded, in-process, least-recently-used cache of pickled course
+    structures, keyed by structure id.
+
+    Course structures are immutable once written, so an entry never needs to be
+    invalidated; it only needs to be evicted when the cache grows past
+    ``max_size`` bytes. The size of each entry is the size of its pickled data.
+    """
+    def __init__(self, max_size=0):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._total_size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_size(self):
+        """
+        The sum of the sizes of all of the cached structures.
+        """
+        return self._total_size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Return the cached pickled structure for ``key``, marking it as the most
+        recently used entry, or None if it isn't cached.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self._entries[key] = entry
+            return entry[1]
+
+    def set(self, key, structure, size):
+        """
+        Cache the pickled ``structure`` under ``key``, evicting least recently
+        used entries until the cache fits within ``max_size``.
+
+        Returns the number of entries that were evicted. Structures that are larger
+        than ``max_size`` on their own aren't cached at all.
+        """
+        if size > self.max_size:
+            return 0
+
+        evicted = 0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_size -= previous[0]
+
+            while self._entries and self._total_size + size > self.max_size:
+                __, (evicted_size, __) = self._entries.popitem(last=False)
+                self._total_size -= evicted_size
+                evicted += 1
+
+            self._entries[key] = (size, structure)
+            self._total_size += size
+        return evicted
+
+    def clear(self):
+        """
+        Remove all entries from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._total_size = 0
+
+
+# Shared by every CourseStructureCache in this process.
+LOCAL_STRUCTURE_CACHE = StructureLRUCache()
+
+
 class CourseStructureCache(object):
     """
     Wrapper around django cache object to cache course structure objects.
     The course structures are pickled and compressed when cached.
 
+    The decompressed, pickled structures are also kept in a per-process LRU tier
+    (:data:`LOCAL_STRUCTURE_CACHE`) in front of the django cache, bounded by the
+    ``COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES`` setting. Setting it to 0 disables
+    the local tier. They're unpickled on every get, since callers modify the
+    structures they're given, e.g. when loading their blocks' definitions.
+
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
     """
     def __init__(self):
         self.cache = None
+        self.local_cache = None
         if DJANGO_AVAILABLE:
             try:
                 self.cache = get_cache('course_structure_cache')
             except InvalidCacheBackendError:
                 pass
 
+        if self.cache is not None:
+            max_size = getattr(settings, 'COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES', 0)
+            if max_size:
+                LOCAL_STRUCTURE_CACHE.max_size = max_size
+                self.local_cache = LOCAL_STRUCTURE_CACHE
+
     def get(self, key, course_context=None):
         """Pull the compressed, pickled struct data from cache and deserialize."""
         if self.cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
+            if self.local_cache is not None:
+                pickled_data = self.local_cache.get(key)
+                tagger.tag(from_local_cache=str(pickled_data is not None).lower())
+                if pickled_data is not None:
+                    tagger.tag(from_cache='true')
+                    tagger.measure('uncompressed_size', len(pickled_data))
+                    return pickle.loads(pickled_data)
+
             compressed_pickled_data = self.cache.get(key)
             tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
 
@@ -260,6 +360,7 @@ class CourseStructureCache(object):
             pickled_data = zlib.decompress(compressed_pickled_data)
             tagger.measure('uncompressed_size', len(pickled_data))
 
+            self._set_local(key, pickled_data, tagger)
             return pickle.loads(pickled_data)
 
     def set(self, key, structure, course_context=None):
@@ -277,6 +378,19 @@ class CourseStructureCache(object):
 
             # Stuctures are immutable, so we set a timeout of "never"
             self.cache.set(key, compressed_pickled_data, None)
+            self._set_local(key, pickled_data, tagger)
+
+    def _set_local(self, key, pickled_data, tagger):
+        """
+        Add ``pickled_data`` to the local tier (if enabled), and record how many
+        entries were evicted to make room for it.
+        """
+        if self.local_cache is None:
+            return
+
+        evicted = self.local_cache.set(key, pickled_data, len(pickled_data))
+        tagger.measure('local_evictions', evicted)
+        tagger.measure('local_cache_size', self.local_cache.total_size)
 
 
 class MongoConnection(object):
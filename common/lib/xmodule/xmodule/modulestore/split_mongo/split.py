@@ -85,6 +85,7 @@ from xmodule.modulestore import (
 
 from ..exceptions import ItemNotFoundError
 from .caching_descriptor_system import CachingDescriptorSystem
+from .definition_lazy_loader import DefinitionBulkLoader
 from xmodule.partitions.partitions_service import PartitionService
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
@@ -429,6 +430,9 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         if bulk_write_record.active:
             # Only query for the definitions that aren't already cached.
             for definition in bulk_write_record.definitions.values():
+                # Definitions that weren't found are cached as None.
+                if definition is None:
+                    continue
                 definition_id = definition.get('_id')
                 if definition_id in ids:
                     ids.remove(definition_id)
@@ -849,6 +853,19 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             self.request_cache.data.setdefault('course_cache', {})[course_version_guid] = system
         return system
 
+    def get_definition_loader(self):
+        """
+        Returns the DefinitionBulkLoader shared by all runtimes during this
+        request, or a new one if there's no request cache.
+        """
+        if self.request_cache is None:
+            return DefinitionBulkLoader(self)
+
+        loader = self.request_cache.data.get('definition_loader')
+        if loader is None:
+            loader = self.request_cache.data['definition_loader'] = DefinitionBulkLoader(self)
+        return loader
+
     def _clear_cache(self, course_version_guid=None):
         """
         Should only be used by testing or something which implements transactional boundary semantics.
@@ -864,6 +881,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 pass
         else:
             self.request_cache.data['course_cache'] = {}
+            self.request_cache.data.pop('definition_loader', None)
 
     def _lookup_course(self, course_key, head_validation=True):
         """
@@ -16,6 +16,7 @@ from xmodule.contentstore.mongo import MongoContentStore
 from xmodule.contentstore.content import StaticContent
 from xmodule.exceptions import NotFoundError
 import ddt
+from mock import patch
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 
 log = logging.getLogger(__name__)
@@ -25,6 +26,23 @@ PORT = MONGO_PORT_NUM
 DB = 'test_mongo_%s' % uuid4().hex[:5]
 
 
+class DictCache(object):
+    """
+    A cache over a dict, for testing.
+    """
+    def __init__(self):
+        self.cache = {}
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value):
+        self.cache[key] = value
+
+    def delete(self, key):
+        self.cache.pop(key, None)
+
+
 @ddt.ddt
 class TestContentstore(unittest.TestCase):
     """
@@ -50,13 +68,13 @@ class TestContentstore(unittest.TestCase):
             del CourseLocator.deprecated
         return super(TestContentstore, cls).tearDownClass()
 
-    def set_up_assets(self, deprecated):
+    def set_up_assets(self, deprecated, metadata_cache=None):
         """
         Setup contentstore w/ proper overriding of deprecated.
         """
         # since MongoModuleStore and MongoContentStore are basically assumed to be together, create this class
         # as well
-        self.contentstore = MongoContentStore(HOST, DB, port=PORT)
+        self.contentstore = MongoContentStore(HOST, DB, port=PORT, metadata_cache=metadata_cache)
         self.addCleanup(self.contentstore._drop_database)  # pylint: disable=protected-access
 
         AssetLocator.deprecated = deprecated
@@ -138,6 +156,8 @@ class TestContentstore(unittest.TestCase):
             for filename in self.course1_files:
                 filepath = path.Path(root_dir / filename)
                 self.assertTrue(filepath.isfile(), "{} is not a file".format(filepath))
+                with open("{}/static/{}".format(DATA_DIR, filename), "rb") as f:
+                    self.assertEqual(filepath.bytes(), f.read())
             for filename in self.course2_files:
                 if filename not in self.course1_files:
                     filepath = path.Path(root_dir / filename)
@@ -177,6 +197,50 @@ class TestContentstore(unittest.TestCase):
             self.contentstore.set_attr(asset_key, 'locked', not prelocked)
             self.assertEqual(self.contentstore.get_attr(asset_key, 'locked', False), not prelocked)
 
+    @ddt.data(True, False)
+    def test_find_metadata(self, deprecated):
+        """
+        Test finding the metadata of assets, without their data
+        """
+        self.set_up_assets(deprecated, metadata_cache=DictCache())
+        for filename in self.course1_files:
+            asset_key = self.course1_key.make_asset_key('asset', filename)
+            content = self.contentstore.find(asset_key, as_stream=True)
+            with patch.object(self.contentstore.fs, 'get') as mock_get:
+                metadata = self.contentstore.find_metadata(asset_key)
+            self.assertFalse(mock_get.called)
+            self.assertEqual(metadata.location, asset_key)
+            for propname in ['content_type', 'last_modified_at', 'length', 'locked', 'content_digest']:
+                self.assertEqual(getattr(metadata, propname), getattr(content, propname))
+
+        unknown_asset = self.course1_key.make_asset_key('asset', 'no_such_file.gif')
+        with self.assertRaises(NotFoundError):
+            self.contentstore.find_metadata(unknown_asset)
+        self.assertIsNone(self.contentstore.find_metadata(unknown_asset, throw_on_not_found=False))
+
+    @ddt.data(True, False)
+    def test_find_metadata_cached(self, deprecated):
+        """
+        Test that the metadata of assets is cached, and invalidated when they change
+        """
+        self.set_up_assets(deprecated, metadata_cache=DictCache())
+        asset_key = self.course1_key.make_asset_key('asset', self.course1_files[0])
+        self.contentstore.find_metadata(asset_key)
+        with patch.object(self.contentstore, 'fs_files', wraps=self.contentstore.fs_files) as mock_fs_files:
+            self.assertFalse(self.contentstore.find_metadata(asset_key).locked)
+            self.assertFalse(mock_fs_files.find_one.called)
+
+        self.contentstore.set_attr(asset_key, 'locked', True)
+        self.assertTrue(self.contentstore.find_metadata(asset_key).locked)
+
+        digest = self.contentstore.find_metadata(asset_key).content_digest
+        self.save_asset(self.course1_files[1], asset_key, self.course1_files[0], False)
+        self.assertNotEqual(self.contentstore.find_metadata(asset_key).content_digest, digest)
+
+        self.contentstore.delete(asset_key)
+        with self.assertRaises(NotFoundError):
+            self.contentstore.find_metadata(asset_key)
+
     @ddt.data(True, False)
     def test_copy_assets(self, deprecated):
         """
@@ -196,6 +260,24 @@ class TestContentstore(unittest.TestCase):
         __, count = self.contentstore.get_all_content_for_course(dest_course)
         self.assertEqual(count, len(self.course1_files))
 
+    @ddt.data(True, False)
+    @patch('xmodule.contentstore.mongo.CHUNK_COPY_BATCH_SIZE', 1)
+    def test_copy_multiple_chunk_assets(self, deprecated):
+        """
+        copy_all_course_assets copies assets of several GridFS chunks whole
+        """
+        self.set_up_assets(deprecated)
+        data = ''.join(chr(index % 256) for index in xrange(600 * 1024))
+        asset_key = self.course1_key.make_asset_key('asset', 'large.bin')
+        self.contentstore.save(StaticContent(asset_key, 'large.bin', 'application/octet-stream', data))
+        dest_course = CourseLocator('test', 'destination', 'copy')
+
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        source = self.contentstore.find(asset_key)
+        copied = self.contentstore.find(dest_course.make_asset_key('asset', 'large.bin'))
+        self.assertEqual(copied.data, data)
+        self.assertEqual(copied.content_digest, source.content_digest)
+
     @ddt.data(True, False)
     def test_delete_assets(self, deprecated):
         """
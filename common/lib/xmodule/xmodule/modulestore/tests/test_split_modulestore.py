@@ -1,7 +1,7 @@
 """
     Test split modulestore w/o using any django stuff.
 """
-from mock import patch
+from mock import ANY, Mock, patch
 import datetime
 from importlib import import_module
 from path import Path as path
@@ -11,9 +11,11 @@ import unittest
 import uuid
 
 import ddt
+from bson.objectid import ObjectId
 from contracts import contract
 from nose.plugins.attrib import attr
 from django.core.cache import caches, InvalidCacheBackendError
+from django.test.utils import override_settings
 
 from openedx.core.lib import tempdir
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict
@@ -32,6 +34,8 @@ from xmodule.fields import Date, Timedelta
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.definition_lazy_loader import DefinitionBulkLoader, DefinitionLazyLoader
+from xmodule.modulestore.split_mongo.mongo_connection import LOCAL_STRUCTURE_CACHE, StructureLRUCache
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 from xmodule.modulestore.tests.utils import mock_tab_from_json
@@ -943,10 +947,12 @@ class TestCourseStructureCache(SplitModuleTest):
         # is a dummy cache during testing
         self.cache = caches['default']
 
-        # make sure we clear the cache before every test...
+        # make sure we clear the caches before every test...
         self.cache.clear()
+        LOCAL_STRUCTURE_CACHE.clear()
         # ... and after
         self.addCleanup(self.cache.clear)
+        self.addCleanup(LOCAL_STRUCTURE_CACHE.clear)
 
         # make a new course:
         self.user = random.getrandbits(32)
@@ -987,6 +993,48 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @override_settings(COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES=10 * 1024 * 1024)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_local_structure_cache(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # the pickled structure is kept in-process, so even clearing the
+        # shared cache doesn't force another mongo call
+        self.cache.clear()
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+
+        # each get returns its own copy of the structure
+        self.assertEqual(cached_structure, not_cached_structure)
+        self.assertIsNot(cached_structure, self._get_structure(self.new_course))
+
+    @override_settings(COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES=10 * 1024 * 1024)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_local_structure_cache_non_lazy_load(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+
+        for __ in range(2):
+            modulestore().get_course(self.new_course.id, depth=None, lazy=False)
+
+            # loading the definitions of the course's blocks doesn't change the cached structure
+            structure = self._get_structure(self.new_course)
+            for block in structure['blocks'].itervalues():
+                self.assertFalse(block.definition_loaded)
+        self.assertEqual(len(LOCAL_STRUCTURE_CACHE), 1)
+
+    @override_settings(COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES=0)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_local_structure_cache_disabled(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+
+        with check_mongo_calls(1):
+            self._get_structure(self.new_course)
+
+        self.assertEqual(len(LOCAL_STRUCTURE_CACHE), 0)
+
     def test_dummy_cache(self):
         with check_mongo_calls(1):
             not_cached_structure = self._get_structure(self.new_course)
@@ -1008,6 +1056,146 @@ class TestCourseStructureCache(SplitModuleTest):
         )
 
 
+class TestStructureLRUCache(unittest.TestCase):
+    """Tests for the in-process StructureLRUCache"""
+
+    def setUp(self):
+        super(TestStructureLRUCache, self).setUp()
+        self.cache = StructureLRUCache(max_size=100)
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get('missing'))
+
+    def test_set_and_get(self):
+        structure = {'_id': 'a'}
+        self.assertEqual(self.cache.set('a', structure, 10), 0)
+        self.assertIs(self.cache.get('a'), structure)
+        self.assertEqual(self.cache.total_size, 10)
+
+    def test_evicts_least_recently_used(self):
+        self.cache.set('a', {'_id': 'a'}, 40)
+        self.cache.set('b', {'_id': 'b'}, 40)
+        # touch 'a' so that 'b' becomes the least recently used entry
+        self.cache.get('a')
+        self.assertEqual(self.cache.set('c', {'_id': 'c'}, 40), 1)
+
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNotNone(self.cache.get('c'))
+        self.assertEqual(self.cache.total_size, 80)
+
+    def test_oversized_structure_not_cached(self):
+        self.cache.set('a', {'_id': 'a'}, 40)
+        self.assertEqual(self.cache.set('big', {'_id': 'big'}, 101), 0)
+        self.assertIsNone(self.cache.get('big'))
+        self.assertEqual(len(self.cache), 1)
+
+    def test_replace_entry(self):
+        self.cache.set('a', {'_id': 'a'}, 40)
+        self.cache.set('a', {'_id': 'a'}, 60)
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.total_size, 60)
+
+    def test_clear(self):
+        self.cache.set('a', {'_id': 'a'}, 40)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.total_size, 0)
+
+
+class TestDefinitionBulkLoader(unittest.TestCase):
+    """Tests for the DefinitionBulkLoader"""
+
+    def setUp(self):
+        super(TestDefinitionBulkLoader, self).setUp()
+        self.course_key = CourseLocator('org', 'course', 'run')
+        self.definitions = {
+            definition_id: {'_id': definition_id, 'fields': {'data': definition_id}}
+            for definition_id in (ObjectId() for __ in range(5))
+        }
+        self.store = Mock()
+        self.store.get_definitions.side_effect = lambda course_key, ids: [
+            self.definitions[definition_id] for definition_id in ids if definition_id in self.definitions
+        ]
+        self.loader = DefinitionBulkLoader(self.store)
+
+    def _lazy_loader(self, definition_id):
+        """
+        Returns a DefinitionLazyLoader for the given definition which fetches through self.loader.
+        """
+        return DefinitionLazyLoader(self.store, self.course_key, 'html', definition_id, None, self.loader)
+
+    def test_pending_definitions_fetched_together(self):
+        lazy_loaders = [self._lazy_loader(definition_id) for definition_id in self.definitions]
+        for lazy_loader in lazy_loaders:
+            definition = lazy_loader.fetch()
+            self.assertEqual(definition, self.definitions[lazy_loader.definition_locator.definition_id])
+
+        self.assertEqual(self.store.get_definitions.call_count, 1)
+        self.assertFalse(self.store.get_definition.called)
+        self.assertEqual(self.loader.definitions_fetched, 5)
+        self.assertEqual(self.loader.round_trips, 1)
+        self.assertEqual(self.loader.round_trips_saved, 4)
+
+    def test_fetch_returns_copy(self):
+        definition_id = next(iter(self.definitions))
+        definition = self._lazy_loader(definition_id).fetch()
+        definition['fields']['data'] = 'changed'
+        self.assertEqual(self._lazy_loader(definition_id).fetch(), self.definitions[definition_id])
+        self.assertEqual(self.store.get_definitions.call_count, 1)
+
+    def test_batch_size(self):
+        with patch.object(DefinitionBulkLoader, 'BATCH_SIZE', 2):
+            for definition_id in self.definitions:
+                self._lazy_loader(definition_id).fetch()
+        self.assertEqual(self.loader.round_trips, 3)
+        self.assertEqual(self.loader.round_trips_saved, 2)
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.dog_stats_api')
+    def test_round_trips_saved_reported(self, mock_dog_stats_api):
+        for definition_id in self.definitions:
+            self._lazy_loader(definition_id)
+        self.loader.get_definition(self.course_key, next(iter(self.definitions)))
+
+        mock_dog_stats_api.histogram.assert_any_call(
+            'xmodule.modulestore.split_mongo.mongo_connection.DefinitionBulkLoader.fetch_batch.round_trips_saved',
+            4,
+            timestamp=ANY,
+            tags=ANY,
+            sample_rate=ANY,
+        )
+
+    def test_missing_definition(self):
+        missing_id = ObjectId()
+        with self.assertRaises(ItemNotFoundError):
+            self._lazy_loader(missing_id).fetch()
+        with self.assertRaises(ItemNotFoundError):
+            self._lazy_loader(missing_id).fetch()
+        self.assertEqual(self.loader.round_trips, 1)
+
+    def test_missing_pending_definition(self):
+        missing_loader = self._lazy_loader(ObjectId())
+        lazy_loaders = [self._lazy_loader(definition_id) for definition_id in self.definitions]
+        # A missing definition fetched along with the requested one doesn't fail its fetch.
+        for lazy_loader in lazy_loaders:
+            definition = lazy_loader.fetch()
+            self.assertEqual(definition, self.definitions[lazy_loader.definition_locator.definition_id])
+        with self.assertRaises(ItemNotFoundError):
+            missing_loader.fetch()
+        self.assertEqual(self.loader.round_trips, 1)
+
+    def test_pending_per_course(self):
+        other_course_key = CourseLocator('org', 'other', 'run')
+        definition_id, other_definition_id = list(self.definitions)[:2]
+        self._lazy_loader(definition_id)
+        DefinitionLazyLoader(self.store, other_course_key, 'html', other_definition_id, None, self.loader)
+
+        self.loader.get_definition(self.course_key, definition_id)
+        self.store.get_definitions.assert_called_once_with(self.course_key, [definition_id])
+        self.loader.get_definition(other_course_key, other_definition_id)
+        self.assertEqual(self.loader.round_trips, 2)
+
+
 class SplitModuleItemTests(SplitModuleTest):
     '''
     Item read tests including inheritance
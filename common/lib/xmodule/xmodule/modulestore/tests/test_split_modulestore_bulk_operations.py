@@ -465,6 +465,15 @@ class TestBulkWriteMixinFindMethods(TestBulkWriteMixin):
         self.bulk._end_bulk_operation(self.course_key)
         self.assertFalse(self.conn.insert_definition.called)
 
+    def test_get_definitions_after_missing_definition(self):
+        self.bulk._begin_bulk_operation(self.course_key)
+        self.conn.get_definition.return_value = None
+        self.assertIsNone(self.bulk.get_definition(self.course_key, 'missing'))
+
+        db_definitions = [{'db': 'definition', '_id': 1}]
+        self.conn.get_definitions.return_value = db_definitions
+        self.assertEqual(self.bulk.get_definitions(self.course_key, [1]), db_definitions)
+
     def test_no_bulk_find_structures_derived_from(self):
         ids = [Mock(name='id')]
         self.conn.find_structures_derived_from.return_value = [MagicMock(name='result')]
@@ -1,6 +1,7 @@
 """
 Blocks API Transformer
 """
+from lms.djangoapps.course_blocks.transformers.visibility import VisibilityTransformer
 from openedx.core.djangoapps.content.block_structure.transformer import BlockStructureTransformer
 
 from .block_counts import BlockCountsTransformer
@@ -38,6 +39,22 @@ class BlocksAPITransformer(BlockStructureTransformer):
     def name(cls):
         return "blocks_api"
 
+    @classmethod
+    def collected_data_dependencies(cls):
+        """
+        Returns the names of the contained transformers, whose collected
+        data this transformer reads, and of VisibilityTransformer, whose
+        collected data the Course Blocks API serializes.
+        """
+        return {
+            cls.name(),
+            StudentViewTransformer.name(),
+            BlockCountsTransformer.name(),
+            BlockDepthTransformer.name(),
+            BlockNavigationTransformer.name(),
+            VisibilityTransformer.name(),
+        }
+
     @classmethod
     def collect(cls, block_structure):
         """
@@ -13,6 +13,7 @@ Note: The access control logic in this file does NOT check for enrollment in
 import logging
 from datetime import datetime
 
+import crum
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from pytz import UTC
@@ -33,12 +34,14 @@ from courseware.access_utils import (
     in_preview_mode,
     check_course_open_for_learner,
 )
-from courseware.masquerade import get_masquerade_role, is_masquerading_as_student
+from courseware.masquerade import get_course_masquerade, get_masquerade_role, is_masquerading_as_student
 from lms.djangoapps.ccx.custom_exception import CCXLocatorValidationException
 from lms.djangoapps.ccx.models import CustomCourseForEdX
 from mobile_api.models import IgnoreMobileAvailableFlagConfig
+from openedx.core.djangoapps import monitoring_utils
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from openedx.core.djangoapps.external_auth.models import ExternalAuthMap
+import request_cache
 from student import auth
 from student.models import CourseEnrollmentAllowed
 from student.roles import (
@@ -64,6 +67,14 @@ from xmodule.x_module import XModule
 
 log = logging.getLogger(__name__)
 
+# Name of the request cache holding the access decisions made during the current request.
+ACCESS_CACHE_NAME = u'courseware.access.has_access'
+
+# Custom metrics counting, per request, the access decisions evaluated
+# and the ones answered from the request cache.
+ACCESS_EVALUATIONS_METRIC = u'courseware.access.evaluations'
+ACCESS_CACHE_HITS_METRIC = u'courseware.access.cache_hits'
+
 
 def has_ccx_coach_role(user, course_key):
     """
@@ -128,6 +139,28 @@ def has_access(user, action, obj, course_key=None):
     if not user:
         user = AnonymousUser()
 
+    # XModules delegate to their descriptors, whose decisions are cached.
+    if isinstance(obj, XModule):
+        return _has_access_xmodule(user, action, obj, course_key)
+
+    cache_key = _access_cache_key(user, action, obj, course_key)
+    if cache_key is not None:
+        access_cache = request_cache.get_cache(ACCESS_CACHE_NAME)
+        if cache_key in access_cache:
+            monitoring_utils.increment(ACCESS_CACHE_HITS_METRIC)
+            return access_cache[cache_key]
+
+    monitoring_utils.increment(ACCESS_EVALUATIONS_METRIC)
+    access = _evaluate_access(user, action, obj, course_key)
+    if cache_key is not None:
+        access_cache[cache_key] = access
+    return access
+
+
+def _evaluate_access(user, action, obj, course_key):
+    """
+    Evaluates has_access for the given arguments, without caching.
+    """
     # Preview mode is only accessible by staff.
     if in_preview_mode() and course_key:
         if not has_staff_access_to_preview_mode(user, course_key):
@@ -144,9 +177,6 @@ def has_access(user, action, obj, course_key=None):
     if isinstance(obj, ErrorDescriptor):
         return _has_access_error_desc(user, action, obj, course_key)
 
-    if isinstance(obj, XModule):
-        return _has_access_xmodule(user, action, obj, course_key)
-
     # NOTE: any descriptor access checkers need to go above this
     if isinstance(obj, XBlock):
         return _has_access_descriptor(user, action, obj, course_key)
@@ -166,6 +196,48 @@ def has_access(user, action, obj, course_key=None):
                     .format(type(obj)))
 
 
+def _access_cache_key(user, action, obj, course_key):
+    """
+    Returns the key of the decision of has_access for the given arguments
+    in the request cache, or None if the decision isn't cached.
+
+    Decisions are only cached while handling a request, since the request
+    cache is only cleared between requests, and only for blocks and for
+    course keys, whose decisions are made again for each block rendered.
+
+    Blocks are identified by their location and the user they are bound
+    to, if any, since field overrides for that user may change their
+    decisions.  Masquerading changes decisions too, so the masquerade
+    settings for the course are part of the key.
+    """
+    if crum.get_current_request() is None:
+        return None
+
+    if isinstance(obj, (CourseDescriptor, CourseOverview)):
+        return None
+    elif isinstance(obj, XBlock):
+        obj_key = (obj.location, obj.scope_ids.user_id)
+        obj_course_key = course_key or obj.location.course_key
+    elif isinstance(obj, CourseKey):
+        obj_key = obj
+        obj_course_key = obj
+    else:
+        return None
+
+    return (_user_cache_key(user, obj_course_key), action, obj_key, course_key)
+
+
+def _user_cache_key(user, course_key):
+    """
+    Returns the part of the keys of cached access decisions identifying the
+    given user and their masquerade settings, if any, in the given course.
+    """
+    masquerade = get_course_masquerade(user, course_key)
+    if masquerade is None:
+        return user.id, None
+    return user.id, (masquerade.role, masquerade.user_partition_id, masquerade.group_id, masquerade.user_name)
+
+
 def has_staff_access_to_preview_mode(user, course_key):
     """
     Checks if given user can access course in preview mode.
@@ -408,6 +480,35 @@ def _has_group_access(descriptor, user, course_key):
         log.warning("Group access check excludes all students, access will be denied.", exc_info=True)
         return ACCESS_DENIED
 
+    if not merged_access:
+        return ACCESS_GRANTED
+
+    # Merged rules only ever narrow down the tree, so blocks which don't add
+    # rules to their ancestor's share its decision: cache it by the rules.
+    if crum.get_current_request() is None:
+        return _has_merged_group_access(descriptor, merged_access, user, course_key)
+
+    cache_key = (
+        _user_cache_key(user, course_key),
+        'group_access',
+        course_key,
+        tuple(sorted(
+            (partition_id, tuple(sorted(group_ids)) if group_ids else group_ids)
+            for partition_id, group_ids in merged_access.iteritems()
+        )),
+    )
+    access_cache = request_cache.get_cache(ACCESS_CACHE_NAME)
+    if cache_key not in access_cache:
+        access_cache[cache_key] = _has_merged_group_access(descriptor, merged_access, user, course_key)
+    return access_cache[cache_key]
+
+
+def _has_merged_group_access(descriptor, merged_access, user, course_key):
+    """
+    Returns whether `user` has sufficient group memberships to satisfy
+    the given merged group access rules of `descriptor`.
+    """
+
     # resolve the partition IDs in group_access to actual
     # partition objects, skipping those which contain empty group directives.
     # If a referenced partition could not be found, it will be denied
@@ -14,6 +14,9 @@ for specific scopes. The individual classes provide the knowledge of what are th
 pieces of information for each scope, and thus how to cache, prefetch, and create new field data
 entries.
 
+MultiUserFieldDataCache: A prefetch cache of the data of many users, which
+    hands out a :class:`~FieldDataCache` for each of them.
+
 UserStateCache: A cache for Scope.user_state
 UserStateSummaryCache: A cache for Scope.user_state_summary
 PreferencesCache: A cache for Scope.preferences
@@ -21,10 +24,12 @@ UserInfoCache: A cache for Scope.user_info
 DjangoOrmFieldCache: A base-class for single-row-per-field caches.
 """
 
+import itertools
 import json
 import logging
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict, namedtuple
+from operator import attrgetter
 
 from contracts import contract, new_contract
 from django.db import DatabaseError
@@ -39,7 +44,13 @@ from xblock.runtime import KeyValueStore
 from courseware.user_state_client import DjangoXBlockUserStateClient
 from xmodule.modulestore.django import modulestore
 
-from .models import StudentModule, XModuleStudentInfoField, XModuleStudentPrefsField, XModuleUserStateSummaryField
+from .models import (
+    StudentModule,
+    XModuleStudentInfoField,
+    XModuleStudentPrefsField,
+    XModuleUserStateSummaryField,
+    chunks
+)
 
 log = logging.getLogger(__name__)
 
@@ -368,6 +379,17 @@ class UserStateCache(object):
         for user_state in block_field_state:
             self._cache[user_state.block_key] = user_state.state
 
+    def cache_states(self, block_states):
+        """
+        Load the supplied, already fetched, field states into this cache.
+
+        Arguments:
+            block_states (dict): A dict mapping usage keys to dicts
+                of field names to values.
+        """
+        for block_key, state in block_states.iteritems():
+            self._cache[block_key] = dict(state)
+
     @contract(kvs_key=DjangoKeyValueStore.Key)
     def set(self, kvs_key, value):
         """
@@ -724,14 +746,16 @@ class FieldDataCache(object):
         self.scorable_locations = set()
         self.add_descriptors_to_cache(descriptors)
 
-    def add_descriptors_to_cache(self, descriptors):
+    def add_descriptors_to_cache(self, descriptors, cached_scopes=()):
         """
         Add all `descriptors` to this FieldDataCache.
+
+        Fields in `cached_scopes` are assumed to be cached already.
         """
         if self.user.is_authenticated():
             self.scorable_locations.update(desc.location for desc in descriptors if desc.has_score)
             for scope, fields in self._fields_to_cache(descriptors).items():
-                if scope not in self.cache:
+                if scope not in self.cache or scope in cached_scopes:
                     continue
 
                 self.cache[scope].cache_fields(fields, descriptors, self.asides)
@@ -748,33 +772,7 @@ class FieldDataCache(object):
                 should be cached
         """
 
-        def get_child_descriptors(descriptor, depth, descriptor_filter):
-            """
-            Return a list of all child descriptors down to the specified depth
-            that match the descriptor filter. Includes `descriptor`
-
-            descriptor: The parent to search inside
-            depth: The number of levels to descend, or None for infinite depth
-            descriptor_filter(descriptor): A function that returns True
-                if descriptor should be included in the results
-            """
-            if descriptor_filter(descriptor):
-                descriptors = [descriptor]
-            else:
-                descriptors = []
-
-            if depth is None or depth > 0:
-                new_depth = depth - 1 if depth is not None else depth
-
-                for child in descriptor.get_children() + descriptor.get_required_module_descriptors():
-                    descriptors.extend(get_child_descriptors(child, new_depth, descriptor_filter))
-
-            return descriptors
-
-        with modulestore().bulk_operations(descriptor.location.course_key):
-            descriptors = get_child_descriptors(descriptor, depth, descriptor_filter)
-
-        self.add_descriptors_to_cache(descriptors)
+        self.add_descriptors_to_cache(_get_descendent_descriptors(descriptor, depth, descriptor_filter))
 
     @classmethod
     def cache_for_descriptor_descendents(cls, course_id, user, descriptor, depth=None,
@@ -793,7 +791,8 @@ class FieldDataCache(object):
         cache.add_descriptor_descendents(descriptor, depth, descriptor_filter)
         return cache
 
-    def _fields_to_cache(self, descriptors):
+    @staticmethod
+    def _fields_to_cache(descriptors):
         """
         Returns a map of scopes to fields in that scope that should be cached
         """
@@ -930,6 +929,149 @@ class FieldDataCache(object):
         return sum(len(cache) for cache in self.cache.values())
 
 
+class MultiUserFieldDataCache(object):
+    """
+    A cache of django model objects needed to supply the data for a
+    module and its descendants for many users, for operations on the
+    modules of many users at once.
+
+    The Scope.user_state data of all of the users is read with a query
+    per chunk of users and blocks, rather than with a query per user,
+    and the Scope.user_state_summary data, which is the same for all
+    users, is read once.  The data of other scopes is read per user.
+    """
+    # Scopes whose data is read for all of the users at once.
+    PREFETCHED_SCOPES = (Scope.user_state, Scope.user_state_summary)
+
+    # Number of users, and number of blocks, whose data is read per
+    # query.  Together, they are kept within the limit of sqlite3 on
+    # the number of parameters of a single query.
+    USERS_CHUNK_SIZE = 200
+    BLOCKS_CHUNK_SIZE = 500
+
+    def __init__(self, descriptors, course_id, users, asides=None, read_only=False):
+        """
+        Arguments
+        descriptors: A list of XModuleDescriptors.
+        course_id: The id of the current course
+        users: The users for which to cache data
+        asides: The list of aside types to load, or None to prefetch no asides.
+        read_only: We should not perform writes (they become a no-op).
+        """
+        assert isinstance(course_id, CourseKey)
+        self.descriptors = descriptors
+        self.course_id = course_id
+        self.asides = asides
+        self.read_only = read_only
+
+        users = [user for user in users if user.is_authenticated()]
+        self._user_ids = set(user.id for user in users)
+        self._user_states = defaultdict(dict)
+        self._user_state_summary_cache = UserStateSummaryCache(self.course_id)
+
+        fields = FieldDataCache._fields_to_cache(descriptors)  # pylint: disable=protected-access
+        if users and Scope.user_state_summary in fields:
+            self._user_state_summary_cache.cache_fields(
+                fields[Scope.user_state_summary], descriptors, self.asides or [],
+            )
+        if users and Scope.user_state in fields:
+            self._cache_user_states(users, _all_usage_keys(descriptors, self.asides or []))
+
+    @classmethod
+    def cache_for_descriptor_descendents(cls, course_id, users, descriptor, depth=None,
+                                         descriptor_filter=lambda descriptor: True,
+                                         asides=None, read_only=False):
+        """
+        Returns a MultiUserFieldDataCache for the given users, for the
+        descriptor and its descendants, as selected by
+        FieldDataCache.cache_for_descriptor_descendents.
+        """
+        return cls(
+            _get_descendent_descriptors(descriptor, depth, descriptor_filter),
+            course_id,
+            users,
+            asides=asides,
+            read_only=read_only,
+        )
+
+    def for_user(self, user):
+        """
+        Returns a FieldDataCache of the given user's data.
+
+        The Scope.user_state data of the FieldDataCache is read when this
+        MultiUserFieldDataCache is created, so it doesn't include changes
+        made by other FieldDataCaches since.  If the user isn't one of
+        the users this cache was created for, all of their data is read.
+        """
+        if user.id not in self._user_ids:
+            return FieldDataCache(
+                self.descriptors, self.course_id, user, asides=self.asides, read_only=self.read_only,
+            )
+
+        field_data_cache = FieldDataCache([], self.course_id, user, asides=self.asides, read_only=self.read_only)
+        field_data_cache.cache[Scope.user_state].cache_states(self._user_states[user.id])
+        field_data_cache.cache[Scope.user_state_summary] = self._user_state_summary_cache
+        field_data_cache.add_descriptors_to_cache(self.descriptors, cached_scopes=self.PREFETCHED_SCOPES)
+        return field_data_cache
+
+    def _cache_user_states(self, users, usage_keys):
+        """
+        Reads the stored states of the given users for the given
+        usage keys, as read by DjangoXBlockUserStateClient.get_many.
+        """
+        course_key_func = attrgetter('course_key')
+        by_course = itertools.groupby(sorted(usage_keys, key=course_key_func), course_key_func)
+        for course_key, course_usage_keys in by_course:
+            course_usage_keys = list(course_usage_keys)
+            for users_chunk in chunks(users, self.USERS_CHUNK_SIZE):
+                for usage_keys_chunk in chunks(course_usage_keys, self.BLOCKS_CHUNK_SIZE):
+                    student_modules = StudentModule.objects.filter(
+                        student_id__in=[user.id for user in users_chunk],
+                        course_id=course_key,
+                        module_state_key__in=usage_keys_chunk,
+                    ).values_list('student_id', 'course_id', 'module_state_key', 'state')
+                    for user_id, module_course_id, module_state_key, state in student_modules:
+                        # A state of None means the user never looked at the block,
+                        # and the empty dict that its state was deleted.
+                        state = json.loads(state) if state is not None else {}
+                        if state:
+                            usage_key = module_state_key.map_into_course(module_course_id)
+                            self._user_states[user_id][usage_key] = state
+
+
+def _get_descendent_descriptors(descriptor, depth=None, descriptor_filter=lambda descriptor: True):
+    """
+    Return a list of all descendant descriptors of `descriptor`, down to
+    the specified depth, that match the descriptor filter, within a bulk
+    operation on the course.  Includes `descriptor`.
+
+    descriptor: The parent to search inside
+    depth: The number of levels to descend, or None for infinite depth
+    descriptor_filter(descriptor): A function that returns True
+        if descriptor should be included in the results
+    """
+    def get_child_descriptors(descriptor, depth, descriptor_filter):
+        """
+        Return a list of all child descriptors down to the specified depth
+        that match the descriptor filter. Includes `descriptor`
+        """
+        if descriptor_filter(descriptor):
+            descriptors = [descriptor]
+        else:
+            descriptors = []
+
+        if depth is None or depth > 0:
+            new_depth = depth - 1 if depth is not None else depth
+
+            for child in descriptor.get_children() + descriptor.get_required_module_descriptors():
+                descriptors.extend(get_child_descriptors(child, new_depth, descriptor_filter))
+
+        return descriptors
+
+    with modulestore().bulk_operations(descriptor.location.course_key):
+        return get_child_descriptors(descriptor, depth, descriptor_filter)
+
+
 class ScoresClient(object):
     """
     Basic client interface for retrieving Score information.
@@ -988,6 +1130,29 @@ class ScoresClient(object):
         client.fetch_scores(scorable_locations)
         return client
 
+    @classmethod
+    def create_for_users(cls, course_id, user_ids, scorable_locations):
+        """
+        Create a ScoresClient for each of the given users, keyed by user id,
+        with pre-fetched data for the given locations read in a single query.
+        """
+        clients = {user_id: cls(course_id, user_id) for user_id in user_ids}
+        scores_qset = StudentModule.objects.filter(
+            student_id__in=clients.keys(),
+            course_id=course_id,
+            module_state_key__in=set(scorable_locations),
+        )
+        for user_id, location, correct, total, created in scores_qset.values_list(
+                'student_id', 'module_state_key', 'grade', 'max_grade', 'created',
+        ):
+            # See fetch_scores for why the course key info is added back in.
+            clients[user_id]._locations_to_scores[location.map_into_course(course_id)] = (  # pylint: disable=protected-access
+                cls.Score(correct, total, created)
+            )
+        for client in clients.itervalues():
+            client._has_fetched = True  # pylint: disable=protected-access
+        return clients
+
 
 # @contract(user_id=int, usage_key=UsageKey, score="number|None", max_score="number|None")
 def set_score(user_id, usage_key, score, max_score):
@@ -29,6 +29,7 @@ from xblock.runtime import KvsFieldData
 import static_replace
 from capa.xqueue_interface import XQueueInterface
 from courseware.access import get_user_role, has_access
+from courseware.access_utils import in_preview_mode
 from courseware.entrance_exams import user_can_skip_entrance_exam, user_has_passed_entrance_exam
 from courseware.masquerade import (
     MasqueradingKeyValueStore,
@@ -41,15 +42,21 @@ from edxmako.shortcuts import render_to_string
 from eventtracking import tracker
 from lms.djangoapps.completion.models import BlockCompletion
 from lms.djangoapps.completion import waffle as completion_waffle
+from lms.djangoapps.course_blocks.api import COURSE_BLOCK_ACCESS_TRANSFORMERS, get_course_blocks
 from lms.djangoapps.grades.signals.signals import SCORE_PUBLISHED
 from lms.djangoapps.lms_xblock.field_data import LmsFieldData
 from lms.djangoapps.lms_xblock.models import XBlockAsidesConfig
 from lms.djangoapps.lms_xblock.runtime import LmsModuleSystem
 from lms.djangoapps.verify_student.services import VerificationService
 from openedx.core.djangoapps.bookmarks.services import BookmarksService
+from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
 from openedx.core.djangoapps.crawlers.models import CrawlersConfig
 from openedx.core.djangoapps.credit.services import CreditService
-from openedx.core.djangoapps.monitoring_utils import set_custom_metrics_for_course_key, set_monitoring_transaction_name
+from openedx.core.djangoapps.monitoring_utils import (
+    set_custom_metric,
+    set_custom_metrics_for_course_key,
+    set_monitoring_transaction_name
+)
 from openedx.core.djangoapps.util.user_utils import SystemUser
 from openedx.core.lib.license import wrap_with_license
 from openedx.core.lib.url_utils import quote_slashes, unquote_slashes
@@ -78,6 +85,7 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.x_module import XModuleDescriptor
 
 from .field_overrides import OverrideFieldData
+from .transformers import TableOfContentsTransformer
 
 log = logging.getLogger(__name__)
 
@@ -104,6 +112,41 @@ class LmsModuleRenderError(Exception):
     pass
 
 
+class LazyCourse(object):
+    """
+    Stands in for the course with the given key when dispatching XBlock
+    handler calls.  The course is loaded from the modulestore when any of
+    its attributes other than `id` is first accessed, so that handlers
+    which don't need it never load it.
+    """
+    def __init__(self, course_key):
+        self.id = course_key  # pylint: disable=invalid-name
+        self._course = None
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            # Don't load the course for protocol lookups, e.g. by copy or pickle.
+            raise AttributeError(name)
+        if self._course is None:
+            course = modulestore().get_course(self.id)
+            if course is None:
+                raise ItemNotFoundError(self.id)
+            set_custom_metric('xblock_handler_course_loaded', True)
+            self._course = course
+        return getattr(self._course, name)
+
+
+def _course_for_handler(course_key, depth=0):
+    """
+    Returns the course to dispatch XBlock handler calls in the course with
+    the given key: a LazyCourse if ENABLE_LAZY_COURSE_XBLOCK_HANDLERS is set,
+    or else the course loaded to the given depth.
+    """
+    if settings.FEATURES.get('ENABLE_LAZY_COURSE_XBLOCK_HANDLERS'):
+        return LazyCourse(course_key)
+    return modulestore().get_course(course_key, depth=depth)
+
+
 def make_track_function(request):
     '''
     Make a tracking function that logs what happened.
@@ -144,18 +187,22 @@ def toc_for_course(user, request, course, active_chapter, active_section, field_
     NOTE: assumes that if we got this far, user has access to course.  Returns
     None if this is not the case.
 
-    field_data_cache must include data from the course module and 2 levels of its descendants
+    field_data_cache must include data from the course module and 2 levels of its descendants.
+    It is not used if the table of contents is built from the course's block structure.
     '''
 
     with modulestore().bulk_operations(course.id):
-        course_module = get_module_for_descriptor(
-            user, request, course, field_data_cache, course.id, course=course
-        )
-        if course_module is None:
+        if _use_course_blocks_for_toc(course):
+            chapters = _toc_chapters_from_course_blocks(user, course)
+        else:
+            course_module = get_module_for_descriptor(
+                user, request, course, field_data_cache, course.id, course=course
+            )
+            chapters = course_module.get_display_items() if course_module is not None else None
+        if chapters is None:
             return None, None, None
 
         toc_chapters = list()
-        chapters = course_module.get_display_items()
 
         # Check for content which needs to be completed
         # before the rest of the content is made available
@@ -228,6 +275,72 @@ def toc_for_course(user, request, course, active_chapter, active_section, field_
         }
 
 
+def _use_course_blocks_for_toc(course):
+    """
+    Returns whether the table of contents of the given course can be built
+    from its block structure, which holds the same field values for every
+    user only if no field override providers are enabled for the course.
+    The block structure is collected from published content, so it isn't
+    used in preview mode, which shows drafts.
+    """
+    return (
+        settings.FEATURES.get('ENABLE_BLOCK_STRUCTURE_TOC') and
+        not in_preview_mode() and
+        not hasattr(course.id, 'ccx') and
+        not OverrideFieldData.has_providers_for_course(course)
+    )
+
+
+def _toc_chapters_from_course_blocks(user, course):
+    """
+    Returns the chapters of the given course that are accessible to the
+    user, read from the course's collected block structure, or None if the
+    user cannot access the course.
+    """
+    transformers = BlockStructureTransformers(COURSE_BLOCK_ACCESS_TRANSFORMERS + [TableOfContentsTransformer()])
+    course_blocks = get_course_blocks(user, course.location, transformers)
+    if course.location not in course_blocks:
+        return None
+
+    # The block structure transformers already apply start dates, user partitions
+    # and staff-only visibility, so only content milestones are left to check.
+    if has_access(user, 'staff', course.id):
+        is_accessible = lambda block_key: True
+    else:
+        is_accessible = lambda block_key: not milestones_helpers.get_course_content_milestones(
+            course.id, unicode(block_key), 'requires', user.id
+        )
+    return _TocBlock(course_blocks, course.location, is_accessible).get_display_items()
+
+
+class _TocBlock(object):
+    """
+    A block of a collected course block structure, exposing the fields
+    read by toc_for_course under the same names as a bound module.
+    """
+    def __init__(self, course_blocks, block_key, is_accessible):
+        self._course_blocks = course_blocks
+        self._is_accessible = is_accessible
+        self.location = block_key
+        self.url_name = block_key.block_id
+        self.display_name_with_default_escaped = TableOfContentsTransformer.get_display_name(course_blocks, block_key)
+
+    def __getattr__(self, name):
+        if name in TableOfContentsTransformer.FIELDS_TO_COLLECT:
+            return self._course_blocks.get_xblock_field(self.location, name)
+        raise AttributeError(name)
+
+    def get_display_items(self):
+        """
+        Returns the children of this block that are accessible to the user.
+        """
+        return [
+            _TocBlock(self._course_blocks, child_key, self._is_accessible)
+            for child_key in self._course_blocks.get_children(self.location)
+            if self._is_accessible(child_key)
+        ]
+
+
 def _add_timed_exam_info(user, course, section, section_context):
     """
     Add in rendering context if exam is a timed exam (which includes proctored)
@@ -916,7 +1029,7 @@ def handle_xblock_callback_noauth(request, course_id, usage_id, handler, suffix=
 
     course_key = CourseKey.from_string(course_id)
     with modulestore().bulk_operations(course_key):
-        course = modulestore().get_course(course_key, depth=0)
+        course = _course_for_handler(course_key)
         return _invoke_xblock_handler(request, course_id, usage_id, handler, suffix, course=course)
 
 
@@ -948,7 +1061,7 @@ def handle_xblock_callback(request, course_id, usage_id, handler, suffix=None):
 
     with modulestore().bulk_operations(course_key):
         try:
-            course = modulestore().get_course(course_key)
+            course = _course_for_handler(course_key)
         except ItemNotFoundError:
             raise Http404('{} does not exist in the modulestore'.format(course_id))
 
@@ -1058,10 +1171,11 @@ def _invoke_xblock_handler(request, course_id, usage_id, handler, suffix, course
         try:
             with tracker.get_tracker().context(tracking_context_name, tracking_context):
                 resp = instance.handle(handler, req, suffix)
+                # Check the block first, so that the course is only loaded for entrance exams.
                 if suffix == 'problem_check' \
+                        and getattr(instance, 'in_entrance_exam', False) \
                         and course \
-                        and getattr(course, 'entrance_exam_enabled', False) \
-                        and getattr(instance, 'in_entrance_exam', False):
+                        and getattr(course, 'entrance_exam_enabled', False):
                     ee_data = {'entrance_exam_passed': user_has_passed_entrance_exam(request.user, course)}
                     resp = append_data_to_webob_response(resp, ee_data)
 
@@ -5,6 +5,7 @@ Test the access control framework
 import datetime
 import itertools
 
+import crum
 import ddt
 import pytz
 from ccx_keys.locator import CCXLocator
@@ -672,6 +673,74 @@ class AccessTestCase(LoginEnrollmentTestCase, ModuleStoreTestCase, MilestonesTes
         self.assertEqual(response.status_code, 200)
 
 
+@attr(shard=1)
+class AccessCacheTestCase(ModuleStoreTestCase):
+    """
+    Tests for the caching of access decisions within a request.
+    """
+    def setUp(self):
+        super(AccessCacheTestCase, self).setUp()
+        self.course = CourseFactory.create()
+        self.chapter = ItemFactory.create(category='chapter', parent_location=self.course.location)
+        self.sequential = ItemFactory.create(category='sequential', parent_location=self.chapter.location)
+        self.student = UserFactory()
+        self.course_staff = StaffFactory(course_key=self.course.id)
+        self.request = RequestFactory().get('/')
+        crum.set_current_request(self.request)
+        self.addCleanup(crum.set_current_request, None)
+
+    def test_cached_within_request(self):
+        with patch('courseware.access._has_access_descriptor', wraps=access._has_access_descriptor) as mock_access:
+            with patch('courseware.access.monitoring_utils.increment') as mock_increment:
+                for __ in range(3):
+                    self.assertTrue(access.has_access(self.student, 'load', self.chapter, self.course.id))
+        self.assertEqual(mock_access.call_count, 1)
+        mock_increment.assert_any_call(access.ACCESS_EVALUATIONS_METRIC)
+        self.assertEqual(mock_increment.call_args_list.count(((access.ACCESS_CACHE_HITS_METRIC,),)), 2)
+
+    def test_not_cached_outside_request(self):
+        crum.set_current_request(None)
+        with patch('courseware.access._has_access_descriptor', wraps=access._has_access_descriptor) as mock_access:
+            for __ in range(3):
+                self.assertTrue(access.has_access(self.student, 'load', self.chapter, self.course.id))
+        self.assertEqual(mock_access.call_count, 3)
+
+    def test_cached_by_user_and_action(self):
+        self.assertFalse(access.has_access(self.student, 'staff', self.chapter, self.course.id))
+        self.assertTrue(access.has_access(self.course_staff, 'staff', self.chapter, self.course.id))
+        self.assertFalse(access.has_access(self.course_staff, 'instructor', self.chapter, self.course.id))
+        self.assertTrue(access.has_access(self.course_staff, 'staff', self.course.id))
+
+    def test_cached_by_masquerade(self):
+        self.assertTrue(access.has_access(self.course_staff, 'staff', self.course.id))
+        self.course_staff.masquerade_settings = {
+            self.course.id: CourseMasquerade(self.course.id, role='student')
+        }
+        self.assertFalse(access.has_access(self.course_staff, 'staff', self.course.id))
+
+    def test_group_access_shared_with_descendants(self):
+        partition_id = MINIMUM_STATIC_PARTITION_ID
+        user_partition = UserPartition(
+            partition_id, 'Test User Partition', '',
+            [Group(MINIMUM_STATIC_PARTITION_ID + 1, 'Group 1'), Group(MINIMUM_STATIC_PARTITION_ID + 2, 'Group 2')],
+            scheme_id='cohort'
+        )
+        self.course.user_partitions.append(user_partition)
+        self.course.cohort_config = {'cohorted': True}
+        modulestore().update_item(self.course, ModuleStoreEnum.UserID.test)
+        self.chapter.group_access = {partition_id: [MINIMUM_STATIC_PARTITION_ID + 1]}
+        modulestore().update_item(self.chapter, ModuleStoreEnum.UserID.test)
+        chapter = modulestore().get_item(self.chapter.location)
+        sequential = modulestore().get_item(self.sequential.location)
+
+        with patch(
+            'courseware.access._has_merged_group_access', wraps=access._has_merged_group_access
+        ) as mock_group_access:
+            self.assertFalse(access.has_access(self.student, 'load', chapter, self.course.id))
+            self.assertFalse(access.has_access(self.student, 'load', sequential, self.course.id))
+        self.assertEqual(mock_group_access.call_count, 1)
+
+
 @attr(shard=1)
 class UserRoleTestCase(TestCase):
     """
@@ -0,0 +1,134 @@
+"""
+Benchmarks of XBlock handler calls, comparing dispatch with the course
+loaded upfront to dispatch with a LazyCourse.
+
+Like the modulestore benchmarks in xmodule.modulestore.perf_tests, these
+are skipped unless the MODULESTORE_BENCHMARKS environment variable is set,
+and write their results as JSON, including the number of SQL queries and
+mongo finds made by each handler call.
+"""
+from contextlib import contextmanager
+from unittest import skipUnless
+
+import ddt
+import pymongo
+from django.db import connection
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from mock import patch
+
+from capa.tests.response_xml_factory import OptionResponseXMLFactory
+from courseware import module_render as render
+from courseware.tests.factories import UserFactory
+from request_cache.middleware import RequestCache
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.perf_tests.benchmark import BenchmarkRecorder, benchmarks_enabled
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+# Number of times each handler call is repeated.
+REPEAT = 20
+
+
+@contextmanager
+def count_mongo_finds(counts):
+    """
+    Counts the mongo finds, including find_one and get_more, made
+    within the context into counts['mongo_finds'].
+    """
+    with patch.object(pymongo.message, 'query', wraps=pymongo.message.query) as query:
+        with patch.object(pymongo.message, 'get_more', wraps=pymongo.message.get_more) as get_more:
+            yield
+    counts['mongo_finds'] = query.call_count + get_more.call_count
+
+
+@ddt.ddt
+@skipUnless(benchmarks_enabled(), "XBlock handler benchmarks are disabled.")
+class XBlockHandlerBenchmarks(ModuleStoreTestCase):
+    """
+    Times problem and video handler calls, with and without
+    ENABLE_LAZY_COURSE_XBLOCK_HANDLERS, in each modulestore.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def setUp(self):
+        super(XBlockHandlerBenchmarks, self).setUp()
+        self.recorder = BenchmarkRecorder('xblock_handlers')
+        self.request_factory = RequestFactory()
+        self.user = UserFactory.create()
+
+    def _create_course(self):
+        """
+        Creates a course with a problem and a video in a single unit.
+        """
+        course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=course, category='chapter')
+        sequential = ItemFactory.create(parent=chapter, category='sequential', metadata={'graded': True})
+        vertical = ItemFactory.create(parent=sequential, category='vertical')
+        problem = ItemFactory.create(
+            parent=vertical,
+            category='problem',
+            data=OptionResponseXMLFactory().build_xml(
+                question_text='The correct answer is Correct',
+                options=['Incorrect', 'Correct'],
+                correct_option='Correct',
+            ),
+        )
+        video = ItemFactory.create(parent=vertical, category='video')
+        return course, problem, video
+
+    def _call_handler(self, course_key, block, suffix, data):
+        """
+        Calls the xmodule_handler of the given block with the given suffix
+        and POST data, as handle_xblock_callback is called per request.
+        """
+        RequestCache.clear_request_cache()
+        request = self.request_factory.post('dummy_url', data=data)
+        request.user = self.user
+        request.session = {}
+        response = render.handle_xblock_callback(
+            request,
+            unicode(course_key),
+            unicode(block.location),
+            'xmodule_handler',
+            suffix,
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
+    def test_handler_calls(self, store_type):
+        with self.store.default_store(store_type):
+            course, problem, video = self._create_course()
+
+        problem_input = 'input_{}_2_1'.format(problem.location.html_id())
+        calls = [
+            ('problem_get', problem, {}),
+            ('problem_check', problem, {problem_input: 'Correct'}),
+            ('problem_reset', problem, {}),
+            ('save_user_state', video, {'saved_video_position': '00:00:10'}),
+        ]
+        for lazy_course in (False, True):
+            with patch.dict('django.conf.settings.FEATURES', {'ENABLE_LAZY_COURSE_XBLOCK_HANDLERS': lazy_course}):
+                for suffix, block, data in calls:
+                    self._benchmark_handler(store_type, course.id, block, suffix, data, lazy_course)
+
+    def _benchmark_handler(self, store_type, course_key, block, suffix, data, lazy_course):
+        """
+        Records the SQL queries and mongo finds made by a single call
+        of the given handler, and the time taken by REPEAT calls.
+        """
+        # Warm up the caches shared across requests before counting.
+        self._call_handler(course_key, block, suffix, data)
+
+        counts = {}
+        with CaptureQueriesContext(connection) as sql_queries:
+            with count_mongo_finds(counts):
+                self._call_handler(course_key, block, suffix, data)
+
+        self.recorder.repeat(
+            'handler_call', store_type, lambda: self._call_handler(course_key, block, suffix, data), REPEAT,
+            block_type=block.location.block_type, suffix=suffix, lazy_course=lazy_course,
+            sql_queries=len(sql_queries), mongo_finds=counts['mongo_finds'],
+        )
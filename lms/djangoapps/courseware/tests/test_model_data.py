@@ -12,7 +12,7 @@ from xblock.core import XBlock
 from xblock.exceptions import KeyValueMultiSaveError
 from xblock.fields import BlockScope, Scope, ScopeIds
 
-from courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError
+from courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError, MultiUserFieldDataCache
 from courseware.models import (
     StudentModule,
     XModuleStudentInfoField,
@@ -292,6 +292,62 @@ class TestMissingStudentModule(TestCase):
 
 
 @attr(shard=1)
+@attr(shard=1)
+class TestMultiUserFieldDataCache(TestCase):
+    """Tests for user_state storage via a MultiUserFieldDataCache"""
+    # Tell Django to clean out all databases, not just default
+    multi_db = True
+
+    def setUp(self):
+        super(TestMultiUserFieldDataCache, self).setUp()
+        self.users = [
+            StudentModuleFactory(state=json.dumps({'a_field': 'a_value_{}'.format(index)})).student
+            for index in range(3)
+        ]
+        self.users.append(UserFactory.create())  # a user without a StudentModule
+        self.descriptors = [mock_descriptor([mock_field(Scope.user_state, 'a_field')])]
+
+    def key(self, user):
+        """Returns the key of the user_state field of the given user"""
+        return DjangoKeyValueStore.Key(Scope.user_state, user.id, location('usage_id'), 'a_field')
+
+    def test_for_user(self):
+        # There should be only one query to load the user_state field of all users
+        with self.assertNumQueries(1):
+            multi_user_cache = MultiUserFieldDataCache(self.descriptors, course_id, self.users)
+
+        with self.assertNumQueries(0):
+            for index, user in enumerate(self.users[:3]):
+                kvs = DjangoKeyValueStore(multi_user_cache.for_user(user))
+                self.assertEquals('a_value_{}'.format(index), kvs.get(self.key(user)))
+
+            kvs = DjangoKeyValueStore(multi_user_cache.for_user(self.users[3]))
+            self.assertFalse(kvs.has(self.key(self.users[3])))
+
+    @patch.object(MultiUserFieldDataCache, 'USERS_CHUNK_SIZE', 2)
+    def test_chunked_queries(self):
+        with self.assertNumQueries(2):
+            MultiUserFieldDataCache(self.descriptors, course_id, self.users)
+
+    def test_for_other_user(self):
+        multi_user_cache = MultiUserFieldDataCache(self.descriptors, course_id, self.users[1:])
+        with self.assertNumQueries(1):
+            kvs = DjangoKeyValueStore(multi_user_cache.for_user(self.users[0]))
+        self.assertEquals('a_value_0', kvs.get(self.key(self.users[0])))
+
+    def test_set_for_user(self):
+        multi_user_cache = MultiUserFieldDataCache(self.descriptors, course_id, self.users)
+        kvs = DjangoKeyValueStore(multi_user_cache.for_user(self.users[1]))
+        kvs.set(self.key(self.users[1]), 'a_new_value')
+        self.assertEquals(
+            {'a_field': 'a_new_value'},
+            json.loads(StudentModule.objects.get(student=self.users[1]).state),
+        )
+        self.assertEquals('a_value_0', DjangoKeyValueStore(multi_user_cache.for_user(self.users[0])).get(
+            self.key(self.users[0])
+        ))
+
+
 class StorageTestBase(object):
     """
     A base class for that gets subclassed when testing each of the scopes.
@@ -58,6 +58,7 @@ from xblock_django.models import XBlockConfiguration
 from xmodule.lti_module import LTIDescriptor
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.tests.django_utils import (
     TEST_DATA_MIXED_MODULESTORE,
     ModuleStoreTestCase,
@@ -582,6 +583,43 @@ class TestHandleXBlockCallback(SharedModuleStoreTestCase, LoginEnrollmentTestCas
                 'bad_dispatch',
             )
 
+    @ddt.data(
+        (True, 0),
+        (False, 1),
+    )
+    @ddt.unpack
+    def test_xmodule_dispatch_loads_course(self, lazy_course, num_course_loads):
+        request = self.request_factory.post('dummy_url', data={'position': 1})
+        request.user = self.mock_user
+        store = modulestore()
+        with patch.dict('django.conf.settings.FEATURES', {'ENABLE_LAZY_COURSE_XBLOCK_HANDLERS': lazy_course}):
+            with patch.object(store, 'get_course', wraps=store.get_course) as mock_get_course:
+                response = render.handle_xblock_callback(
+                    request,
+                    self.course_key.to_deprecated_string(),
+                    quote_slashes(self.location.to_deprecated_string()),
+                    'xmodule_handler',
+                    'goto_position',
+                )
+        self.assertIsInstance(response, HttpResponse)
+        self.assertEqual(mock_get_course.call_count, num_course_loads)
+
+    def test_lazy_course(self):
+        store = modulestore()
+        with patch.object(store, 'get_course', wraps=store.get_course) as mock_get_course:
+            course = render.LazyCourse(self.course_key)
+            self.assertEqual(course.id, self.course_key)
+            mock_get_course.assert_not_called()
+
+            self.assertEqual(course.display_name, self.toy_course.display_name)
+            self.assertEqual(course.location, self.toy_course.location)
+            mock_get_course.assert_called_once_with(self.course_key)
+
+    def test_lazy_course_not_found(self):
+        course = render.LazyCourse(CourseKey.from_string('edX/missing/course'))
+        with self.assertRaises(ItemNotFoundError):
+            course.display_name  # pylint: disable=pointless-statement
+
     @XBlock.register_temp_plugin(GradedStatelessXBlock, identifier='stateless_scorer')
     def test_score_without_student_state(self):
         course = CourseFactory.create()
@@ -751,6 +789,7 @@ class TestTOC(ModuleStoreTestCase):
     #       each of which access a Scope.content field in __init__
     @ddt.data((ModuleStoreEnum.Type.mongo, 3, 0, 0), (ModuleStoreEnum.Type.split, 6, 0, 5))
     @ddt.unpack
+    @patch.dict('django.conf.settings.FEATURES', {'ENABLE_BLOCK_STRUCTURE_TOC': False})
     def test_toc_toy_from_chapter(self, default_ms, setup_finds, setup_sends, toc_finds):
         with self.store.default_store(default_ms):
             self.setup_request_and_course(setup_finds, setup_sends)
@@ -793,6 +832,7 @@ class TestTOC(ModuleStoreTestCase):
     #       each of which access a Scope.content field in __init__
     @ddt.data((ModuleStoreEnum.Type.mongo, 3, 0, 0), (ModuleStoreEnum.Type.split, 6, 0, 5))
     @ddt.unpack
+    @patch.dict('django.conf.settings.FEATURES', {'ENABLE_BLOCK_STRUCTURE_TOC': False})
     def test_toc_toy_from_section(self, default_ms, setup_finds, setup_sends, toc_finds):
         with self.store.default_store(default_ms):
             self.setup_request_and_course(setup_finds, setup_sends)
@@ -821,6 +861,53 @@ class TestTOC(ModuleStoreTestCase):
             self.assertEquals(actual['previous_of_active_section']['url_name'], 'Toy_Videos')
             self.assertEquals(actual['next_of_active_section']['url_name'], 'video_123456789012')
 
+    def _toc_for_section(self, section):
+        """
+        Returns the table of contents of the toy course, for the given
+        section of the Overview chapter.
+        """
+        return render.toc_for_course(
+            self.request.user, self.request, self.toy_course, self.chapter, section, self.field_data_cache
+        )
+
+    @ddt.data((ModuleStoreEnum.Type.mongo, 3, 0), (ModuleStoreEnum.Type.split, 6, 0))
+    @ddt.unpack
+    def test_toc_from_course_blocks(self, default_ms, setup_finds, setup_sends):
+        with self.store.default_store(default_ms):
+            self.setup_request_and_course(setup_finds, setup_sends)
+            with patch.dict('django.conf.settings.FEATURES', {'ENABLE_BLOCK_STRUCTURE_TOC': False}):
+                expected = self._toc_for_section('Welcome')
+
+            with patch.dict('django.conf.settings.FEATURES', {'ENABLE_BLOCK_STRUCTURE_TOC': True}):
+                self.assertEqual(self._toc_for_section('Welcome'), expected)
+
+                # Once the block structure of the course is collected,
+                # the modulestore is no longer read.
+                with check_mongo_calls(0):
+                    self.assertEqual(self._toc_for_section('Welcome'), expected)
+
+    @patch.dict('django.conf.settings.FEATURES', {'ENABLE_BLOCK_STRUCTURE_TOC': True})
+    def test_toc_with_field_override_providers(self):
+        with self.store.default_store(ModuleStoreEnum.Type.split):
+            self.setup_request_and_course(6, 0)
+            with patch.object(OverrideFieldData, 'has_providers_for_course', return_value=True):
+                with patch('courseware.module_render.get_course_blocks') as mock_get_course_blocks:
+                    actual = self._toc_for_section('Welcome')
+
+        self.assertFalse(mock_get_course_blocks.called)
+        self.assertEquals(actual['previous_of_active_section']['url_name'], 'Toy_Videos')
+
+    @patch.dict('django.conf.settings.FEATURES', {'ENABLE_BLOCK_STRUCTURE_TOC': True})
+    def test_toc_in_preview_mode(self):
+        with self.store.default_store(ModuleStoreEnum.Type.split):
+            self.setup_request_and_course(6, 0)
+            with patch('courseware.module_render.in_preview_mode', return_value=True):
+                with patch('courseware.module_render.get_course_blocks') as mock_get_course_blocks:
+                    actual = self._toc_for_section('Welcome')
+
+        self.assertFalse(mock_get_course_blocks.called)
+        self.assertEquals(actual['previous_of_active_section']['url_name'], 'Toy_Videos')
+
 
 @attr(shard=1)
 @ddt.ddt
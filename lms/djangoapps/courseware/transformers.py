@@ -0,0 +1,74 @@
+"""
+Table of Contents Transformer
+"""
+from openedx.core.djangoapps.content.block_structure.transformer import BlockStructureTransformer
+
+
+class TableOfContentsTransformer(BlockStructureTransformer):
+    """
+    The TableOfContentsTransformer collects the user-independent fields
+    shown in the courseware table of contents, so it can be built once
+    per course version rather than by binding every chapter and section
+    to the user on each request.
+
+    No runtime transformations are performed.
+
+    The following values are stored as xblock_fields on their respective blocks
+    in the block structure:
+
+        due: (datetime) when the section is due.
+        format: (string) what type of section it is
+        graded: (boolean)
+        hide_from_toc: (boolean)
+        is_time_limited: (boolean) whether the section is a timed exam
+
+    Additionally, the following value is calculated and stored as a
+    transformer_block_field for each block:
+
+        display_name: (string) the escaped display name, with default
+    """
+    WRITE_VERSION = 1
+    READ_VERSION = 1
+    FIELDS_TO_COLLECT = [
+        u'due',
+        u'format',
+        u'graded',
+        u'hide_from_toc',
+        u'is_time_limited',
+    ]
+    DISPLAY_NAME = 'display_name'
+
+    @classmethod
+    def name(cls):
+        """
+        Unique identifier for the transformer's class;
+        same identifier used in setup.py.
+        """
+        return u'table_of_contents'
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Collects any information that's necessary to build the table
+        of contents.
+        """
+        block_structure.request_xblock_fields(*cls.FIELDS_TO_COLLECT)
+        for block_key in block_structure.topological_traversal():
+            xblock = block_structure.get_xblock(block_key)
+            block_structure.set_transformer_block_field(
+                block_key, cls, cls.DISPLAY_NAME, xblock.display_name_with_default_escaped
+            )
+
+    def transform(self, usage_info, block_structure):
+        """
+        Perform no transformations.
+        """
+        pass
+
+    @classmethod
+    def get_display_name(cls, block_structure, block_key):
+        """
+        Returns the escaped display name, with default, collected for
+        the given block.
+        """
+        return block_structure.get_transformer_block_field(block_key, cls, cls.DISPLAY_NAME)
@@ -1,7 +1,11 @@
 from django.conf import settings
 
 from lms.djangoapps.grades.config.models import PersistentGradesEnabledFlag
-from lms.djangoapps.grades.config.waffle import waffle as waffle_func, ASSUME_ZERO_GRADE_IF_ABSENT
+from lms.djangoapps.grades.config.waffle import (
+    waffle as waffle_func,
+    ASSUME_ZERO_GRADE_IF_ABSENT,
+    INCREMENTAL_COURSE_GRADE_UPDATES,
+)
 
 
 def assume_zero_if_absent(course_key):
@@ -21,3 +25,11 @@ def should_persist_grades(course_key):
     Returns whether grades should be persisted.
     """
     return PersistentGradesEnabledFlag.feature_enabled(course_key)
+
+
+def should_update_course_grades_incrementally(course_key):
+    """
+    Returns whether persisted course grades should be updated from
+    the changed subsection grade only, when possible.
+    """
+    return should_persist_grades(course_key) and waffle_func().is_enabled(INCREMENTAL_COURSE_GRADE_UPDATES)
@@ -2,13 +2,15 @@
 CourseGrade Class
 """
 from abc import abstractmethod
-from collections import OrderedDict, defaultdict
+from collections import OrderedDict, defaultdict, namedtuple
 
 from django.conf import settings
 from lazy import lazy
 
 from ccx_keys.locator import CCXLocator
+from opaque_keys.edx.keys import UsageKey
 from xmodule import block_metadata_utils
+from xmodule.graders import AggregatedScore
 
 from .config import assume_zero_if_absent
 from .subsection_grade import ZeroSubsectionGrade
@@ -71,6 +73,21 @@ class CourseGradeBase(object):
                         subsections_by_format[subsection_grade.format][subsection_grade.location] = subsection_grade
         return subsections_by_format
 
+    @lazy
+    def graded_totals(self):
+        """
+        Returns the graded (earned, possible) totals of the subsections
+        in graded_subsections_by_format, in a dict keyed by subsection
+        format type and then by subsection usage key (unicode).
+        """
+        return {
+            subsection_format: {
+                unicode(location): (subsection_grade.graded_total.earned, subsection_grade.graded_total.possible)
+                for location, subsection_grade in subsection_grades.iteritems()
+            }
+            for subsection_format, subsection_grades in self.graded_subsections_by_format.iteritems()
+        }
+
     @lazy
     def chapter_grades(self):
         """
@@ -261,6 +278,17 @@ class CourseGrade(CourseGradeBase):
         self.passed = self._compute_passed(grade_cutoffs, self.percent)
         return self
 
+    def update_from_graded_totals(self, graded_totals):
+        """
+        Updates the grade for the course from the given graded totals
+        of the subsections, in the format of self.graded_totals, rather
+        than from the subsection grades themselves.
+        """
+        course = self._prep_course_for_grading(self.course_data.course)
+        self.graded_totals = graded_totals
+        self.grader_result = course.grader.grade(self._graded_subsections_from_totals(graded_totals))
+        return self.update()
+
     @lazy
     def attempted(self):
         """
@@ -283,6 +311,41 @@ class CourseGrade(CourseGradeBase):
             # Pass read_only here so the subsection grades can be persisted in bulk at the end.
             return self._subsection_grade_factory.create(subsection, read_only=True)
 
+    def _graded_subsections_from_totals(self, graded_totals):
+        """
+        Returns a dict in the format of self.graded_subsections_by_format
+        for the given graded totals, with just enough of each subsection
+        grade for the grader.
+        """
+        structure = self.course_data.structure
+        course_order = {}
+        for chapter_key in structure.get_children(self.course_data.location):
+            for subsection_key in structure.get_children(chapter_key):
+                course_order.setdefault(subsection_key, len(course_order))
+        subsections_by_format = {}
+        for subsection_format, subsection_totals in graded_totals.iteritems():
+            subsections = subsections_by_format[subsection_format] = OrderedDict()
+            totals_by_location = {}
+            for subsection_key, totals in subsection_totals.iteritems():
+                location = UsageKey.from_string(subsection_key).map_into_course(self.course_data.course_key)
+                totals_by_location[location] = (subsection_key, totals)
+            # Subsections are graded in course order, as in
+            # graded_subsections_by_format, since the grader labels
+            # them by position.  Any no longer in the course go last.
+            for location in sorted(
+                    totals_by_location,
+                    key=lambda location: (course_order.get(location, len(course_order)), unicode(location)),
+            ):
+                subsection_key, (earned, possible) = totals_by_location[location]
+                subsections[location] = _GradedSubsectionTotal(
+                    display_name=(
+                        block_metadata_utils.display_name_with_default_escaped(structure[location])
+                        if location in structure else subsection_key
+                    ),
+                    graded_total=AggregatedScore(earned, possible, graded=True, first_attempted=None),
+                )
+        return subsections_by_format
+
     @staticmethod
     def _compute_percent(grader_result):
         """
@@ -320,5 +383,9 @@ class CourseGrade(CourseGradeBase):
         return success_cutoff and percent >= success_cutoff
 
 
+# The fields of a subsection grade used by the course grader.
+_GradedSubsectionTotal = namedtuple('_GradedSubsectionTotal', ['display_name', 'graded_total'])
+
+
 def _uniqueify_and_keep_order(iterable):
     return OrderedDict([(item, None) for item in iterable]).keys()
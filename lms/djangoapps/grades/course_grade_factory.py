@@ -1,14 +1,19 @@
 from collections import namedtuple
+from itertools import islice
 from logging import getLogger
 
 import dogstats_wrapper as dog_stats_api
+from django.conf import settings
+from django.db import transaction
 
 from openedx.core.djangoapps.signals.signals import COURSE_GRADE_CHANGED, COURSE_GRADE_NOW_PASSED
 
-from .config import assume_zero_if_absent, should_persist_grades
+from .config import assume_zero_if_absent, should_persist_grades, should_update_course_grades_incrementally
 from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
-from .models import PersistentCourseGrade, prefetch
+from .models import PersistentCourseGrade, bulk_prefetch, prefetch
+from .scores import possibly_scored
+from .subsection_grade_factory import SubsectionGradeFactory
 
 log = getLogger(__name__)
 
@@ -19,6 +24,9 @@ class CourseGradeFactory(object):
     """
     GradeResult = namedtuple('GradeResult', ['student', 'course_grade', 'error'])
 
+    # Number of users whose grades data is prefetched together by iter when updating.
+    BULK_BATCH_SIZE = 100
+
     def read(
             self,
             user,
@@ -68,6 +76,34 @@ class CourseGradeFactory(object):
         course_data = CourseData(user, course, collected_block_structure, course_structure, course_key)
         return self._update(user, course_data, force_update_subsections=force_update_subsections)
 
+    def update_for_subsection(
+            self,
+            user,
+            subsection_grade,
+            course=None,
+            course_structure=None,
+            course_key=None,
+    ):
+        """
+        Updates and returns the CourseGrade for the given user in the
+        course, after the given subsection grade of the user changed.
+
+        When enabled, the persisted course grade is recomputed from the
+        graded totals persisted with it, with only the given subsection's
+        totals changed, rather than from all of the user's subsection
+        grades.  Otherwise, or if the course grade or its totals weren't
+        persisted or the course version or grading policy changed since,
+        the grade is recomputed as by update.
+
+        At least one of course, course_structure, or course_key should
+        be provided.
+        """
+        course_data = CourseData(user, course, structure=course_structure, course_key=course_key)
+        course_grade = self._update_incrementally(user, course_data, subsection_grade)
+        if course_grade is None:
+            course_grade = self._update(user, course_data)
+        return course_grade
+
     def iter(
             self,
             users,
@@ -84,21 +120,102 @@ class CourseGradeFactory(object):
 
         If an error occurred, course_grade will be None and err_msg will be an
         exception message. If there was no error, err_msg is an empty string.
+
+        When force_update, the data needed to update the students' grades
+        is prefetched in batches of BULK_BATCH_SIZE students; see bulk_iter.
+        """
+        course_data = self._iter_course_data(course, collected_block_structure, course_key)
+        for users_batch in _batches(users, self.BULK_BATCH_SIZE):
+            for result in self._bulk_grade_results(users_batch, course_data, force_update, prefetch=force_update):
+                yield result
+
+    def bulk_iter(
+            self,
+            users,
+            course=None,
+            collected_block_structure=None,
+            course_key=None,
+            force_update=False,
+    ):
+        """
+        Given a course and a list of students (User), returns a list of
+        GradeResults, one for each student, as described in iter.
+
+        The persisted grades data of all the students, as well as the CSM
+        and Submissions API scores of the students whose grades are
+        computed, are prefetched with a handful of queries before any grade
+        is computed, rather than with queries per student. When reading,
+        only the grades of students without a persisted course grade are
+        computed.
+        """
+        course_data = self._iter_course_data(course, collected_block_structure, course_key)
+        return self._bulk_grade_results(list(users), course_data, force_update)
+
+    @staticmethod
+    def _iter_course_data(course, collected_block_structure, course_key):
+        """
+        Returns the CourseData shared by all students graded by iter.
         """
         # Pre-fetch the collected course_structure (in _iter_grade_result) so:
         # 1. Correctness: the same version of the course is used to
         #    compute the grade for all students.
         # 2. Optimization: the collected course_structure is not
         #    retrieved from the data store multiple times.
-        course_data = CourseData(
+        return CourseData(
             user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
         )
+
+    def _bulk_grade_results(self, users, course_data, force_update, prefetch=True):
+        """
+        Prefetches the grades data of the given users, if prefetch, and
+        returns a list of their GradeResults.
+        """
+        if not users:
+            return []
+
+        prefetched = prefetch and self._bulk_prefetch(users, course_data, force_update)
         stats_tags = [u'action:{}'.format(course_data.course_key)]
+        results = []
         for user in users:
             with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=stats_tags):
-                yield self._iter_grade_result(user, course_data, force_update)
+                results.append(self._iter_grade_result(user, course_data, force_update, prefetched))
+        return results
+
+    @staticmethod
+    def _bulk_prefetch(users, course_data, force_update):
+        """
+        Prefetches the data needed to read, or if force_update to update,
+        the grades of all the given users.
 
-    def _iter_grade_result(self, user, course_data, force_update):
+        Returns whether the data was prefetched. If prefetching fails, the
+        error is logged and the users' data is read per user instead.
+        """
+        try:
+            if should_persist_grades(course_data.course_key):
+                bulk_prefetch(users, course_data.course_key, for_update=force_update)
+                if not force_update:
+                    # Reading a persisted course grade needs no scores.
+                    users = [
+                        user for user in users
+                        if not PersistentCourseGrade.has_prefetched_grade(user.id, course_data.course_key)
+                    ]
+            if users:
+                # Scores are prefetched for all the scorable blocks in the course;
+                # each student's course structure is a subset of them.
+                scorable_locations = [
+                    block_key for block_key in course_data.collected_structure if possibly_scored(block_key)
+                ]
+                SubsectionGradeFactory.prefetch(course_data.course_key, users, scorable_locations)
+        except Exception:  # pylint: disable=broad-except
+            log.exception(
+                'Cannot prefetch the grades data of %d students in course %s',
+                len(users),
+                course_data.course_key,
+            )
+            return False
+        return True
+
+    def _iter_grade_result(self, user, course_data, force_update, prefetched=False):
         try:
             kwargs = {
                 'user': user,
@@ -107,10 +224,16 @@ class CourseGradeFactory(object):
                 'course_key': course_data.course_key
             }
             if force_update:
-                kwargs['force_update_subsections'] = True
-
-            method = CourseGradeFactory().update if force_update else CourseGradeFactory().read
-            course_grade = method(**kwargs)
+                # The data that update would prefetch for the user
+                # may already have been prefetched in bulk.
+                course_grade = self._update(
+                    user,
+                    CourseData(**kwargs),
+                    force_update_subsections=True,
+                    prefetched=prefetched,
+                )
+            else:
+                course_grade = CourseGradeFactory().read(**kwargs)
             return self.GradeResult(user, course_grade, None)
         except Exception as exc:  # pylint: disable=broad-except
             # Keep marching on even if this student couldn't be graded for
@@ -152,7 +275,7 @@ class CourseGradeFactory(object):
         )
 
     @staticmethod
-    def _update(user, course_data, force_update_subsections=False):
+    def _update(user, course_data, force_update_subsections=False, prefetched=False):
         """
         Computes, saves, and returns a CourseGrade object for the
         given user and course.
@@ -161,7 +284,7 @@ class CourseGradeFactory(object):
         """
         should_persist = should_persist_grades(course_data.course_key)
 
-        if should_persist and force_update_subsections:
+        if should_persist and force_update_subsections and not prefetched:
             prefetch(user, course_data.course_key)
 
         course_grade = CourseGrade(user, course_data, force_update_subsections=force_update_subsections)
@@ -170,17 +293,82 @@ class CourseGradeFactory(object):
         should_persist = should_persist and course_grade.attempted
         if should_persist:
             course_grade._subsection_grade_factory.bulk_create_unsaved()
-            PersistentCourseGrade.update_or_create(
-                user_id=user.id,
-                course_id=course_data.course_key,
-                course_version=course_data.version,
-                course_edited_timestamp=course_data.edited_on,
-                grading_policy_hash=course_data.grading_policy_hash,
-                percent_grade=course_grade.percent,
-                letter_grade=course_grade.letter_grade or "",
-                passed=course_grade.passed,
-            )
+            CourseGradeFactory._persist(user, course_data, course_grade)
+
+        CourseGradeFactory._send_course_grade_signals(user, course_data, course_grade)
 
+        log.info(
+            u'Grades: Update, %s, User: %s, %s, persisted: %s',
+            course_data.full_string(), user.id, course_grade, should_persist,
+        )
+
+        return course_grade
+
+    @staticmethod
+    def _update_incrementally(user, course_data, subsection_grade):
+        """
+        Computes, saves, and returns a CourseGrade object for the given
+        user and course from the graded totals persisted with the user's
+        course grade and the given changed subsection grade.
+
+        Returns None if the grade can't be updated this way.
+        """
+        if settings.GENERATE_PROFILE_SCORES or not should_update_course_grades_incrementally(course_data.course_key):
+            return None
+
+        # The persisted grade is locked so that concurrent updates for
+        # other subsections don't overwrite each other's changes.
+        with transaction.atomic():
+            try:
+                persistent_grade = PersistentCourseGrade.read_for_update(user.id, course_data.course_key)
+            except PersistentCourseGrade.DoesNotExist:
+                return None
+
+            graded_totals = persistent_grade.graded_totals
+            if (
+                    graded_totals is None or
+                    persistent_grade.grading_policy_hash != course_data.grading_policy_hash or
+                    persistent_grade.course_version != (course_data.version or "")
+            ):
+                return None
+
+            _apply_subsection_grade(graded_totals, subsection_grade)
+            course_grade = CourseGrade(user, course_data).update_from_graded_totals(graded_totals)
+            CourseGradeFactory._persist(user, course_data, course_grade)
+
+        CourseGradeFactory._send_course_grade_signals(user, course_data, course_grade)
+
+        log.info(
+            u'Grades: Incremental update, %s, User: %s, %s, subsection: %s',
+            course_data.full_string(), user.id, course_grade, subsection_grade.location,
+        )
+
+        return course_grade
+
+    @staticmethod
+    def _persist(user, course_data, course_grade):
+        """
+        Saves the given CourseGrade, along with the graded
+        totals it was computed from.
+        """
+        PersistentCourseGrade.update_or_create(
+            user_id=user.id,
+            course_id=course_data.course_key,
+            course_version=course_data.version,
+            course_edited_timestamp=course_data.edited_on,
+            grading_policy_hash=course_data.grading_policy_hash,
+            percent_grade=course_grade.percent,
+            letter_grade=course_grade.letter_grade or "",
+            passed=course_grade.passed,
+            graded_totals=course_grade.graded_totals,
+        )
+
+    @staticmethod
+    def _send_course_grade_signals(user, course_data, course_grade):
+        """
+        Sends a COURSE_GRADE_CHANGED signal to listeners and a
+        COURSE_GRADE_NOW_PASSED if learner has passed course.
+        """
         COURSE_GRADE_CHANGED.send_robust(
             sender=None,
             user=user,
@@ -195,9 +383,32 @@ class CourseGradeFactory(object):
                 course_id=course_data.course_key,
             )
 
-        log.info(
-            u'Grades: Update, %s, User: %s, %s, persisted: %s',
-            course_data.full_string(), user.id, course_grade, should_persist,
-        )
 
-        return course_grade
+def _batches(iterable, batch_size):
+    """
+    Yields lists of at most batch_size items from the given iterable.
+    """
+    iterator = iter(iterable)
+    batch = list(islice(iterator, batch_size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, batch_size))
+
+
+def _apply_subsection_grade(graded_totals, subsection_grade):
+    """
+    Replaces the totals of the given subsection in the given graded
+    totals, in the format of CourseGrade.graded_totals, with those
+    of the given subsection grade.
+    """
+    subsection_key = unicode(subsection_grade.location)
+    for subsection_format in graded_totals.keys():
+        graded_totals[subsection_format].pop(subsection_key, None)
+        if not graded_totals[subsection_format]:
+            del graded_totals[subsection_format]
+
+    graded_total = subsection_grade.graded_total
+    if subsection_grade.graded and graded_total.possible > 0:
+        graded_totals.setdefault(subsection_grade.format, {})[subsection_key] = (
+            graded_total.earned, graded_total.possible,
+        )
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grades', '0013_persistentsubsectiongradeoverride'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='persistentcoursegrade',
+            name='graded_totals_json',
+            field=models.TextField(default='', verbose_name='Graded subsection totals by assignment type', blank=True),
+        ),
+    ]
@@ -296,6 +296,8 @@ class PersistentSubsectionGrade(TimeStampedModel):
     # track which blocks were visible at the time of grade calculation
     visible_blocks = models.ForeignKey(VisibleBlocks, db_column='visible_blocks_hash', to_field='hashed')
 
+    _CACHE_NAMESPACE = u"grades.models.PersistentSubsectionGrade"
+
     @property
     def full_usage_key(self):
         """
@@ -342,6 +344,23 @@ class PersistentSubsectionGrade(TimeStampedModel):
             usage_key=usage_key,
         )
 
+    @classmethod
+    def prefetch(cls, course_key, users):
+        """
+        Prefetches all grades for the given users in the given course.
+
+        Each user's prefetched grades are handed out only once, to the next
+        bulk_read_grades call for that user, so that any later read sees
+        grades that were updated in the meantime.
+        """
+        prefetched = {user.id: [] for user in users}
+        for grade in cls.objects.select_related('visible_blocks', 'override').filter(
+                user_id__in=prefetched.keys(),
+                course_id=course_key,
+        ):
+            prefetched[grade.user_id].append(grade)
+        get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(course_key)] = prefetched
+
     @classmethod
     def bulk_read_grades(cls, user_id, course_key):
         """
@@ -351,6 +370,10 @@ class PersistentSubsectionGrade(TimeStampedModel):
             user_id: The user associated with the desired grades
             course_key: The course identifier for the desired grades
         """
+        prefetched_grades = get_cache(cls._CACHE_NAMESPACE).get(cls._cache_key(course_key), {})
+        if user_id in prefetched_grades:
+            return prefetched_grades.pop(user_id)
+
         return cls.objects.select_related('visible_blocks', 'override').filter(
             user_id=user_id,
             course_id=course_key,
@@ -440,6 +463,10 @@ class PersistentSubsectionGrade(TimeStampedModel):
             if override.possible_graded_override is not None:
                 params['possible_graded'] = override.possible_graded_override
 
+    @classmethod
+    def _cache_key(cls, course_key):
+        return u"subsection_grades_cache.{}".format(course_key)
+
     @staticmethod
     def _emit_grade_calculated_event(grade):
         events.subsection_grade_calculated(grade)
@@ -484,6 +511,11 @@ class PersistentCourseGrade(TimeStampedModel):
     # Information related to course completion
     passed_timestamp = models.DateTimeField(u'Date learner earned a passing grade', blank=True, null=True)
 
+    # JSON dict of assignment type to a dict of subsection usage key to the
+    # subsection's graded [earned, possible] totals, as used to compute the
+    # grade.  Empty for grades persisted before the totals were tracked.
+    graded_totals_json = models.TextField(u'Graded subsection totals by assignment type', blank=True, default=u'')
+
     _CACHE_NAMESPACE = u"grades.models.PersistentCourseGrade"
 
     def __unicode__(self):
@@ -499,6 +531,23 @@ class PersistentCourseGrade(TimeStampedModel):
             u"passed timestamp: {}".format(self.passed_timestamp),
         ])
 
+    @property
+    def graded_totals(self):
+        """
+        Returns a dict of assignment type to a dict of subsection usage
+        key (unicode) to the subsection's graded (earned, possible) totals,
+        or None if the grade was persisted without its totals.
+        """
+        if not self.graded_totals_json:
+            return None
+        return {
+            assignment_type: {
+                subsection_key: tuple(subsection_totals)
+                for subsection_key, subsection_totals in assignment_type_totals.iteritems()
+            }
+            for assignment_type, assignment_type_totals in json.loads(self.graded_totals_json).iteritems()
+        }
+
     @classmethod
     def prefetch(cls, course_id, users):
         """
@@ -510,6 +559,14 @@ class PersistentCourseGrade(TimeStampedModel):
             cls.objects.filter(user_id__in=[user.id for user in users], course_id=course_id)
         }
 
+    @classmethod
+    def has_prefetched_grade(cls, user_id, course_id):
+        """
+        Returns whether a grade was prefetched for the given user in the
+        given course.
+        """
+        return user_id in get_cache(cls._CACHE_NAMESPACE).get(cls._cache_key(course_id), {})
+
     @classmethod
     def read(cls, user_id, course_id):
         """
@@ -533,6 +590,16 @@ class PersistentCourseGrade(TimeStampedModel):
             # grades were not prefetched for the course, so fetch it
             return cls.objects.get(user_id=user_id, course_id=course_id)
 
+    @classmethod
+    def read_for_update(cls, user_id, course_id):
+        """
+        Reads a grade from database, locking it until the end
+        of the current transaction.
+
+        Raises PersistentCourseGrade.DoesNotExist if applicable
+        """
+        return cls.objects.select_for_update().get(user_id=user_id, course_id=course_id)
+
     @classmethod
     def update_or_create(cls, user_id, course_id, **kwargs):
         """
@@ -544,6 +611,13 @@ class PersistentCourseGrade(TimeStampedModel):
         if kwargs.get('course_version', None) is None:
             kwargs['course_version'] = ""
 
+        # Totals that don't match the grade must not be kept, so
+        # they are cleared if not given.
+        graded_totals = kwargs.pop('graded_totals', None)
+        kwargs['graded_totals_json'] = (
+            json.dumps(graded_totals, separators=(',', ':'), sort_keys=True) if graded_totals is not None else u''
+        )
+
         grade, _ = cls.objects.update_or_create(
             user_id=user_id,
             course_id=course_id,
@@ -602,6 +676,22 @@ class PersistentSubsectionGradeOverride(models.Model):
             cls.objects.filter(grade__user_id=user_id, grade__course_id=course_key)
         }
 
+    @classmethod
+    def bulk_prefetch(cls, course_key, users):
+        """
+        Prefetches the overrides of all the given users in the given
+        course with a single query.
+        """
+        prefetched = {(user.id, str(course_key)): {} for user in users}
+        for override in cls.objects.select_related('grade').filter(
+                grade__user_id__in=[user.id for user in users],
+                grade__course_id=course_key,
+        ):
+            prefetched[(override.grade.user_id, str(course_key))][override.grade.usage_key] = override
+        # The cache is only updated once all the overrides are read, so that
+        # a failed query doesn't leave users with no overrides cached.
+        get_cache(cls._CACHE_NAMESPACE).update(prefetched)
+
     @classmethod
     def get_override(cls, user_id, usage_key):
         prefetch_values = get_cache(cls._CACHE_NAMESPACE).get((user_id, str(usage_key.course_key)), None)
@@ -620,3 +710,19 @@ class PersistentSubsectionGradeOverride(models.Model):
 def prefetch(user, course_key):
     PersistentSubsectionGradeOverride.prefetch(user.id, course_key)
     VisibleBlocks.bulk_read(course_key)
+
+
+def bulk_prefetch(users, course_key, for_update=False):
+    """
+    Prefetches the persisted grades data of all the given users in the
+    given course, with a query per kind of data rather than per user.
+
+    When for_update is True, prefetches the data needed to update the
+    users' grades; otherwise, the data needed to read them.
+    """
+    if for_update:
+        PersistentSubsectionGradeOverride.bulk_prefetch(course_key, users)
+        VisibleBlocks.bulk_read(course_key)
+    else:
+        PersistentCourseGrade.prefetch(course_key, users)
+        PersistentSubsectionGrade.prefetch(course_key, users)
@@ -8,8 +8,11 @@ from lms.djangoapps.grades.config import assume_zero_if_absent, should_persist_g
 from lms.djangoapps.grades.models import PersistentSubsectionGrade
 from lms.djangoapps.grades.scores import possibly_scored
 from openedx.core.lib.grade_utils import is_score_higher_or_equal
+from request_cache import get_cache
 from student.models import anonymous_id_for_user
 from submissions import api as submissions_api
+from submissions.models import ScoreSummary
+from submissions.serializers import UnannotatedScoreSerializer
 
 from .course_data import CourseData
 from .subsection_grade import CreateSubsectionGrade, ReadSubsectionGrade, ZeroSubsectionGrade
@@ -21,6 +24,8 @@ class SubsectionGradeFactory(object):
     """
     Factory for Subsection Grades.
     """
+    _CACHE_NAMESPACE = u"grades.subsection_grade_factory.SubsectionGradeFactory"
+
     def __init__(self, student, course=None, course_structure=None, course_data=None):
         self.student = student
         self.course_data = course_data or CourseData(student, course=course, structure=course_structure)
@@ -94,12 +99,33 @@ class SubsectionGradeFactory(object):
 
         return calculated_grade
 
+    @classmethod
+    def prefetch(cls, course_key, users, scorable_locations):
+        """
+        Prefetches the scores stored in the user state (in CSM) for the
+        given scorable locations and the scores stored by the Submissions
+        API, for all the given users in the course, with a query each.
+
+        Each user's prefetched scores are handed out only once, to the
+        next SubsectionGradeFactory that needs them for that user.
+        """
+        get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(course_key)] = {
+            'csm_scores': ScoresClient.create_for_users(
+                course_key, [user.id for user in users], scorable_locations,
+            ),
+            'submissions_scores': _bulk_submissions_scores(course_key, users),
+        }
+
     @lazy
     def _csm_scores(self):
         """
         Lazily queries and returns all the scores stored in the user
         state (in CSM) for the course, while caching the result.
         """
+        prefetched_scores = self._pop_prefetched_scores('csm_scores')
+        if prefetched_scores is not None:
+            return prefetched_scores
+
         scorable_locations = [block_key for block_key in self.course_data.structure if possibly_scored(block_key)]
         return ScoresClient.create_for_locations(self.course_data.course_key, self.student.id, scorable_locations)
 
@@ -109,9 +135,26 @@ class SubsectionGradeFactory(object):
         Lazily queries and returns the scores stored by the
         Submissions API for the course, while caching the result.
         """
+        prefetched_scores = self._pop_prefetched_scores('submissions_scores')
+        if prefetched_scores is not None:
+            return prefetched_scores
+
         anonymous_user_id = anonymous_id_for_user(self.student, self.course_data.course_key)
         return submissions_api.get_scores(str(self.course_data.course_key), anonymous_user_id)
 
+    def _pop_prefetched_scores(self, scores_name):
+        """
+        Returns and removes the student's scores of the given kind
+        from the prefetched scores, or None if not prefetched.
+        """
+        prefetched = get_cache(self._CACHE_NAMESPACE).get(self._cache_key(self.course_data.course_key))
+        if prefetched is not None:
+            return prefetched[scores_name].pop(self.student.id, None)
+
+    @classmethod
+    def _cache_key(cls, course_key):
+        return u"subsection_grade_factory.scores.{}".format(course_key)
+
     def _get_bulk_cached_grade(self, subsection):
         """
         Returns the student's SubsectionGrade for the subsection,
@@ -157,3 +200,29 @@ class SubsectionGradeFactory(object):
             getattr(subsection, 'subtree_edited_on', None),
             self.student.id,
         ))
+
+
+def _bulk_submissions_scores(course_key, users):
+    """
+    Returns a dict of user id to the scores stored by the Submissions API
+    for that user in the course, in the format returned by
+    submissions_api.get_scores, read for all the given users in a single
+    query.
+    """
+    # The anonymous ids are only used to look up existing submissions,
+    # so there's no need to save them.
+    user_ids_by_anonymous_id = {
+        anonymous_id_for_user(user, course_key, save=False): user.id
+        for user in users
+    }
+    scores = {user.id: {} for user in users}
+    score_summaries = ScoreSummary.objects.filter(
+        student_item__course_id=str(course_key),
+        student_item__student_id__in=user_ids_by_anonymous_id.keys(),
+    ).select_related('latest', 'latest__submission', 'student_item')
+    for summary in score_summaries:
+        # Hidden (0/0) scores are excluded, as by submissions_api.get_scores.
+        if not summary.latest.is_hidden():
+            user_id = user_ids_by_anonymous_id[summary.student_item.student_id]
+            scores[user_id][summary.student_item.item_id] = UnannotatedScoreSerializer(summary.latest).data
+    return scores
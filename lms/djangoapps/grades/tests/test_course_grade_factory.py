@@ -11,9 +11,10 @@ from student.tests.factories import UserFactory
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
-from ..config.waffle import ASSUME_ZERO_GRADE_IF_ABSENT, waffle
+from ..config.waffle import ASSUME_ZERO_GRADE_IF_ABSENT, INCREMENTAL_COURSE_GRADE_UPDATES, waffle
 from ..course_grade import CourseGrade, ZeroCourseGrade
 from ..course_grade_factory import CourseGradeFactory
+from ..models import PersistentCourseGrade
 from ..subsection_grade import ReadSubsectionGrade, ZeroSubsectionGrade
 from .base import GradeTestBase
 from .utils import mock_get_score
@@ -171,6 +172,114 @@ class TestCourseGradeFactory(GradeTestBase):
             ))
         self.assertEqual(mock_update.called, force_update)
 
+    @ddt.data(
+        # incremental updates enabled, persisted grade outdated, grade recomputed from subsection grades
+        (True, False, False),
+        (True, True, True),
+        (False, False, True),
+    )
+    @ddt.unpack
+    def test_update_for_subsection(self, incremental_enabled, outdated, expect_full_update):
+        grade_factory = CourseGradeFactory()
+        with mock_get_score(1, 2):
+            grade_factory.update(self.request.user, self.course, force_update_subsections=True)
+        self.assertEqual(
+            PersistentCourseGrade.read(self.request.user.id, self.course.id).graded_totals,
+            {u'Homework': {
+                unicode(self.sequence.location): (1.0, 2.0),
+                unicode(self.sequence2.location): (1.0, 2.0),
+            }},
+        )
+        if outdated:
+            PersistentCourseGrade.objects.filter(user_id=self.request.user.id).update(grading_policy_hash=u'outdated')
+
+        with mock_get_score(2, 2):
+            subsection_grade = self.subsection_grade_factory.update(self.course_structure[self.sequence.location])
+
+        with waffle().override(INCREMENTAL_COURSE_GRADE_UPDATES, active=incremental_enabled):
+            with patch.object(
+                CourseGrade,
+                '_get_subsection_grade',
+                autospec=True,
+                side_effect=CourseGrade._get_subsection_grade,  # pylint: disable=protected-access
+            ) as mock_get_subsection_grade:
+                course_grade = grade_factory.update_for_subsection(
+                    self.request.user, subsection_grade, course_structure=self.course_structure,
+                )
+        self.assertEqual(mock_get_subsection_grade.called, expect_full_update)
+        self.assertEqual(course_grade.percent, 0.75)
+
+        persistent_grade = PersistentCourseGrade.read(self.request.user.id, self.course.id)
+        self.assertEqual(persistent_grade.percent_grade, 0.75)
+        self.assertEqual(
+            persistent_grade.graded_totals,
+            {u'Homework': {
+                unicode(self.sequence.location): (2.0, 2.0),
+                unicode(self.sequence2.location): (1.0, 2.0),
+            }},
+        )
+
+    def test_update_for_subsection_keeps_course_order(self):
+        # The subsections' block ids sort opposite to their course order.
+        self.assertGreater(unicode(self.sequence.location), unicode(self.sequence2.location))
+        grade_factory = CourseGradeFactory()
+        with mock_get_score(1, 2):
+            grade_factory.update(self.request.user, self.course, force_update_subsections=True)
+        with mock_get_score(2, 2):
+            subsection_grade = self.subsection_grade_factory.update(self.course_structure[self.sequence2.location])
+
+        with waffle().override(INCREMENTAL_COURSE_GRADE_UPDATES, active=True):
+            incremental_grade = grade_factory.update_for_subsection(
+                self.request.user, subsection_grade, course_structure=self.course_structure,
+            )
+        full_grade = grade_factory.update(self.request.user, self.course)
+        self.assertEqual(
+            incremental_grade.grader_result['section_breakdown'],
+            full_grade.grader_result['section_breakdown'],
+        )
+        self.assertEqual(
+            [section['detail'] for section in incremental_grade.grader_result['section_breakdown']][:2],
+            [u'Homework 1 - Test Sequential X - 50% (1/2)', u'Homework 2 - Test Sequential A - 100% (2/2)'],
+        )
+
+    @ddt.data(True, False)
+    def test_bulk_iter_prefetches_scores(self, force_update):
+        with patch('lms.djangoapps.grades.subsection_grade_factory.submissions_api.get_scores') as mock_get_scores:
+            with patch(
+                'lms.djangoapps.grades.subsection_grade_factory.ScoresClient.create_for_locations'
+            ) as mock_create_for_locations:
+                grade_results = CourseGradeFactory().bulk_iter(
+                    users=[self.request.user], course=self.course, force_update=force_update,
+                )
+        self.assertEqual(len(grade_results), 1)
+        student, course_grade, error = grade_results[0]
+        self.assertEqual(student, self.request.user)
+        self.assertIsNone(error)
+        self.assertEqual(course_grade.percent, 0.0)
+        self.assertFalse(mock_get_scores.called)
+        self.assertFalse(mock_create_for_locations.called)
+
+    @ddt.data(True, False)
+    def test_bulk_iter_prefetch_error(self, force_update):
+        with patch(
+            'lms.djangoapps.grades.course_grade_factory.SubsectionGradeFactory.prefetch',
+            side_effect=Exception('Prefetch failed'),
+        ):
+            grade_results = CourseGradeFactory().bulk_iter(
+                users=[self.request.user], course=self.course, force_update=force_update,
+            )
+        student, course_grade, error = grade_results[0]
+        self.assertEqual(student, self.request.user)
+        self.assertIsNone(error)
+        self.assertEqual(course_grade.percent, 0.0)
+
+    def test_bulk_iter_read_persisted_grade(self):
+        CourseGradeFactory().update(self.request.user, self.course)
+        with patch('lms.djangoapps.grades.course_grade_factory.SubsectionGradeFactory.prefetch') as mock_prefetch:
+            grade_results = CourseGradeFactory().bulk_iter(users=[self.request.user], course=self.course)
+        self.assertIsNone(grade_results[0].error)
+        self.assertFalse(mock_prefetch.called)
+
     def test_course_grade_summary(self):
         with mock_get_score(1, 2):
             self.subsection_grade_factory.update(self.course_structure[self.sequence.location])
@@ -13,7 +13,7 @@ from django.db.utils import IntegrityError
 from django.test import TestCase
 from django.utils.timezone import now
 from freezegun import freeze_time
-from mock import patch
+from mock import Mock, patch
 from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
 
 from lms.djangoapps.grades.models import (
@@ -294,6 +294,19 @@ class PersistentSubsectionGradeTest(GradesModelTestCase):
         self.assertEqual(grade.earned_all, 0.0)
         self.assertEqual(grade.earned_graded, 0.0)
 
+    def test_prefetch(self):
+        grade = PersistentSubsectionGrade.update_or_create_grade(**self.params)
+        users = [Mock(id=self.params["user_id"]), Mock(id=self.params["user_id"] + 1)]
+        PersistentSubsectionGrade.prefetch(self.course_key, users)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(PersistentSubsectionGrade.bulk_read_grades(users[0].id, self.course_key), [grade])
+            self.assertEqual(PersistentSubsectionGrade.bulk_read_grades(users[1].id, self.course_key), [])
+
+        # prefetched grades are only read once
+        with self.assertNumQueries(1):
+            self.assertEqual(list(PersistentSubsectionGrade.bulk_read_grades(users[0].id, self.course_key)), [grade])
+
     def _assert_tracker_emitted_event(self, tracker_mock, grade):
         """
         Helper function to ensure that the mocked event tracker
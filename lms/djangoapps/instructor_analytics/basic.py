@@ -432,7 +432,7 @@ def list_problem_responses(course_key, problem_location):
     smdat = StudentModule.objects.filter(
         course_id=course_key,
         module_state_key=problem_key
-    )
+    ).select_related('student')
     smdat = smdat.order_by('student')
 
     return [
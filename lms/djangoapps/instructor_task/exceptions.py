@@ -16,3 +16,11 @@ class UpdateProblemModuleStateError(Exception):
 class DuplicateTaskException(Exception):
     """Exception indicating that a task already exists or has already completed."""
     pass
+
+
+class GradeReportPartError(Exception):
+    """
+    Error signaling that a part of a grade report is missing, so that the
+    parts cannot be merged into a complete report.
+    """
+    pass
@@ -17,12 +17,14 @@ import hashlib
 import json
 import logging
 import os.path
+from tempfile import SpooledTemporaryFile
 from uuid import uuid4
 
+import unicodecsv
 from boto.exception import BotoServerError
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
+from django.core.files.base import File
 from django.db import models, transaction
 
 from openedx.core.djangoapps.xmodule_django.models import CourseKeyField
@@ -178,12 +180,57 @@ class InstructorTask(models.Model):
         return json.dumps({'message': 'Task revoked before running'})
 
 
+class ReportCSVFile(object):
+    """
+    A CSV report that rows can be appended to as they are produced.
+
+    Rows are written to a temporary file which is held in memory until it grows
+    past `max_size` bytes, and is then spooled to disk. This allows reports of
+    any size to be generated without holding all of their rows in memory.
+    """
+    # Reports up to this many bytes are kept in memory while being written.
+    MAX_MEMORY_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, max_size=None):
+        self._file = SpooledTemporaryFile(max_size=max_size or self.MAX_MEMORY_SIZE)
+        self._writer = csv.writer(self._file)
+        self.num_rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_rows(self, rows):
+        """
+        Append `rows` (each row is an iterable of strings) to the report,
+        encoding unicode strings as utf-8 for CSV compatibility.
+        """
+        for row in rows:
+            self._writer.writerow([unicode(item).encode('utf-8') for item in row])
+            self.num_rows += 1
+
+    def as_file(self, name=None):
+        """
+        Return the report as a django File, ready to be read from the beginning.
+        """
+        self._file.seek(0)
+        return File(self._file, name=name)
+
+    def close(self):
+        """
+        Release the underlying temporary file.
+        """
+        self._file.close()
+
+
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
-    download. Should probably refactor later to create a ReportFile object that
-    can simply be appended to for the sake of memory efficiency, rather than
-    passing in the whole dataset. Doing that for now just because it's simpler.
+    download. Reports can either be stored from a complete iterable of rows,
+    or from a ReportCSVFile that was appended to while the report was being
+    generated.
     """
     @classmethod
     def from_config(cls, config_name):
@@ -215,15 +262,6 @@ class ReportStore(object):
             )
         return DjangoStorageReportStore.from_config(config_name)
 
-    def _get_utf8_encoded_rows(self, rows):
-        """
-        Given a list of `rows` containing unicode strings, return a
-        new list of rows with those strings encoded as utf-8 for CSV
-        compatibility.
-        """
-        for row in rows:
-            yield [unicode(item).encode('utf-8') for item in row]
-
 
 class DjangoStorageReportStore(ReportStore):
     """
@@ -267,12 +305,44 @@ class DjangoStorageReportStore(ReportStore):
         """
         Given a course_id, filename, and rows (each row is an iterable of
         strings), write the rows to the storage backend in csv format.
+
+        `rows` may be a generator, in which case rows are written out as they
+        are produced rather than being held in memory.
+        """
+        with ReportCSVFile() as csv_file:
+            csv_file.write_rows(rows)
+            self.store_csv_file(course_id, filename, csv_file)
+
+    def store_csv_file(self, course_id, filename, csv_file):
+        """
+        Given a course_id, filename, and a ReportCSVFile, write the rows that
+        were appended to the file to the storage backend.
+        """
+        self.store(course_id, filename, csv_file.as_file(name=filename))
+
+    def read_rows(self, course_id, filename):
+        """
+        Yield the rows of a CSV file that was previously stored for
+        `course_id`, as lists of unicode strings. Yields nothing if there is
+        no such file.
+        """
+        if not self.exists(course_id, filename):
+            return
+        with self.storage.open(self.path_to(course_id, filename)) as csv_file:
+            for row in unicodecsv.reader(csv_file, encoding='utf-8'):
+                yield row
+
+    def exists(self, course_id, filename):
+        """
+        Return whether a file named `filename` was stored for `course_id`.
+        """
+        return self.storage.exists(self.path_to(course_id, filename))
+
+    def delete(self, course_id, filename):
+        """
+        Delete the file named `filename` that was stored for `course_id`.
         """
-        output_buffer = ContentFile('')
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        output_buffer.seek(0)
-        self.store(course_id, filename, output_buffer)
+        self.storage.delete(self.path_to(course_id, filename))
 
     def links_for(self, course_id):
         """
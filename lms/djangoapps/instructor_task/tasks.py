@@ -204,6 +204,39 @@ def calculate_problem_grade_report(entry_id, xmodule_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+# Grade reports that can be generated in parts by generate_grade_report_part.
+PARALLEL_GRADE_REPORTS = {
+    report_class.REPORT_NAME: report_class
+    for report_class in (CourseGradeReport, ProblemGradeReport)
+}
+
+
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def generate_grade_report_part(
+        entry_id, xmodule_instance_args, report_name, part_number, user_ids, subtask_status_dict,
+):
+    """
+    Grade one range of a course's enrollments, and store the resulting rows
+    as part `part_number` of a grade report.
+
+    These subtasks are queued by the `calculate_grades_csv` and
+    `calculate_problem_grade_report` tasks when parallel grade reports are
+    enabled. The subtask that completes last queues `merge_grade_report_parts`.
+    """
+    return PARALLEL_GRADE_REPORTS[report_name].generate_part(
+        entry_id, xmodule_instance_args, part_number, user_ids, subtask_status_dict,
+    )
+
+
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def merge_grade_report_parts(entry_id, xmodule_instance_args, report_name):
+    """
+    Stitch the parts of a grade report, in order, into the final report and
+    push it to an S3 bucket for download.
+    """
+    PARALLEL_GRADE_REPORTS[report_name].merge_parts(entry_id, xmodule_instance_args)
+
+
 @task(base=BaseInstructorTask)  # pylint: disable=not-callable
 def calculate_students_features_csv(entry_id, xmodule_instance_args):
     """
@@ -1,13 +1,18 @@
 """
 Functionality for generating grade reports.
 """
+import json
 import logging
 import re
+import traceback
 from collections import OrderedDict
 from datetime import datetime
-from itertools import chain, izip, izip_longest
+from itertools import chain, count, izip_longest
 from time import time
 
+from celery.states import FAILURE, SUCCESS
+from django.conf import settings
+from django.contrib.auth.models import User
 from lazy import lazy
 from pytz import UTC
 
@@ -16,8 +21,16 @@ from courseware.courses import get_course_by_id
 from instructor_analytics.basic import list_problem_responses
 from instructor_analytics.csvs import format_dictlist
 from lms.djangoapps.grades.context import grading_context, grading_context_for_course
-from lms.djangoapps.grades.models import PersistentCourseGrade
 from lms.djangoapps.grades.course_grade_factory import CourseGradeFactory
+from lms.djangoapps.instructor_task.config.models import GradeReportSetting
+from lms.djangoapps.instructor_task.exceptions import GradeReportPartError
+from lms.djangoapps.instructor_task.models import InstructorTask, ReportCSVFile, ReportStore
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    check_subtask_is_valid,
+    queue_subtasks_for_query,
+    update_subtask_status
+)
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.models import SoftwareSecurePhotoVerification
 from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
@@ -30,7 +43,7 @@ from xmodule.partitions.partitions_service import PartitionService
 from xmodule.split_test_module import get_split_user_partitions
 
 from .runner import TaskProgress
-from .utils import upload_csv_to_report_store
+from .utils import upload_csv_file_to_report_store, upload_csv_to_report_store
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -181,22 +194,288 @@ class _CourseGradeBulkContext(object):
         self.enrollments = _EnrollmentBulkContext(context, users)
         bulk_cache_cohorts(context.course_id, users)
         BulkRoleCache.prefetch(users)
-        PersistentCourseGrade.prefetch(context.course_id, users)
         BulkCourseTags.prefetch(context.course_id, users)
 
 
-class CourseGradeReport(object):
+def _enrolled_users(course_id):
     """
-    Class to encapsulate functionality related to generating Grade Reports.
+    Returns a queryset of all users (active or not) enrolled in the course,
+    in a stable order so that it can be split into ranges.
+    """
+    return CourseEnrollment.objects.users_enrolled_in(course_id, include_inactive=True).order_by('id')
+
+
+def _user_batches(users, batch_size):
+    """
+    Returns a generator of batches of at most `batch_size` users.
+    """
+    args = [iter(users)] * batch_size
+    for batch in izip_longest(*args, fillvalue=None):
+        yield [user for user in batch if user is not None]
+
+
+class _ParallelGradeReportMixin(object):
+    """
+    Mixin for grade reports that can be generated by several celery workers
+    at once.
+
+    When the GradeReportSetting is enabled, the course's enrollments are split
+    into ranges of `batch_size` learners, each of which is graded by its own
+    subtask (see `instructor_task.subtasks`). Every subtask writes its rows as a
+    partial CSV in the report store, and the subtask that completes last queues
+    a task that stitches the parts together, in order, into the final report.
+    The InstructorTask stays in progress until that merge task completes it; if
+    any part failed, the merge fails rather than omitting its learners.
+
+    Subclasses provide the report names, and the `_headers` and
+    `_rows_for_users` methods used to build the report.
     """
-    # Batch size for chunking the list of enrollees in the course.
+    # Names of the final success and error CSVs.
+    REPORT_NAME = None
+    ERROR_REPORT_NAME = None
+
+    # Batch size for chunking the list of users graded within a single part.
     USER_BATCH_SIZE = 100
 
+    def _headers(self, context):
+        """
+        Returns a tuple of the (success_headers, error_headers) for this report.
+        """
+        raise NotImplementedError
+
+    def _rows_for_users(self, context, users):
+        """
+        Returns a tuple of the (success_rows, error_rows) for the given users.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def _queue_parts(cls, xmodule_instance_args, entry_id, course_id, action_name):
+        """
+        Queues a subtask for each range of enrollments in the course if
+        parallel grade reports are enabled and there is more than one range.
+
+        Returns the task progress if the subtasks were queued, or None if the
+        report should be generated serially instead.
+        """
+        grade_report_setting = GradeReportSetting.current()
+        if not grade_report_setting.enabled:
+            return None
+
+        users = _enrolled_users(course_id)
+        total_num_users = users.count()
+        if total_num_users <= grade_report_setting.batch_size:
+            return None
+
+        entry = InstructorTask.objects.get(pk=entry_id)
+        # If the parent task is requeued, its subtasks have already been
+        # defined, so don't queue them again.
+        if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+            TASK_LOG.warning(u'Task %s: grade report parts have already been queued', entry.task_id)
+            return json.loads(entry.task_output)
+
+        # Imported here to avoid a circular import; the tasks module imports this one.
+        from lms.djangoapps.instructor_task.tasks import generate_grade_report_part
+
+        part_numbers = count()
+
+        def _create_part_subtask(user_items, initial_subtask_status):
+            """Creates a subtask to generate the part of the report for the given users."""
+            return generate_grade_report_part.subtask(
+                (
+                    entry_id,
+                    xmodule_instance_args,
+                    cls.REPORT_NAME,
+                    next(part_numbers),
+                    [user_item['pk'] for user_item in user_items],
+                    initial_subtask_status.to_dict(),
+                ),
+                task_id=initial_subtask_status.task_id,
+                routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+            )
+
+        return queue_subtasks_for_query(
+            entry,
+            action_name,
+            _create_part_subtask,
+            [users],
+            [],
+            grade_report_setting.batch_size,
+            total_num_users,
+        )
+
+    @classmethod
+    def generate_part(cls, entry_id, xmodule_instance_args, part_number, user_ids, subtask_status_dict):
+        """
+        Grades the given users, and stores their rows as part `part_number` of
+        the report. Queues the merge of all of the parts if this was the last
+        part to complete.
+
+        Returns the subtask status, as a dict.
+        """
+        subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+        current_task_id = subtask_status.task_id
+        check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+        entry = InstructorTask.objects.get(pk=entry_id)
+        try:
+            cls._generate_part(entry, xmodule_instance_args, part_number, user_ids, subtask_status)
+        except Exception:
+            TASK_LOG.exception(u'Task %s: failed to generate grade report part %d', entry.task_id, part_number)
+            subtask_status.increment(failed=len(user_ids) - subtask_status.attempted, state=FAILURE)
+            cls._complete_part(entry, current_task_id, subtask_status, xmodule_instance_args)
+            raise
+
+        subtask_status.increment(state=SUCCESS)
+        cls._complete_part(entry, current_task_id, subtask_status, xmodule_instance_args)
+        return subtask_status.to_dict()
+
+    @classmethod
+    def _generate_part(cls, entry, xmodule_instance_args, part_number, user_ids, subtask_status):
+        """
+        Writes the success and error rows for the given users to the report
+        store, as part `part_number` of the report.
+        """
+        report = cls()
+        report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+        users = User.objects.filter(id__in=user_ids).select_related('profile').order_by('id')
+
+        with modulestore().bulk_operations(entry.course_id):
+            context = cls._context_for_entry(entry, xmodule_instance_args)
+            with ReportCSVFile() as success_file, ReportCSVFile() as error_file:
+                for batch in _user_batches(users, cls.USER_BATCH_SIZE):
+                    success_rows, error_rows = report._rows_for_users(context, batch)
+                    success_file.write_rows(success_rows)
+                    error_file.write_rows(error_rows)
+                    subtask_status.increment(succeeded=len(success_rows), failed=len(error_rows))
+
+                report_store.store_csv_file(
+                    entry.course_id, cls._part_filename(entry, part_number, cls.REPORT_NAME), success_file,
+                )
+                report_store.store_csv_file(
+                    entry.course_id, cls._part_filename(entry, part_number, cls.ERROR_REPORT_NAME), error_file,
+                )
+
+    @classmethod
+    def _complete_part(cls, entry, current_task_id, subtask_status, xmodule_instance_args):
+        """
+        Records the status of a completed part, and queues the merge of all of
+        the parts if it was the last one. The InstructorTask is left in
+        progress, for the merge to complete.
+        """
+        if update_subtask_status(entry.id, current_task_id, subtask_status, complete_parent=False):
+            # Imported here to avoid a circular import; the tasks module imports this one.
+            from lms.djangoapps.instructor_task.tasks import merge_grade_report_parts
+
+            merge_grade_report_parts.apply_async(
+                (entry.id, xmodule_instance_args, cls.REPORT_NAME),
+                routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+            )
+
+    @classmethod
+    def merge_parts(cls, entry_id, xmodule_instance_args):
+        """
+        Stitches the parts of a report, in order, into the final success and
+        error CSVs, uploads them, and deletes the parts.
+
+        Marks the InstructorTask as succeeded once the report is uploaded, or
+        as failed if any part failed or the merge itself fails.
+        """
+        entry = InstructorTask.objects.get(pk=entry_id)
+        num_parts = json.loads(entry.subtasks)['total']
+        report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+        try:
+            cls._merge_parts(entry, xmodule_instance_args, num_parts, report_store)
+        except Exception as exception:
+            TASK_LOG.exception(u'Task %s: failed to merge grade report parts', entry.task_id)
+            entry.task_state = FAILURE
+            entry.task_output = InstructorTask.create_output_for_failure(exception, traceback.format_exc())
+            entry.save_now()
+            raise
+        finally:
+            for part_number in range(num_parts):
+                for report_name in (cls.REPORT_NAME, cls.ERROR_REPORT_NAME):
+                    report_store.delete(entry.course_id, cls._part_filename(entry, part_number, report_name))
+
+        entry.task_state = SUCCESS
+        entry.save_now()
+        TASK_LOG.info(
+            u'Task: %s, InstructorTask ID: %s, Course: %s, Merged %d grade report parts',
+            entry.task_id, entry_id, entry.course_id, num_parts,
+        )
+
+    @classmethod
+    def _merge_parts(cls, entry, xmodule_instance_args, num_parts, report_store):
+        """
+        Writes the parts of the report, in order, to the final success and
+        error CSVs and uploads them. Raises GradeReportPartError if any of the
+        parts failed, rather than uploading a report missing their learners.
+        """
+        num_failed_parts = json.loads(entry.subtasks)['failed']
+        if num_failed_parts > 0:
+            raise GradeReportPartError(
+                u'{} of {} grade report parts failed'.format(num_failed_parts, num_parts)
+            )
+
+        with modulestore().bulk_operations(entry.course_id):
+            context = cls._context_for_entry(entry, xmodule_instance_args)
+            success_headers, error_headers = cls()._headers(context)
+
+        with ReportCSVFile() as success_file, ReportCSVFile() as error_file:
+            success_file.write_rows([success_headers])
+            error_file.write_rows([error_headers])
+            for part_number in range(num_parts):
+                for report_name, csv_file in ((cls.REPORT_NAME, success_file), (cls.ERROR_REPORT_NAME, error_file)):
+                    part_filename = cls._part_filename(entry, part_number, report_name)
+                    if not report_store.exists(entry.course_id, part_filename):
+                        raise GradeReportPartError(u'Grade report part {} is missing'.format(part_filename))
+                    csv_file.write_rows(report_store.read_rows(entry.course_id, part_filename))
+
+            date = datetime.now(UTC)
+            upload_csv_file_to_report_store(success_file, cls.REPORT_NAME, entry.course_id, date)
+            if error_file.num_rows > 1:
+                upload_csv_file_to_report_store(error_file, cls.ERROR_REPORT_NAME, entry.course_id, date)
+
+    @classmethod
+    def _context_for_entry(cls, entry, xmodule_instance_args):
+        """
+        Returns the report context for a subtask of the given InstructorTask.
+        """
+        action_name = json.loads(entry.task_output)['action_name']
+        return _CourseGradeReportContext(
+            xmodule_instance_args, entry.id, entry.course_id, json.loads(entry.task_input), action_name,
+        )
+
+    @classmethod
+    def _part_filename(cls, entry, part_number, report_name):
+        """
+        Returns the name of the file in which a part of the report is stored.
+        Parts are kept in a subdirectory, so that they aren't listed among the
+        course's downloadable reports.
+        """
+        return u'parts/{task_id}/{report_name}_{part_number:05d}.csv'.format(
+            task_id=entry.task_id,
+            report_name=report_name,
+            part_number=part_number,
+        )
+
+
+class CourseGradeReport(_ParallelGradeReportMixin):
+    """
+    Class to encapsulate functionality related to generating Grade Reports.
+    """
+    REPORT_NAME = 'grade_report'
+    ERROR_REPORT_NAME = 'grade_report_err'
+
     @classmethod
     def generate(cls, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
         """
         Public method to generate a grade report.
         """
+        progress = cls._queue_parts(_xmodule_instance_args, _entry_id, course_id, action_name)
+        if progress is not None:
+            return progress
+
         with modulestore().bulk_operations(course_id):
             context = _CourseGradeReportContext(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name)
             return CourseGradeReport()._generate(context)
@@ -211,10 +490,13 @@ class CourseGradeReport(object):
         batched_rows = self._batched_rows(context)
 
         context.update_status(u'Compiling grades')
-        success_rows, error_rows = self._compile(context, batched_rows)
+        with ReportCSVFile() as success_file, ReportCSVFile() as error_file:
+            success_file.write_rows([success_headers])
+            error_file.write_rows([error_headers])
+            self._compile(context, batched_rows, success_file, error_file)
 
-        context.update_status(u'Uploading grades')
-        self._upload(context, success_headers, success_rows, error_headers, error_rows)
+            context.update_status(u'Uploading grades')
+            self._upload(context, success_file, error_file)
 
         return context.update_status(u'Completed grades')
 
@@ -239,40 +521,46 @@ class CourseGradeReport(object):
         """
         return ["Student ID", "Username", "Error"]
 
+    def _headers(self, context):
+        """
+        Returns a tuple of the (success_headers, error_headers) for this report.
+        """
+        return self._success_headers(context), self._error_headers()
+
     def _batched_rows(self, context):
         """
         A generator of batches of (success_rows, error_rows) for this report.
         """
         for users in self._batch_users(context):
-            users = filter(lambda u: u is not None, users)
             yield self._rows_for_users(context, users)
 
-    def _compile(self, context, batched_rows):
+    def _compile(self, context, batched_rows, success_file, error_file):
         """
-        Compiles and returns the complete list of (success_rows, error_rows) for
-        the given batched_rows and context.
+        Writes the (success_rows, error_rows) of each of the given batched_rows
+        to success_file and error_file as soon as the batch is produced, and
+        updates the task progress after every batch. Only a single batch of rows
+        is held in memory at any time, however many learners are enrolled.
         """
-        # partition and chain successes and errors
-        success_rows, error_rows = izip(*batched_rows)
-        success_rows = list(chain(*success_rows))
-        error_rows = list(chain(*error_rows))
+        for success_rows, error_rows in batched_rows:
+            success_file.write_rows(success_rows)
+            error_file.write_rows(error_rows)
 
-        # update metrics on task status
-        context.task_progress.succeeded = len(success_rows)
-        context.task_progress.failed = len(error_rows)
-        context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
-        context.task_progress.total = context.task_progress.attempted
-        return success_rows, error_rows
+            # update metrics on task status
+            context.task_progress.succeeded += len(success_rows)
+            context.task_progress.failed += len(error_rows)
+            context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
+            context.task_progress.total = context.task_progress.attempted
+            context.task_progress.update_task_state(extra_meta={'step': u'Compiling grades'})
 
-    def _upload(self, context, success_headers, success_rows, error_headers, error_rows):
+    def _upload(self, context, success_file, error_file):
         """
-        Creates and uploads a CSV for the given headers and rows.
+        Uploads the CSV files that the report's rows were written to.
         """
         date = datetime.now(UTC)
-        upload_csv_to_report_store([success_headers] + success_rows, 'grade_report', context.course_id, date)
-        if len(error_rows) > 0:
-            error_rows = [error_headers] + error_rows
-            upload_csv_to_report_store(error_rows, 'grade_report_err', context.course_id, date)
+        upload_csv_file_to_report_store(success_file, self.REPORT_NAME, context.course_id, date)
+        # The error report always contains its header row.
+        if error_file.num_rows > 1:
+            upload_csv_file_to_report_store(error_file, self.ERROR_REPORT_NAME, context.course_id, date)
 
     def _grades_header(self, context):
         """
@@ -290,13 +578,9 @@ class CourseGradeReport(object):
         """
         Returns a generator of batches of users.
         """
-        def grouper(iterable, chunk_size=self.USER_BATCH_SIZE, fillvalue=None):
-            args = [iter(iterable)] * chunk_size
-            return izip_longest(*args, fillvalue=fillvalue)
-
         users = CourseEnrollment.objects.users_enrolled_in(context.course_id, include_inactive=True)
         users = users.select_related('profile')
-        return grouper(users)
+        return _user_batches(users, self.USER_BATCH_SIZE)
 
     def _user_grades(self, course_grade, context):
         """
@@ -427,7 +711,7 @@ class CourseGradeReport(object):
             bulk_context = _CourseGradeBulkContext(context, users)
 
             success_rows, error_rows = [], []
-            for user, course_grade, error in CourseGradeFactory().iter(
+            for user, course_grade, error in CourseGradeFactory().bulk_iter(
                 users,
                 course=context.course,
                 collected_block_structure=context.course_structure,
@@ -450,30 +734,41 @@ class CourseGradeReport(object):
             return success_rows, error_rows
 
 
-class ProblemGradeReport(object):
+class ProblemGradeReport(_ParallelGradeReportMixin):
+    REPORT_NAME = 'problem_grade_report'
+    ERROR_REPORT_NAME = 'problem_grade_report_err'
+
+    # This struct encapsulates both the display names of each static item in the
+    # header row as values as well as the django User field names of those items
+    # as the keys.  It is structured in this way to keep the values related.
+    HEADER_ROW = OrderedDict([('id', 'Student ID'), ('email', 'Email'), ('username', 'Username')])
+
+    def __init__(self):
+        self._graded_scorable_blocks_map = None
+
     @classmethod
     def generate(cls, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
         """
         Generate a CSV containing all students' problem grades within a given
         `course_id`.
         """
+        progress = cls._queue_parts(_xmodule_instance_args, _entry_id, course_id, action_name)
+        if progress is not None:
+            return progress
+
         start_time = time()
         start_date = datetime.now(UTC)
         status_interval = 100
         enrolled_students = CourseEnrollment.objects.users_enrolled_in(course_id, include_inactive=True)
         task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
 
-        # This struct encapsulates both the display names of each static item in the
-        # header row as values as well as the django User field names of those items
-        # as the keys.  It is structured in this way to keep the values related.
-        header_row = OrderedDict([('id', 'Student ID'), ('email', 'Email'), ('username', 'Username')])
-
         course = get_course_by_id(course_id)
         graded_scorable_blocks = cls._graded_scorable_blocks_to_header(course)
 
         # Just generate the static fields for now.
-        rows = [list(header_row.values()) + ['Enrollment Status', 'Grade'] + _flatten(graded_scorable_blocks.values())]
-        error_rows = [list(header_row.values()) + ['error_msg']]
+        success_headers, error_headers = cls._headers_for_blocks(graded_scorable_blocks)
+        rows = [success_headers]
+        error_rows = [error_headers]
         current_step = {'step': 'Calculating Grades'}
 
         # Bulk fetch and cache enrollment states so we can efficiently determine
@@ -481,33 +776,14 @@ class ProblemGradeReport(object):
         CourseEnrollment.bulk_fetch_enrollment_states(enrolled_students, course_id)
 
         for student, course_grade, error in CourseGradeFactory().iter(enrolled_students, course):
-            student_fields = [getattr(student, field_name) for field_name in header_row]
             task_progress.attempted += 1
 
             if not course_grade:
-                err_msg = error.message
-                # There was an error grading this student.
-                if not err_msg:
-                    err_msg = u'Unknown error'
-                error_rows.append(student_fields + [err_msg])
+                error_rows.append(cls._error_row(student, error))
                 task_progress.failed += 1
                 continue
 
-            enrollment_status = _user_enrollment_status(student, course_id)
-
-            earned_possible_values = []
-            for block_location in graded_scorable_blocks:
-                try:
-                    problem_score = course_grade.problem_scores[block_location]
-                except KeyError:
-                    earned_possible_values.append([u'Not Available', u'Not Available'])
-                else:
-                    if problem_score.first_attempted:
-                        earned_possible_values.append([problem_score.earned, problem_score.possible])
-                    else:
-                        earned_possible_values.append([u'Not Attempted', problem_score.possible])
-
-            rows.append(student_fields + [enrollment_status, course_grade.percent] + _flatten(earned_possible_values))
+            rows.append(cls._success_row(student, course_grade, course_id, graded_scorable_blocks))
 
             task_progress.succeeded += 1
             if task_progress.attempted % status_interval == 0:
@@ -515,13 +791,90 @@ class ProblemGradeReport(object):
 
         # Perform the upload if any students have been successfully graded
         if len(rows) > 1:
-            upload_csv_to_report_store(rows, 'problem_grade_report', course_id, start_date)
+            upload_csv_to_report_store(rows, cls.REPORT_NAME, course_id, start_date)
         # If there are any error rows, write them out as well
         if len(error_rows) > 1:
-            upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
+            upload_csv_to_report_store(error_rows, cls.ERROR_REPORT_NAME, course_id, start_date)
 
         return task_progress.update_task_state(extra_meta={'step': 'Uploading CSV'})
 
+    def _headers(self, context):
+        """
+        Returns a tuple of the (success_headers, error_headers) for this report.
+        """
+        return self._headers_for_blocks(self._graded_scorable_blocks(context))
+
+    def _rows_for_users(self, context, users):
+        """
+        Returns a tuple of the (success_rows, error_rows) for the given users.
+        """
+        graded_scorable_blocks = self._graded_scorable_blocks(context)
+        CourseEnrollment.bulk_fetch_enrollment_states(users, context.course_id)
+
+        success_rows, error_rows = [], []
+        for student, course_grade, error in CourseGradeFactory().bulk_iter(users, context.course):
+            if not course_grade:
+                error_rows.append(self._error_row(student, error))
+            else:
+                success_rows.append(
+                    self._success_row(student, course_grade, context.course_id, graded_scorable_blocks)
+                )
+        return success_rows, error_rows
+
+    def _graded_scorable_blocks(self, context):
+        """
+        Returns the graded scorable blocks for the context's course, computing
+        them only once per report instance.
+        """
+        if self._graded_scorable_blocks_map is None:
+            self._graded_scorable_blocks_map = self._graded_scorable_blocks_to_header(context.course)
+        return self._graded_scorable_blocks_map
+
+    @classmethod
+    def _headers_for_blocks(cls, graded_scorable_blocks):
+        """
+        Returns a tuple of the (success_headers, error_headers) for a report
+        on the given graded scorable blocks.
+        """
+        static_headers = list(cls.HEADER_ROW.values())
+        return (
+            static_headers + ['Enrollment Status', 'Grade'] + _flatten(graded_scorable_blocks.values()),
+            static_headers + ['error_msg'],
+        )
+
+    @classmethod
+    def _error_row(cls, student, error):
+        """
+        Returns the report row for a student who could not be graded.
+        """
+        err_msg = error.message
+        # There was an error grading this student.
+        if not err_msg:
+            err_msg = u'Unknown error'
+        return [getattr(student, field_name) for field_name in cls.HEADER_ROW] + [err_msg]
+
+    @classmethod
+    def _success_row(cls, student, course_grade, course_id, graded_scorable_blocks):
+        """
+        Returns the report row for a graded student.
+        """
+        student_fields = [getattr(student, field_name) for field_name in cls.HEADER_ROW]
+        enrollment_status = _user_enrollment_status(student, course_id)
+
+        earned_possible_values = []
+        for block_location in graded_scorable_blocks:
+            try:
+                problem_score = course_grade.problem_scores[block_location]
+            except KeyError:
+                earned_possible_values.append([u'Not Available', u'Not Available'])
+            else:
+                if problem_score.first_attempted:
+                    earned_possible_values.append([problem_score.earned, problem_score.possible])
+                else:
+                    earned_possible_values.append([u'Not Attempted', problem_score.possible])
+
+        return student_fields + [enrollment_status, course_grade.percent] + _flatten(earned_possible_values)
+
     @classmethod
     def _graded_scorable_blocks_to_header(cls, course):
         """
@@ -11,10 +11,11 @@ from opaque_keys.edx.keys import UsageKey
 import dogstats_wrapper as dog_stats_api
 from capa.responsetypes import LoncapaProblemError, ResponseError, StudentInputError
 from courseware.courses import get_course_by_id, get_problems_in_section
-from courseware.model_data import DjangoKeyValueStore, FieldDataCache
-from courseware.models import StudentModule
+from courseware.model_data import DjangoKeyValueStore, FieldDataCache, MultiUserFieldDataCache
+from courseware.models import StudentModule, chunks
 from courseware.module_render import get_module_for_descriptor_internal
 from lms.djangoapps.grades.events import GRADES_OVERRIDE_EVENT_TYPE, GRADES_RESCORE_EVENT_TYPE
+from student.models import anonymous_id_for_user
 from track.event_transaction_utils import create_new_event_transaction_id, set_event_transaction_type
 from track.views import task_track
 from util.db import outer_atomic
@@ -28,6 +29,9 @@ from .utils import UNKNOWN_TASK_ID, UPDATE_STATUS_FAILED, UPDATE_STATUS_SKIPPED,
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
+# Number of StudentModules whose students' field data is read together.
+MODULE_STATE_BATCH_SIZE = 100
+
 
 def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
     """
@@ -44,7 +48,9 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     The `update_fcn` is called on each StudentModule that passes the resulting filtering.
     It is passed four arguments:  the module_descriptor for the module pointed to by the
     module_state_key, the particular StudentModule to update, the xmodule_instance_args, and the task_input
-    being passed through.  If the value returned by the update function evaluates to a boolean True,
+    being passed through.  It is also passed a `field_data_caches` keyword argument, a _FieldDataCaches
+    of the batch of StudentModules being updated, for use in instantiating modules.
+    If the value returned by the update function evaluates to a boolean True,
     the update is successful; False indicates the update on the particular student module failed.
     A raised exception indicates a fatal condition -- that no other student modules should be considered.
 
@@ -108,29 +114,85 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     task_progress = TaskProgress(action_name, modules_to_update.count(), start_time)
     task_progress.update_task_state()
 
-    for module_to_update in modules_to_update:
-        task_progress.attempted += 1
-        module_descriptor = problems[unicode(module_to_update.module_state_key)]
-        # There is no try here:  if there's an error, we let it throw, and the task will
-        # be marked as FAILED, with a stack trace.
-        with dog_stats_api.timer('instructor_tasks.module.time.step', tags=[u'action:{name}'.format(name=action_name)]):
-            update_status = update_fcn(module_descriptor, module_to_update, task_input)
-            if update_status == UPDATE_STATUS_SUCCEEDED:
-                # If the update_fcn returns true, then it performed some kind of work.
-                # Logging of failures is left to the update_fcn itself.
-                task_progress.succeeded += 1
-            elif update_status == UPDATE_STATUS_FAILED:
-                task_progress.failed += 1
-            elif update_status == UPDATE_STATUS_SKIPPED:
-                task_progress.skipped += 1
-            else:
-                raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
+    for modules_batch in chunks(modules_to_update.select_related('student'), MODULE_STATE_BATCH_SIZE):
+        field_data_caches = _FieldDataCaches(course_id, modules_batch)
+        for module_to_update in modules_batch:
+            task_progress.attempted += 1
+            module_descriptor = problems[unicode(module_to_update.module_state_key)]
+            # There is no try here:  if there's an error, we let it throw, and the task will
+            # be marked as FAILED, with a stack trace.
+            with dog_stats_api.timer(
+                'instructor_tasks.module.time.step', tags=[u'action:{name}'.format(name=action_name)]
+            ):
+                update_status = update_fcn(
+                    module_descriptor, module_to_update, task_input, field_data_caches=field_data_caches,
+                )
+                if update_status == UPDATE_STATUS_SUCCEEDED:
+                    # If the update_fcn returns true, then it performed some kind of work.
+                    # Logging of failures is left to the update_fcn itself.
+                    task_progress.succeeded += 1
+                elif update_status == UPDATE_STATUS_FAILED:
+                    task_progress.failed += 1
+                elif update_status == UPDATE_STATUS_SKIPPED:
+                    task_progress.skipped += 1
+                else:
+                    raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
 
     return task_progress.update_task_state()
 
 
+class _FieldDataCaches(object):
+    """
+    The field data of a batch of students, for each of the modules that
+    are updated for them, read for all of the students at once when the
+    first of them needs a module instantiated.
+    """
+    def __init__(self, course_id, student_modules):
+        self.course_id = course_id
+        self.student_modules = list(student_modules)
+        self.students = list({module.student.id: module.student for module in self.student_modules}.values())
+        self._caches = {}
+        self._precomputed_locations = set()
+
+    def for_student(self, module_descriptor, student):
+        """
+        Returns a FieldDataCache for the given student, for the given
+        module descriptor and its descendants.
+        """
+        location = module_descriptor.location
+        if location not in self._caches:
+            self._caches[location] = MultiUserFieldDataCache.cache_for_descriptor_descendents(
+                self.course_id, self.students, module_descriptor,
+            )
+        return self._caches[location].for_user(student)
+
+    def precompute_script_contexts(self, instance):
+        """
+        The first time it's called for a location, executes the script code
+        of the given capa module instance for all of the students of the batch
+        with state for the module, so that instantiating the module for each of
+        them finds the result in the cache.
+        """
+        location = instance.location
+        if location in self._precomputed_locations or getattr(instance, 'lcp', None) is None:
+            return
+        self._precomputed_locations.add(location)
+
+        student_seeds = []
+        for student_module in self.student_modules:
+            if student_module.module_state_key.map_into_course(self.course_id) != location:
+                continue
+            seed = json.loads(student_module.state or '{}').get('seed')
+            if seed is not None:
+                # Capa modules are given the per-student, rather than
+                # per-course, anonymous id.  See get_module_system_for_user.
+                student_seeds.append((anonymous_id_for_user(student_module.student, None), seed))
+        instance.lcp.precompute_contexts(student_seeds)
+
+
 @outer_atomic
-def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module, task_input):
+def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module, task_input,
+                                 field_data_caches=None):
     '''
     Takes an XModule descriptor and a corresponding StudentModule object, and
     performs rescoring on the student's problem submission.
@@ -158,7 +220,8 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
             module_descriptor,
             xmodule_instance_args,
             grade_bucket_type='rescore',
-            course=course
+            course=course,
+            field_data_caches=field_data_caches,
         )
 
         if instance is None:
@@ -181,6 +244,11 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
         if not instance.has_submitted_answer():
             return UPDATE_STATUS_SKIPPED
 
+        # Execute the problem's script code for the rest of the batch at
+        # once, rather than once per student as each is rescored.
+        if field_data_caches is not None:
+            field_data_caches.precompute_script_contexts(instance)
+
         # Set the tracking info before this call, because it makes downstream
         # calls that create events.  We retrieve and store the id here because
         # the request cache will be erased during downstream calls.
@@ -217,7 +285,8 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
 
 
 @outer_atomic
-def override_score_module_state(xmodule_instance_args, module_descriptor, student_module, task_input):
+def override_score_module_state(xmodule_instance_args, module_descriptor, student_module, task_input,
+                                field_data_caches=None):
     '''
     Takes an XModule descriptor and a corresponding StudentModule object, and
     performs an override on the student's problem score.
@@ -243,7 +312,8 @@ def override_score_module_state(xmodule_instance_args, module_descriptor, studen
             student,
             module_descriptor,
             xmodule_instance_args,
-            course=course
+            course=course,
+            field_data_caches=field_data_caches,
         )
 
         if instance is None:
@@ -297,7 +367,8 @@ def override_score_module_state(xmodule_instance_args, module_descriptor, studen
 
 
 @outer_atomic
-def reset_attempts_module_state(xmodule_instance_args, _module_descriptor, student_module, _task_input):
+def reset_attempts_module_state(xmodule_instance_args, _module_descriptor, student_module, _task_input,
+                                field_data_caches=None):  # pylint: disable=unused-argument
     """
     Resets problem attempts to zero for specified `student_module`.
 
@@ -324,7 +395,8 @@ def reset_attempts_module_state(xmodule_instance_args, _module_descriptor, stude
 
 
 @outer_atomic
-def delete_problem_module_state(xmodule_instance_args, _module_descriptor, student_module, _task_input):
+def delete_problem_module_state(xmodule_instance_args, _module_descriptor, student_module, _task_input,
+                                field_data_caches=None):  # pylint: disable=unused-argument
     """
     Delete the StudentModule entry.
 
@@ -339,16 +411,21 @@ def delete_problem_module_state(xmodule_instance_args, _module_descriptor, stude
 
 
 def _get_module_instance_for_task(course_id, student, module_descriptor, xmodule_instance_args=None,
-                                  grade_bucket_type=None, course=None):
+                                  grade_bucket_type=None, course=None, field_data_caches=None):
     """
     Fetches a StudentModule instance for a given `course_id`, `student` object, and `module_descriptor`.
 
     `xmodule_instance_args` is used to provide information for creating a track function and an XQueue callback.
     These are passed, along with `grade_bucket_type`, to get_module_for_descriptor_internal, which sidesteps
     the need for a Request object when instantiating an xmodule instance.
+
+    If given, the student's field data is taken from `field_data_caches`.
     """
     # reconstitute the problem's corresponding XModule:
-    field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course_id, student, module_descriptor)
+    if field_data_caches is not None:
+        field_data_cache = field_data_caches.for_student(module_descriptor, student)
+    else:
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course_id, student, module_descriptor)
     student_data = KvsFieldData(DjangoKeyValueStore(field_data_cache))
 
     # get request-related tracking information from args passthrough, and supplement with task-specific
@@ -30,16 +30,42 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
     report_store = ReportStore.from_config(config_name)
     report_store.store_rows(
         course_id,
-        u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
-            course_prefix=course_filename_prefix_generator(course_id),
-            csv_name=csv_name,
-            timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
-        ),
+        _report_filename(csv_name, course_id, timestamp),
         rows
     )
     tracker_emit(csv_name)
 
 
+def upload_csv_file_to_report_store(csv_file, csv_name, course_id, timestamp, config_name='GRADES_DOWNLOAD'):
+    """
+    Upload a ReportCSVFile, whose rows were written incrementally, using
+    ReportStore.
+
+    Arguments:
+        csv_file (ReportCSVFile): The CSV data to upload
+        csv_name: Name of the resulting CSV
+        course_id: ID of the course
+    """
+    report_store = ReportStore.from_config(config_name)
+    report_store.store_csv_file(
+        course_id,
+        _report_filename(csv_name, course_id, timestamp),
+        csv_file
+    )
+    tracker_emit(csv_name)
+
+
+def _report_filename(csv_name, course_id, timestamp):
+    """
+    Returns the name of the file that a report is stored in.
+    """
+    return u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
+        course_prefix=course_filename_prefix_generator(course_id),
+        csv_name=csv_name,
+        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
+    )
+
+
 def tracker_emit(report_name):
     """
     Emits a 'report.requested' event for the given report.
@@ -12,7 +12,7 @@ from mock import patch
 from opaque_keys.edx.locator import CourseLocator
 
 from common.test.utils import MockS3Mixin
-from lms.djangoapps.instructor_task.models import ReportStore
+from lms.djangoapps.instructor_task.models import ReportCSVFile, ReportStore
 from lms.djangoapps.instructor_task.tests.test_base import TestReportMixin
 
 
@@ -49,6 +49,36 @@ class ReportStoreTestMixin(object):
             ['new_file', 'middle_file', 'old_file']
         )
 
+    def test_store_rows_from_generator(self):
+        """
+        Test that ReportStore.store_rows() accepts rows that are produced
+        lazily.
+        """
+        report_store = self.create_report_store()
+        rows = ([u'row{}'.format(index), u'\xf1'] for index in range(3))
+        report_store.store_rows(self.course_id, 'report.csv', rows)
+
+        with report_store.storage.open(report_store.path_to(self.course_id, 'report.csv')) as csv_file:
+            self.assertEqual(
+                csv_file.read().splitlines(),
+                ['row0,\xc3\xb1', 'row1,\xc3\xb1', 'row2,\xc3\xb1'],
+            )
+
+    def test_store_spooled_csv_file(self):
+        """
+        Test that a ReportCSVFile which has been spooled to disk is stored in
+        full.
+        """
+        report_store = self.create_report_store()
+        with ReportCSVFile(max_size=10) as csv_file:
+            for index in range(100):
+                csv_file.write_rows([[u'row{}'.format(index)]])
+            report_store.store_csv_file(self.course_id, 'report.csv', csv_file)
+            self.assertEqual(csv_file.num_rows, 100)
+
+        with report_store.storage.open(report_store.path_to(self.course_id, 'report.csv')) as csv_file:
+            self.assertEqual(len(csv_file.read().splitlines()), 100)
+
 
 class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, SimpleTestCase):
     """
@@ -8,6 +8,7 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 
 """
 
+import json
 import os
 import shutil
 import tempfile
@@ -16,6 +17,7 @@ from datetime import datetime
 
 import ddt
 import unicodecsv
+from celery.states import FAILURE, SUCCESS
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.test.utils import override_settings
@@ -34,6 +36,8 @@ from courseware.tests.factories import InstructorFactory
 from instructor_analytics.basic import UNAVAILABLE
 from lms.djangoapps.grades.models import PersistentCourseGrade
 from lms.djangoapps.grades.transformer import GradesTransformer
+from lms.djangoapps.instructor_task.config.models import GradeReportSetting
+from lms.djangoapps.instructor_task.subtasks import initialize_subtask_info
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
     upload_enrollment_report,
@@ -53,6 +57,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_course_survey_report,
     upload_ora2_data
 )
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -83,7 +88,7 @@ from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory, check_mongo_calls
 from xmodule.partitions.partitions import Group, UserPartition
 
-from ..models import ReportStore
+from ..models import PROGRESS, ReportStore
 from ..tasks_helper.utils import UPDATE_STATUS_FAILED, UPDATE_STATUS_SUCCEEDED
 
 
@@ -150,6 +155,34 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
         self.assertTrue(any('grade_report_err' in item[0] for item in report_store.links_for(self.course.id)))
 
+    @patch('lms.djangoapps.instructor_task.tasks_helper.grades.CourseGradeReport.USER_BATCH_SIZE', 1)
+    def test_progress_updated_per_batch(self):
+        """
+        Test that rows are streamed to the report, and the task progress
+        updated, as each batch of users is graded.
+        """
+        for i in range(3):
+            self.create_student('student{0}'.format(i))
+
+        self.current_task = Mock()
+        self.current_task.update_state = Mock()
+        with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task') as mock_current_task:
+            mock_current_task.return_value = self.current_task
+            result = CourseGradeReport.generate(None, None, self.course.id, None, 'graded')
+
+        self.assertDictContainsSubset({'attempted': 3, 'succeeded': 3, 'failed': 0}, result)
+        compiling_updates = [
+            call[1]['meta']['attempted']
+            for call in self.current_task.update_state.call_args_list
+            if call[1]['meta']['step'] == u'Compiling grades'
+        ]
+        self.assertEqual(compiling_updates, [0, 1, 2, 3])
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        report_csv_filename = report_store.links_for(self.course.id)[0][0]
+        with report_store.storage.open(report_store.path_to(self.course.id, report_csv_filename)) as csv_file:
+            self.assertEqual(len(list(unicodecsv.DictReader(csv_file))), 3)
+
     def test_cohort_data_in_grading(self):
         """
         Test that cohort data is included in grades csv if cohort configuration is enabled for course.
@@ -1804,6 +1837,114 @@ class TestGradeReport(TestReportMixin, InstructorTaskModuleTestCase):
                     self.assertFalse(mock_course_blocks.called)
 
 
+@ddt.ddt
+class TestParallelGradeReport(TestReportMixin, InstructorTaskCourseTestCase):
+    """
+    Test that grade reports can be generated in parts by separate subtasks.
+    """
+    def setUp(self):
+        super(TestParallelGradeReport, self).setUp()
+        self.course = CourseFactory.create()
+        self.students = [self.create_student(u'student{}'.format(index)) for index in range(3)]
+        GradeReportSetting.objects.create(enabled=True, batch_size=2)
+
+    def _create_entry(self, task_type):
+        """
+        Creates the InstructorTask for a grade report.
+        """
+        return InstructorTaskFactory.create(course_id=self.course.id, task_type=task_type, task_id='parent-task')
+
+    @ddt.data(CourseGradeReport, ProblemGradeReport)
+    def test_parts_queued(self, report_class):
+        entry = self._create_entry('grade_course')
+        with patch('lms.djangoapps.instructor_task.tasks_helper.grades.queue_subtasks_for_query') as mock_queue:
+            mock_queue.return_value = {'total': 3}
+            result = report_class.generate(None, entry.id, self.course.id, None, 'graded')
+
+        self.assertEqual(result, {'total': 3})
+        __, __, __, querysets, __, items_per_task, total_num_items = mock_queue.call_args[0]
+        self.assertEqual(list(querysets[0]), self.students)
+        self.assertEqual(items_per_task, 2)
+        self.assertEqual(total_num_items, 3)
+
+    @ddt.data(CourseGradeReport, ProblemGradeReport)
+    def test_serial_when_disabled(self, report_class):
+        GradeReportSetting.objects.create(enabled=False)
+        entry = self._create_entry('grade_course')
+        with patch('lms.djangoapps.instructor_task.tasks_helper.grades.queue_subtasks_for_query') as mock_queue:
+            with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+                result = report_class.generate(None, entry.id, self.course.id, None, 'graded')
+
+        self.assertFalse(mock_queue.called)
+        self.assertDictContainsSubset({'attempted': 3, 'succeeded': 3, 'failed': 0}, result)
+
+    def test_parts_merged_in_order(self):
+        entry = self._create_entry('grade_course')
+        subtask_ids = ['part-0', 'part-1']
+        initialize_subtask_info(entry, 'graded', 3, subtask_ids)
+        user_ids = [student.id for student in self.students]
+
+        # Complete the parts out of order; the last one to complete queues the merge.
+        CourseGradeReport.generate_part(entry.id, None, 1, user_ids[2:], {'task_id': 'part-1'})
+        self.assertEqual(len(ReportStore.from_config(config_name='GRADES_DOWNLOAD').links_for(self.course.id)), 0)
+        CourseGradeReport.generate_part(entry.id, None, 0, user_ids[:2], {'task_id': 'part-0'})
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(len(report_store.links_for(self.course.id)), 1)
+        self.verify_rows_in_csv(
+            [{u'Username': student.username} for student in self.students],
+            ignore_other_columns=True,
+        )
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertDictContainsSubset({'attempted': 3, 'succeeded': 3, 'failed': 0}, json.loads(entry.task_output))
+
+    def test_failed_part(self):
+        entry = self._create_entry('grade_course')
+        initialize_subtask_info(entry, 'graded', 3, ['part-0', 'part-1'])
+        user_ids = [student.id for student in self.students]
+
+        with patch.object(CourseGradeReport, '_generate_part', side_effect=Exception('Part failed')):
+            with self.assertRaises(Exception):
+                CourseGradeReport.generate_part(entry.id, None, 1, user_ids[2:], {'task_id': 'part-1'})
+        CourseGradeReport.generate_part(entry.id, None, 0, user_ids[:2], {'task_id': 'part-0'})
+
+        # The report is not uploaded without the failed part's learners.
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(len(report_store.links_for(self.course.id)), 0)
+        self.assertFalse(
+            report_store.exists(self.course.id, CourseGradeReport._part_filename(entry, 0, 'grade_report'))
+        )
+        entry.refresh_from_db()
+        self.assertEqual(entry.task_state, FAILURE)
+        self.assertEqual(json.loads(entry.task_output)['exception'], 'GradeReportPartError')
+
+    def test_failed_merge(self):
+        entry = self._create_entry('grade_course')
+        initialize_subtask_info(entry, 'graded', 3, ['part-0', 'part-1'])
+        user_ids = [student.id for student in self.students]
+
+        CourseGradeReport.generate_part(entry.id, None, 0, user_ids[:2], {'task_id': 'part-0'})
+        entry.refresh_from_db()
+        self.assertEqual(entry.task_state, PROGRESS)
+
+        with patch(
+            'lms.djangoapps.instructor_task.tasks_helper.grades.upload_csv_file_to_report_store',
+            side_effect=Exception('Upload failed'),
+        ):
+            CourseGradeReport.generate_part(entry.id, None, 1, user_ids[2:], {'task_id': 'part-1'})
+
+        # The last part completes, but the task fails with the merge.
+        entry.refresh_from_db()
+        self.assertEqual(entry.task_state, FAILURE)
+        self.assertEqual(json.loads(entry.task_output)['message'], 'Upload failed')
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertFalse(
+            report_store.exists(self.course.id, CourseGradeReport._part_filename(entry, 1, 'grade_report'))
+        )
+
+
 @ddt.ddt
 @patch('lms.djangoapps.instructor_task.tasks_helper.misc.DefaultStorage', new=MockDefaultStorage)
 class TestGradeReportEnrollmentAndCertificateInfo(TestReportMixin, InstructorTaskModuleTestCase):
@@ -128,6 +128,14 @@ FEATURES = {
     # See jquey-xblock: https://github.com/edx-solutions/jquery-xblock
     'ENABLE_XBLOCK_VIEW_ENDPOINT': False,
 
+    # Dispatch XBlock handler calls without loading the course first.  The course
+    # is loaded only if the handler, or a field override provider, needs it.
+    'ENABLE_LAZY_COURSE_XBLOCK_HANDLERS': True,
+
+    # Build the courseware table of contents from the course's collected block
+    # structure instead of binding every chapter and section to the user.
+    'ENABLE_BLOCK_STRUCTURE_TOC': True,
+
     # Allows to configure the LMS to provide CORS headers to serve requests from other domains
     'ENABLE_CORS_HEADERS': False,
 
@@ -757,8 +765,15 @@ EVENT_TRACKING_BACKENDS = {
                 }
             },
             'processors': [
-                {'ENGINE': 'track.shim.LegacyFieldMappingProcessor'},
-                {'ENGINE': 'track.shim.PrefixedEventProcessor'}
+                {
+                    'ENGINE': 'track.shim.ProcessorChain',
+                    'OPTIONS': {
+                        'processors': [
+                            {'ENGINE': 'track.shim.LegacyFieldMappingProcessor'},
+                            {'ENGINE': 'track.shim.PrefixedEventProcessor'}
+                        ]
+                    }
+                }
             ]
         }
     },
@@ -878,6 +893,11 @@ MODULESTORE = {
     }
 }
 
+# Maximum size, in bytes of pickled data, of the split modulestore course structures
+# that each worker keeps deserialized in memory in front of the
+# 'course_structure_cache'. Set to 0 to disable the in-process tier.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES = 128 * 1024 * 1024
+
 #################### Python sandbox ############################################
 
 CODE_JAIL = {
@@ -957,6 +977,12 @@ DEFAULT_COURSE_ABOUT_IMAGE_URL = 'images/pencils.jpg'
 MEDIA_ROOT = '/edx/var/edxapp/media/'
 MEDIA_URL = '/media/'
 
+# Directory in which course assets too large for the course_assets cache
+# are cached on local disk, and the most bytes kept there.  Not cached on
+# disk if None.
+COURSE_ASSETS_DISK_CACHE_DIR = None
+COURSE_ASSETS_DISK_CACHE_MAX_SIZE = 10 * 1024 ** 3
+
 # Locale/Internationalization
 TIME_ZONE = 'America/New_York'  # http://en.wikipedia.org/wiki/List_of_tz_zones_by_name
 LANGUAGE_CODE = 'en'  # http://www.i18nguy.com/unicode/language-identifiers.html
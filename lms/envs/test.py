@@ -228,6 +228,10 @@ CACHES = {
     },
 }
 
+# Keep structure lookups going through the (dummy) django cache, so that tests
+# counting mongo calls see every query.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES = 0
+
 # Dummy secret key for dev
 SECRET_KEY = '85920908f28904ed733fe576320db18cabd7b6cd'
 
@@ -414,24 +414,33 @@ class BlockStructureBlockData(BlockStructure):
         # Map of a transformer's name to its non-block-specific data.
         self.transformer_data = TransformerDataMap()
 
+        # Map of a transformer's name to a function that loads its
+        # block-specific data into a block data map, for transformers
+        # whose block data has not been loaded yet.
+        # dict {string: function({UsageKey: BlockData})}
+        self._deferred_transformer_data = TransformerDataMap()
+
     def copy(self):
         """
         Returns a new instance of BlockStructureBlockData with a
         deep-copy of this instance's contents.
         """
         from .factory import BlockStructureFactory
-        return BlockStructureFactory.create_new(
+        block_structure = BlockStructureFactory.create_new(
             self.root_block_usage_key,
             deepcopy(self._block_relations),
             deepcopy(self.transformer_data),
             deepcopy(self._block_data_map),
         )
+        block_structure._deferred_transformer_data.update(self._deferred_transformer_data)  # pylint: disable=protected-access
+        return block_structure
 
     def iteritems(self):
         """
         Returns iterator of (UsageKey, BlockData) pairs for all
         blocks in the BlockStructure.
         """
+        self._load_transformer_data()
         return self._block_data_map.iteritems()
 
     def itervalues(self):
@@ -439,12 +448,14 @@ class BlockStructureBlockData(BlockStructure):
         Returns iterator of BlockData for all blocks in the
         BlockStructure.
         """
+        self._load_transformer_data()
         return self._block_data_map.itervalues()
 
     def __getitem__(self, usage_key):
         """
         Returns the BlockData associated with the given key.
         """
+        self._load_transformer_data()
         return self._block_data_map[usage_key]
 
     def get_xblock_field(self, usage_key, field_name, default=None):
@@ -513,6 +524,7 @@ class BlockStructureBlockData(BlockStructure):
             transformer (BlockStructureTransformer) - The transformer
                 whose dictionary data is requested.
         """
+        self._load_transformer_data(transformer)
         return self._block_data_map[usage_key].transformer_data[transformer]
 
     def get_transformer_block_field(self, usage_key, transformer, key, default=None):
@@ -558,6 +570,7 @@ class BlockStructureBlockData(BlockStructure):
                 given key for the given transformer's data for the
                 requested block.
         """
+        self._load_transformer_data(transformer)
         setattr(
             self._get_or_create_block(usage_key).transformer_data.get_or_create(transformer),
             key,
@@ -734,6 +747,42 @@ class BlockStructureBlockData(BlockStructure):
             raise TransformerException('Version attributes are not set on transformer {0}.', transformer.name())
         self.set_transformer_data(transformer, TRANSFORMER_VERSION_KEY, transformer.WRITE_VERSION)
 
+    def _defer_transformer_data(self, transformer, load):
+        """
+        Defers loading the block-specific data of the given transformer
+        until it is first accessed.
+
+        Arguments:
+            transformer (BlockStructureTransformer or string) - The
+                transformer whose block data is deferred.
+
+            load (function({UsageKey: BlockData})) - Function that
+                loads the transformer's block data into the given
+                block data map, skipping blocks that aren't in it.
+        """
+        self._deferred_transformer_data[transformer] = load
+
+    def _load_transformer_data(self, transformer=None):
+        """
+        Loads the block-specific data of the given transformer, or of
+        all transformers if None, if its loading was deferred.
+        """
+        if not self._deferred_transformer_data:
+            return
+
+        if transformer is None:
+            loads = self._deferred_transformer_data.values()
+            self._deferred_transformer_data.clear()
+        else:
+            try:
+                loads = [self._deferred_transformer_data[transformer]]
+            except KeyError:
+                return
+            del self._deferred_transformer_data[transformer]
+
+        for load in loads:
+            load(self._block_data_map)
+
     def _get_or_create_block(self, usage_key):
         """
         Returns the BlockData associated with the given usage_key.
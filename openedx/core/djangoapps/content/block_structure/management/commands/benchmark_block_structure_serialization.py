@@ -0,0 +1,141 @@
+"""
+Command to compare the size and load time of the BlockStructure
+serialization formats.
+"""
+from datetime import datetime, timedelta
+from time import time
+
+from django.core.management.base import BaseCommand
+from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
+from pytz import UTC
+
+import openedx.core.djangoapps.content.block_structure.api as api
+from openedx.core.djangoapps.content.block_structure.block_structure import BlockStructureBlockData
+import openedx.core.djangoapps.content.block_structure.serialization as serialization
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+from openedx.core.lib.command_utils import parse_course_keys
+
+
+# Block types of each level of a synthetic course, below the course block.
+SYNTHETIC_BLOCK_TYPES = ['chapter', 'sequential', 'vertical', 'problem']
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_block_structure_serialization --settings=devstack
+        $ ./manage.py lms benchmark_block_structure_serialization --num_blocks 20000 --settings=devstack
+        $ ./manage.py lms benchmark_block_structure_serialization --courses 'edX/DemoX/Demo_Course' --settings=devstack
+    """
+    help = u'Compares the size and load time of compact BlockStructure serialization against zpickle.'
+
+    def add_arguments(self, parser):
+        """
+        Entry point for subclassed commands to add custom arguments.
+        """
+        parser.add_argument(
+            '--courses',
+            dest='courses',
+            nargs='+',
+            help=u'Benchmark the collected block structures of the list of courses provided.',
+        )
+        parser.add_argument(
+            '--num_blocks',
+            help=u'Number of blocks in the synthetic course benchmarked when no courses are provided.',
+            default=5000,
+            type=int,
+        )
+        parser.add_argument(
+            '--iterations',
+            help=u'Number of times each format is loaded.',
+            default=10,
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        if options.get('courses'):
+            block_structures = [
+                (unicode(course_key), api.get_course_in_cache(course_key))
+                for course_key in parse_course_keys(options['courses'])
+            ]
+        else:
+            block_structures = [(u'synthetic', _synthetic_block_structure(options['num_blocks']))]
+
+        for name, block_structure in block_structures:
+            self._benchmark(name, block_structure, options['iterations'])
+
+    def _benchmark(self, name, block_structure, iterations):
+        """
+        Writes the size and mean load time of each format
+        for the given block structure.
+        """
+        root_block_usage_key = block_structure.root_block_usage_key
+        formats = [
+            (
+                u'zpickle',
+                zpickle((
+                    block_structure._block_relations,  # pylint: disable=protected-access
+                    block_structure.transformer_data,
+                    block_structure._block_data_map,  # pylint: disable=protected-access
+                )),
+                zunpickle,
+            ),
+            (
+                u'compact',
+                serialization.serialize(block_structure),
+                lambda data: serialization.deserialize(data, root_block_usage_key),
+            ),
+        ]
+
+        self.stdout.write(u'{}: {} blocks'.format(name, len(block_structure)))
+        for format_name, serialized_data, load in formats:
+            start = time()
+            for _ in range(iterations):
+                load(serialized_data)
+            mean_load_time = (time() - start) / iterations
+            self.stdout.write(u'  {:<8} size: {:>10d} bytes, load: {:>8.2f} ms'.format(
+                format_name,
+                len(serialized_data),
+                mean_load_time * 1000,
+            ))
+
+
+def _synthetic_block_structure(num_blocks):
+    """
+    Returns a collected block structure of about num_blocks blocks,
+    shaped like a course, with fields like those the course_blocks
+    transformers collect.
+    """
+    course_key = CourseLocator('benchmark', 'serialization', 'run')
+    root_block_usage_key = BlockUsageLocator(course_key, 'course', 'course')
+    block_structure = BlockStructureBlockData(root_block_usage_key)
+
+    # Each level has about 4 times as many blocks as the one above it,
+    # so the leaves make up about 3/4 of the course.
+    num_blocks_by_level = [max(1, int(num_blocks * 3 / 4 / 4 ** depth)) for depth in range(4)][::-1]
+    parents = [root_block_usage_key]
+    for block_type, num_level_blocks in zip(SYNTHETIC_BLOCK_TYPES, num_blocks_by_level):
+        level = [
+            BlockUsageLocator(course_key, block_type, u'{}_{:06d}'.format(block_type, index))
+            for index in range(num_level_blocks)
+        ]
+        for index, block_key in enumerate(level):
+            block_structure._add_relation(parents[index % len(parents)], block_key)  # pylint: disable=protected-access
+        parents = level
+
+    start = datetime(2017, 1, 1, tzinfo=UTC)
+    for index, block_key in enumerate(block_structure):
+        block_data = block_structure._get_or_create_block(block_key)  # pylint: disable=protected-access
+        block_data.display_name = u'{} {}'.format(block_key.block_type, index)
+        block_data.graded = block_key.block_type == 'problem'
+        block_data.format = u'Homework' if block_key.block_type == 'sequential' else None
+        block_data.start = start + timedelta(days=index % 30)
+        block_data.due = None
+        block_data.visible_to_staff_only = False
+        block_data.group_access = {}
+        block_structure.set_transformer_block_field(block_key, u'visibility', u'merged_visible_to_staff_only', False)
+        block_structure.set_transformer_block_field(block_key, u'start_date', u'merged_start_date', start)
+        block_structure.set_transformer_block_field(block_key, u'student_view_data', u'student_view_multi_device', True)
+    for transformer_name in (u'visibility', u'start_date', u'student_view_data'):
+        block_structure.set_transformer_data(transformer_name, u'_version', 1)
+    return block_structure
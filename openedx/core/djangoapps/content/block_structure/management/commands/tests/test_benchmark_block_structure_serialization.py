@@ -0,0 +1,25 @@
+"""
+Tests for benchmark_block_structure_serialization management command.
+"""
+from StringIO import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from .. import benchmark_block_structure_serialization
+
+
+class TestBenchmarkBlockStructureSerialization(TestCase):
+    """
+    Tests benchmark_block_structure_serialization management command.
+    """
+    def test_synthetic_course(self):
+        out = StringIO()
+        call_command('benchmark_block_structure_serialization', num_blocks=100, iterations=1, stdout=out)
+        output = out.getvalue()
+        self.assertIn('zpickle', output)
+        self.assertIn('compact', output)
+
+    def test_synthetic_block_structure(self):
+        block_structure = benchmark_block_structure_serialization._synthetic_block_structure(1000)  # pylint: disable=protected-access
+        self.assertAlmostEqual(len(block_structure), 1000, delta=50)
@@ -0,0 +1,372 @@
+"""
+Compact serialization format for collected BlockStructures.
+
+Serialized data is laid out as:
+
+    MAGIC | FORMAT_VERSION | length of index | index | segment | segment ...
+
+where the index lists the name and length of each segment that follows it.
+Each segment is compressed separately, so a reader only pays for the
+segments it decodes.
+
+    STRUCTURE_SEGMENT - the usage keys of all blocks, interned into a table
+        so that every other reference to a block is an integer position in
+        that table; the parent/child relations, stored as offsets into flat
+        integer arrays; the collected xBlock fields, stored column-wise,
+        i.e. one (block positions, values) pair per field; and the
+        structure-wide data of every transformer.
+
+    one segment per transformer, named by the transformer - the positions
+        of the blocks the transformer collected data for, and its block
+        fields, also stored column-wise.  Segments of transformers that
+        aren't needed right away are only decoded when first accessed.
+
+Data serialized by earlier releases is a zpickled tuple and does not begin
+with MAGIC; see is_compact.
+"""
+import cPickle as pickle
+import struct
+import sys
+import zlib
+from array import array
+from functools import partial
+from itertools import izip
+
+from .block_structure import BlockData, TransformerData, TransformerDataMap, _BlockRelations
+from .factory import BlockStructureFactory
+
+
+MAGIC = 'BSC'
+FORMAT_VERSION = 1
+
+# Name of the segment holding the keys, relations, xBlock fields and
+# structure-wide transformer data.
+# Transformer names are python identifiers or namespaced with a colon,
+# so they can't collide with it.
+STRUCTURE_SEGMENT = '.structure'
+
+_HEADER = struct.Struct('<3sBI')
+_INDEX_ENTRY = struct.Struct('<HI')
+
+# Integer arrays are always stored little-endian with 4-byte items.
+_INT_TYPECODE = 'i'
+_SWAP_BYTES = sys.byteorder != 'little'
+
+
+def is_compact(serialized_data):
+    """
+    Returns whether the given data was serialized by this module.
+    """
+    return serialized_data[:len(MAGIC)] == MAGIC
+
+
+def serialize(block_structure):
+    """
+    Serializes the collected data of the given block structure
+    (a BlockStructureBlockData) into the compact format.
+    """
+    # pylint: disable=protected-access
+    block_structure._load_transformer_data()
+    root_block_usage_key = block_structure.root_block_usage_key
+    block_relations = block_structure._block_relations
+    block_data_map = block_structure._block_data_map
+
+    # Blocks in relations come first so that the relation arrays only
+    # need to cover a prefix of the key table.
+    keys = list(block_relations)
+    keys.extend(key for key in block_data_map if key not in block_relations)
+    positions = {key: position for position, key in enumerate(keys)}
+
+    segments = [(STRUCTURE_SEGMENT, _dumps({
+        'keys': _encode_keys(root_block_usage_key, keys),
+        'num_related': len(block_relations),
+        'children': _encode_relations(keys, positions, block_relations, 'children'),
+        'parents': _encode_relations(keys, positions, block_relations, 'parents'),
+        'data_positions': _pack_ints(positions[key] for key in block_data_map),
+        'fields': _encode_columns(
+            (positions[key], block_data.fields) for key, block_data in block_data_map.iteritems()
+        ),
+        'transformer_data': {
+            transformer_name: transformer_data.fields
+            for transformer_name, transformer_data in block_structure.transformer_data.iteritems()
+        },
+    }))]
+
+    transformer_names = set()
+    for block_data in block_data_map.itervalues():
+        transformer_names.update(block_data.transformer_data)
+
+    for transformer_name in sorted(transformer_names):
+        block_transformer_data = [
+            (positions[key], block_data.transformer_data[transformer_name])
+            for key, block_data in block_data_map.iteritems()
+            if transformer_name in block_data.transformer_data
+        ]
+        segments.append((transformer_name, _dumps({
+            'block_positions': _pack_ints(position for position, _ in block_transformer_data),
+            'block_fields': _encode_columns(
+                (position, transformer_data.fields) for position, transformer_data in block_transformer_data
+            ),
+        })))
+
+    return _write_segments(segments)
+
+
+def deserialize(serialized_data, root_block_usage_key, transformer_names=None):
+    """
+    Deserializes data written by serialize and returns the
+    corresponding BlockStructureBlockData.
+
+    Arguments:
+        transformer_names (set or None) - Names of the transformers whose
+            block data is loaded upfront.  Loading of any other transformer's
+            block data is deferred until it is first accessed.  If None,
+            the block data of all transformers is loaded.
+    """
+    segments = _read_segments(serialized_data)
+    structure = _loads(segments.pop(STRUCTURE_SEGMENT))
+
+    keys = _decode_keys(structure['keys'])
+    block_relations = {key: _BlockRelations() for key in keys[:structure['num_related']]}
+    _decode_relations(keys, block_relations, structure['children'], 'children')
+    _decode_relations(keys, block_relations, structure['parents'], 'parents')
+
+    block_data_map = {}
+    block_fields = {}
+    for position in _unpack_ints(structure['data_positions']):
+        block_data_map[keys[position]] = BlockData(keys[position])
+        block_fields[position] = block_data_map[keys[position]].fields
+    _decode_columns(structure['fields'], block_fields)
+
+    transformer_data = TransformerDataMap()
+    for transformer_name, fields in structure['transformer_data'].iteritems():
+        transformer_data[transformer_name] = TransformerData()
+        transformer_data[transformer_name].fields = fields
+
+    block_structure = BlockStructureFactory.create_new(
+        root_block_usage_key,
+        block_relations,
+        transformer_data,
+        block_data_map,
+    )
+    for transformer_name, segment in segments.iteritems():
+        load = partial(_load_transformer_segment, transformer_name, segment, keys)
+        if transformer_names is None or transformer_name in transformer_names:
+            load(block_data_map)
+        else:
+            block_structure._defer_transformer_data(transformer_name, load)  # pylint: disable=protected-access
+    return block_structure
+
+
+def _load_transformer_segment(transformer_name, segment, keys, block_data_map):
+    """
+    Loads the block data in the given transformer segment into the
+    given block_data_map.  Blocks that are no longer in the map are
+    skipped, since deferred segments may be loaded after blocks are
+    removed from the structure.
+    """
+    segment = _loads(segment)
+    block_transformer_fields = {}
+    for position in _unpack_ints(segment['block_positions']):
+        block_data = block_data_map.get(keys[position])
+        if block_data is not None:
+            block_transformer_data = TransformerData()
+            block_data.transformer_data[transformer_name] = block_transformer_data
+            block_transformer_fields[position] = block_transformer_data.fields
+    _decode_columns(segment['block_fields'], block_transformer_fields)
+
+
+def _write_segments(segments):
+    """
+    Returns the serialized data for the given list of
+    (name, compressed data) pairs.
+    """
+    encoded_names = [name.encode('utf-8') for name, _ in segments]
+    index = ''.join(
+        _INDEX_ENTRY.pack(len(name), len(data)) + name
+        for name, (_, data) in izip(encoded_names, segments)
+    )
+    return ''.join(
+        [_HEADER.pack(MAGIC, FORMAT_VERSION, len(index)), index] +
+        [data for _, data in segments]
+    )
+
+
+def _read_index(serialized_data):
+    """
+    Returns a list of (name, start, end) tuples locating each
+    segment within the given serialized data.
+    """
+    magic, version, index_length = _HEADER.unpack_from(serialized_data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(
+            'Unsupported BlockStructure serialization format: {!r} version {}.'.format(magic, version)
+        )
+
+    entries = []
+    position = _HEADER.size
+    index_end = position + index_length
+    data_position = index_end
+    while position < index_end:
+        name_length, data_length = _INDEX_ENTRY.unpack_from(serialized_data, position)
+        position += _INDEX_ENTRY.size
+        name = serialized_data[position:position + name_length].decode('utf-8')
+        position += name_length
+        entries.append((name, data_position, data_position + data_length))
+        data_position += data_length
+    return entries
+
+
+def _read_segments(serialized_data):
+    """
+    Returns a dict of segment name to compressed segment data.
+    """
+    return {
+        name: serialized_data[start:end]
+        for name, start, end in _read_index(serialized_data)
+    }
+
+
+def _dumps(value):
+    """
+    Pickles and compresses a single segment.
+    """
+    return zlib.compress(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+def _loads(data):
+    """
+    Decompresses and unpickles a single segment.
+    """
+    return pickle.loads(zlib.decompress(data))
+
+
+def _pack_ints(values):
+    """
+    Returns the given integers packed into a string.
+    """
+    packed = array(_INT_TYPECODE, values)
+    if _SWAP_BYTES:
+        packed.byteswap()
+    return packed.tostring()
+
+
+def _unpack_ints(data):
+    """
+    Returns an array of the integers packed into the given string.
+    """
+    unpacked = array(_INT_TYPECODE)
+    unpacked.fromstring(data)
+    if _SWAP_BYTES:
+        unpacked.byteswap()
+    return unpacked
+
+
+def _encode_keys(root_block_usage_key, keys):
+    """
+    Encodes the table of usage keys.
+
+    Keys in the root's course are reduced to their (block_type, block_id),
+    provided that the course key rebuilds exactly the same key from them.
+    Any other key is stored whole, by position.
+    """
+    course_key = getattr(root_block_usage_key, 'course_key', None)
+    local_keys = []
+    foreign_keys = {}
+    for position, key in enumerate(keys):
+        local_key = _local_key(course_key, key)
+        local_keys.append(local_key)
+        if local_key is None:
+            foreign_keys[position] = key
+    return {
+        'course_key': course_key,
+        'local': local_keys,
+        'foreign': foreign_keys,
+    }
+
+
+def _local_key(course_key, usage_key):
+    """
+    Returns the (block_type, block_id) of the given usage key, or
+    None if it can't be rebuilt from the given course key.
+    """
+    if course_key is None or getattr(usage_key, 'course_key', None) != course_key:
+        return None
+    local_key = (usage_key.block_type, usage_key.block_id)
+    if course_key.make_usage_key(*local_key) != usage_key:
+        return None
+    return local_key
+
+
+def _decode_keys(encoded_keys):
+    """
+    Returns the list of usage keys encoded by _encode_keys.
+    """
+    course_key = encoded_keys['course_key']
+    foreign_keys = encoded_keys['foreign']
+    return [
+        foreign_keys[position] if local_key is None else course_key.make_usage_key(*local_key)
+        for position, local_key in enumerate(encoded_keys['local'])
+    ]
+
+
+def _encode_relations(keys, positions, block_relations, relation):
+    """
+    Encodes the given relation ('children' or 'parents') of every related
+    block as an array of offsets into a flat array of block positions.
+    The related blocks of the block at position i are found between
+    offsets i and i + 1.
+    """
+    offsets = [0]
+    related = []
+    for key in keys[:len(block_relations)]:
+        related.extend(positions[related_key] for related_key in getattr(block_relations[key], relation))
+        offsets.append(len(related))
+    return _pack_ints(offsets), _pack_ints(related)
+
+
+def _decode_relations(keys, block_relations, encoded_relations, relation):
+    """
+    Sets the given relation of each block in block_relations
+    from the arrays encoded by _encode_relations.
+    """
+    offsets, related = (_unpack_ints(data) for data in encoded_relations)
+    for position, key in enumerate(keys[:len(block_relations)]):
+        setattr(
+            block_relations[key],
+            relation,
+            [keys[related_position] for related_position in related[offsets[position]:offsets[position + 1]]],
+        )
+
+
+def _encode_columns(positioned_fields):
+    """
+    Transposes the given (block position, fields dict) pairs into a dict
+    of field name to (packed block positions, list of values).
+
+    Values of the same field tend to be alike, so storing them together
+    compresses better than storing each block's fields together.
+    """
+    columns = {}
+    for position, fields in positioned_fields:
+        for field_name, value in fields.iteritems():
+            column_positions, column_values = columns.setdefault(field_name, ([], []))
+            column_positions.append(position)
+            column_values.append(value)
+    return {
+        field_name: (_pack_ints(column_positions), column_values)
+        for field_name, (column_positions, column_values) in columns.iteritems()
+    }
+
+
+def _decode_columns(columns, fields_by_position):
+    """
+    Sets the fields encoded by _encode_columns on the given dict of
+    block position to fields dict.  Positions missing from the dict
+    are skipped.
+    """
+    for field_name, (column_positions, column_values) in columns.iteritems():
+        for position, value in izip(_unpack_ints(column_positions), column_values):
+            fields = fields_by_position.get(position)
+            if fields is not None:
+                fields[field_name] = value
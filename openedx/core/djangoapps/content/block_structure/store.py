@@ -6,7 +6,7 @@ from logging import getLogger
 
 from openedx.core.lib.cache_utils import zpickle, zunpickle
 
-from . import config
+from . import config, serialization
 from .block_structure import BlockStructureBlockData
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
@@ -66,7 +66,7 @@ class BlockStructureStore(object):
         bs_model = self._update_or_create_model(block_structure, serialized_data)
         self._add_to_cache(serialized_data, bs_model)
 
-    def get(self, root_block_usage_key):
+    def get(self, root_block_usage_key, transformer_names=None):
         """
         Deserializes and returns the block structure starting at
         root_block_usage_key, if found in the cache or storage.
@@ -79,6 +79,12 @@ class BlockStructureStore(object):
                 root of the block structure that is to be retrieved
                 from the store.
 
+            transformer_names (set or None) - Names of the transformers
+                whose block data is to be loaded upfront.  When the data
+                is stored in the compact format, loading of any other
+                transformer's block data is deferred until it is first
+                accessed.  If None, all block data is loaded.
+
         Returns:
             BlockStructure - The deserialized block structure starting
             at root_block_usage_key, if found.
@@ -95,7 +101,7 @@ class BlockStructureStore(object):
             serialized_data = self._get_from_store(bs_model)
             self._add_to_cache(serialized_data, bs_model)
 
-        return self._deserialize(serialized_data, root_block_usage_key)
+        return self._deserialize(serialized_data, root_block_usage_key, transformer_names)
 
     def delete(self, root_block_usage_key):
         """
@@ -193,6 +199,10 @@ class BlockStructureStore(object):
         """
         Serializes the data for the given block_structure.
         """
+        block_structure._load_transformer_data()
+        if config.waffle().is_enabled(config.COMPACT_SERIALIZATION):
+            return serialization.serialize(block_structure)
+
         data_to_cache = (
             block_structure._block_relations,
             block_structure.transformer_data,
@@ -200,10 +210,14 @@ class BlockStructureStore(object):
         )
         return zpickle(data_to_cache)
 
-    def _deserialize(self, serialized_data, root_block_usage_key):
+    def _deserialize(self, serialized_data, root_block_usage_key, transformer_names=None):
         """
         Deserializes the given data and returns the parsed block_structure.
+        Data in the legacy pickled format is still supported.
         """
+        if serialization.is_compact(serialized_data):
+            return serialization.deserialize(serialized_data, root_block_usage_key, transformer_names)
+
         block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
         return BlockStructureFactory.create_new(
             root_block_usage_key,
@@ -0,0 +1,162 @@
+"""
+Benchmarks of BlockStructure collect and transform on a large generated course.
+
+Like the modulestore benchmarks in xmodule.modulestore.perf_tests, these
+use a local mongod, are skipped unless the MODULESTORE_BENCHMARKS
+environment variable is set, and write their results as JSON.
+"""
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest import TestCase, skipUnless
+
+import ddt
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.perf_tests.benchmark import BenchmarkRecorder, benchmarks_enabled
+from xmodule.modulestore.perf_tests.generate_course_xml import (
+    DEFAULT_COURSE_SHAPE,
+    course_block_count,
+    make_course_xml,
+)
+from xmodule.modulestore.tests.utils import MIXED_MODULESTORE_SETUPS, SHORT_NAME_MAP
+from xmodule.modulestore.xml_importer import import_course_from_xml
+
+from .. import serialization
+from ..factory import BlockStructureFactory
+from ..transformer import BlockStructureTransformer, FilteringTransformerMixin
+from ..transformers import BlockStructureTransformers
+from .helpers import mock_registered_transformers
+
+COURSE_DIR = 'perf_course'
+
+# Number of times each benchmark is repeated.
+REPEAT = 5
+
+
+class GradedFieldsTransformer(BlockStructureTransformer):
+    """
+    Collects a few xBlock fields and per-block data, and reads them back
+    for every block when transforming.
+    """
+    WRITE_VERSION = 1
+    READ_VERSION = 1
+
+    @classmethod
+    def name(cls):
+        return 'benchmark_graded_fields'
+
+    @classmethod
+    def collect(cls, block_structure):
+        block_structure.request_xblock_fields('display_name', 'graded', 'format', 'weight')
+        for block_key in block_structure.topological_traversal():
+            block_structure.set_transformer_block_field(
+                block_key, cls, 'path_length', len(block_structure.get_parents(block_key)),
+            )
+
+    def transform(self, usage_info, block_structure):
+        for block_key in block_structure.topological_traversal():
+            block_structure.get_xblock_field(block_key, 'graded')
+            block_structure.get_transformer_block_field(block_key, self, 'path_length')
+
+
+class HtmlRemovalTransformer(FilteringTransformerMixin, BlockStructureTransformer):
+    """
+    Removes all html blocks, using a removal filter.
+    """
+    WRITE_VERSION = 1
+    READ_VERSION = 1
+
+    @classmethod
+    def name(cls):
+        return 'benchmark_html_removal'
+
+    @classmethod
+    def collect(cls, block_structure):
+        pass
+
+    def transform_block_filters(self, usage_info, block_structure):
+        return [block_structure.create_removal_filter(lambda block_key: block_key.block_type == 'html')]
+
+
+@ddt.ddt
+@skipUnless(benchmarks_enabled(), "Modulestore benchmarks are disabled.")
+class BlockStructureBenchmarks(TestCase):
+    """
+    Times collecting, storing and transforming the block structure
+    of a course of DEFAULT_COURSE_SHAPE in each modulestore.
+    """
+    TRANSFORMERS = [GradedFieldsTransformer, HtmlRemovalTransformer]
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @classmethod
+    def setUpClass(cls):
+        super(BlockStructureBenchmarks, cls).setUpClass()
+        cls.data_dir = mkdtemp()
+        make_course_xml(cls.data_dir, COURSE_DIR, DEFAULT_COURSE_SHAPE)
+        cls.num_blocks = course_block_count(DEFAULT_COURSE_SHAPE)
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.data_dir, ignore_errors=True)
+        super(BlockStructureBenchmarks, cls).tearDownClass()
+
+    def setUp(self):
+        super(BlockStructureBenchmarks, self).setUp()
+        self.recorder = BenchmarkRecorder('block_structure')
+
+    def collect(self, store, course_key):
+        """
+        Returns a block structure collected from the modulestore, as
+        BlockStructureManager does.
+        """
+        with store.bulk_operations(course_key):
+            block_structure = BlockStructureFactory.create_from_modulestore(
+                store.make_course_usage_key(course_key), store,
+            )
+            BlockStructureTransformers.collect(block_structure)
+        return block_structure
+
+    @ddt.data(*MIXED_MODULESTORE_SETUPS)
+    def test_benchmarks(self, store_builder):
+        store_name = SHORT_NAME_MAP[store_builder]
+        with store_builder.build() as (contentstore, store):
+            course_key = store.make_course_key('perf', 'course', 'run')
+            import_course_from_xml(
+                store,
+                ModuleStoreEnum.UserID.test,
+                self.data_dir,
+                source_dirs=[COURSE_DIR],
+                static_content_store=contentstore,
+                target_id=course_key,
+                create_if_not_present=True,
+                raise_on_failure=True,
+            )
+
+            with mock_registered_transformers(self.TRANSFORMERS):
+                block_structure = self.collect(store, course_key)
+                self.recorder.repeat(
+                    'collect', store_name, lambda: self.collect(store, course_key), REPEAT, num_blocks=self.num_blocks,
+                )
+
+                serialized_data = serialization.serialize(block_structure)
+                self.recorder.repeat(
+                    'serialize', store_name, lambda: serialization.serialize(block_structure), REPEAT,
+                    num_blocks=self.num_blocks, size=len(serialized_data),
+                )
+                root_block_usage_key = block_structure.root_block_usage_key
+                self.recorder.repeat(
+                    'deserialize', store_name,
+                    lambda: serialization.deserialize(serialized_data, root_block_usage_key),
+                    REPEAT, num_blocks=self.num_blocks,
+                )
+
+                collected = serialization.deserialize(serialized_data, root_block_usage_key)
+                transformers = BlockStructureTransformers(
+                    [transformer() for transformer in self.TRANSFORMERS], usage_info=None,
+                )
+                self.recorder.repeat(
+                    'transform', store_name, lambda: transformers.transform(collected.copy()), REPEAT,
+                    num_blocks=self.num_blocks,
+                )
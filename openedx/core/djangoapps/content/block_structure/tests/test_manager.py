@@ -6,7 +6,7 @@ from django.test import TestCase
 from nose.plugins.attrib import attr
 
 from ..block_structure import BlockStructureBlockData
-from ..config import RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE, waffle
+from ..config import COMPACT_SERIALIZATION, RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE, waffle
 from ..exceptions import UsageKeyNotInBlockStructure, BlockStructureNotFound
 from ..manager import BlockStructureManager
 from ..transformers import BlockStructureTransformers
@@ -89,6 +89,16 @@ class TestTransformer1(MockTransformer):
         return data_key + 't1.val1.' + unicode(block_key)
 
 
+class TestTransformer2(TestTransformer1):
+    """
+    Test Transformer class, with its own collected data, that is
+    registered alongside TestTransformer1.
+    """
+    collect_data_key = 't2.collect'
+    transform_data_key = 't2.transform'
+    collect_call_count = 0
+
+
 @attr(shard=2)
 @ddt.ddt
 class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
@@ -161,6 +171,21 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
             )
             self.assert_block_structure(block_structure, expected_structure, missing_blocks=expected_missing_blocks)
 
+    def test_get_transformed_defers_unrequested_transformer_data(self):
+        registered_transformers = [TestTransformer1(), TestTransformer2()]
+        with waffle().override(COMPACT_SERIALIZATION, active=True):
+            with mock_registered_transformers(registered_transformers):
+                self.bs_manager.get_collected()
+                block_structure = self.bs_manager.get_transformed(BlockStructureTransformers([TestTransformer1()]))
+
+        # pylint: disable=protected-access
+        self.assertEquals(set(block_structure._deferred_transformer_data), {TestTransformer2.name()})
+        TestTransformer1.assert_transformed(block_structure)
+
+        # deferred data is loaded when accessed
+        TestTransformer2.assert_collected(block_structure)
+        self.assertFalse(block_structure._deferred_transformer_data)
+
     def test_get_transformed_with_nonexistent_starting_block(self):
         with mock_registered_transformers(self.registered_transformers):
             with self.assertRaises(UsageKeyNotInBlockStructure):
@@ -0,0 +1,115 @@
+"""
+Tests for block_structure/serialization.py
+"""
+from unittest import TestCase
+
+import ddt
+from nose.plugins.attrib import attr
+from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
+
+from openedx.core.lib.cache_utils import zpickle
+
+from .. import serialization
+from .helpers import ChildrenMapTestMixin, UsageKeyFactoryMixin, MockTransformer
+
+
+@attr(shard=2)
+@ddt.ddt
+class TestSerialization(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Tests for the compact BlockStructure serialization format.
+    """
+    def collect(self, block_structure):
+        """
+        Mimics collection by setting xBlock fields, transformer
+        data and transformer block data on the block structure.
+        """
+        block_structure._add_transformer(MockTransformer)  # pylint: disable=protected-access
+        block_structure.set_transformer_data(MockTransformer, 'structure_wide', {'a': 1})
+        for block_key in block_structure:
+            block_structure._get_or_create_block(block_key).display_name = unicode(block_key)  # pylint: disable=protected-access
+            block_structure.set_transformer_block_field(block_key, MockTransformer, 'test', [block_key.block_id])
+
+    def assert_collected(self, block_structure):
+        """
+        Verifies the data set by collect.
+        """
+        self.assertEqual(block_structure._get_transformer_data_version(MockTransformer), 1)  # pylint: disable=protected-access
+        self.assertEqual(block_structure.get_transformer_data(MockTransformer, 'structure_wide'), {'a': 1})
+        for block_key in block_structure:
+            self.assertEqual(block_structure.get_xblock_field(block_key, 'display_name'), unicode(block_key))
+            self.assertEqual(
+                block_structure.get_transformer_block_field(block_key, MockTransformer, 'test'),
+                [block_key.block_id],
+            )
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_round_trip(self, children_map):
+        block_structure = self.create_block_structure(children_map)
+        self.collect(block_structure)
+
+        serialized_data = serialization.serialize(block_structure)
+        self.assertTrue(serialization.is_compact(serialized_data))
+
+        deserialized = serialization.deserialize(serialized_data, block_structure.root_block_usage_key)
+        self.assert_block_structure(deserialized, children_map)
+        self.assert_collected(deserialized)
+
+    def test_deferred_transformer_data(self):
+        children_map = self.SIMPLE_CHILDREN_MAP
+        block_structure = self.create_block_structure(children_map)
+        self.collect(block_structure)
+        serialized_data = serialization.serialize(block_structure)
+
+        deserialized = serialization.deserialize(serialized_data, block_structure.root_block_usage_key, set())
+        # pylint: disable=protected-access
+        self.assertEqual(set(deserialized._deferred_transformer_data), {MockTransformer.name()})
+        # structure-wide transformer data is always loaded
+        self.assertEqual(deserialized._get_transformer_data_version(MockTransformer), 1)
+
+        # blocks removed before deferred data is loaded are skipped
+        copied = deserialized.copy()
+        deserialized.remove_block(self.block_key_factory(4), keep_descendants=False)
+        self.assertEqual(
+            deserialized.get_transformer_block_field(self.block_key_factory(3), MockTransformer, 'test'),
+            [self.block_key_factory(3).block_id],
+        )
+        self.assertFalse(deserialized._deferred_transformer_data)
+        self.assertNotIn(self.block_key_factory(4), deserialized)
+
+        # copies load deferred data independently
+        self.assertEqual(set(copied._deferred_transformer_data), {MockTransformer.name()})
+        self.assert_collected(copied)
+
+    def test_foreign_keys(self):
+        children_map = self.SIMPLE_CHILDREN_MAP
+        block_structure = self.create_block_structure(children_map)
+        other_course_key = CourseLocator('other', 'course', 'run')
+        library_block = BlockUsageLocator(course_key=other_course_key, block_type='html', block_id='lib')
+        block_structure._add_relation(self.block_key_factory(2), library_block)  # pylint: disable=protected-access
+
+        deserialized = serialization.deserialize(
+            serialization.serialize(block_structure),
+            block_structure.root_block_usage_key,
+        )
+        self.assertEqual(deserialized.get_children(self.block_key_factory(2)), [library_block])
+        self.assertEqual(deserialized.get_parents(library_block), [self.block_key_factory(2)])
+
+    def test_legacy_data(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        legacy_data = zpickle((
+            block_structure._block_relations,  # pylint: disable=protected-access
+            block_structure.transformer_data,
+            block_structure._block_data_map,  # pylint: disable=protected-access
+        ))
+        self.assertFalse(serialization.is_compact(legacy_data))
+
+    def test_unsupported_version(self):
+        serialized_data = serialization.serialize(self.create_block_structure(self.SIMPLE_CHILDREN_MAP))
+        unsupported_data = serialized_data[:3] + chr(serialization.FORMAT_VERSION + 1) + serialized_data[4:]
+        with self.assertRaises(ValueError):
+            serialization.deserialize(unsupported_data, self.block_key_factory(0))
@@ -70,6 +70,23 @@ class BlockStructureTransformer(object):
         """
         raise NotImplementedError
 
+    @classmethod
+    def collected_data_dependencies(cls):
+        """
+        Returns the names of the transformers whose collected block data
+        this transformer reads in its transform method.
+
+        When a block structure is retrieved from storage for a transform,
+        only the block data of these transformers is loaded upfront.
+        The block data of any other transformer is still loaded, but
+        only when it is first accessed.
+
+        By default, a transformer reads only its own block data.
+        Transformers that read other transformers' block data should
+        override this method.
+        """
+        return {cls.name()}
+
     @classmethod
     def collect(cls, block_structure):
         """
@@ -105,6 +105,16 @@ class BlockStructureTransformers(object):
             )
         return True
 
+    def collected_data_dependencies(self):
+        """
+        Returns the names of the transformers whose collected block data
+        is read by the transformers in this collection.
+        """
+        return set().union(*(
+            transformer.collected_data_dependencies()
+            for transformer in self._transformers['supports_filter'] + self._transformers['no_filter']
+        ))
+
     def transform(self, block_structure):
         """
         The given block structure is transformed by each transformer in the
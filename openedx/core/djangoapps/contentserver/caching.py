@@ -1,11 +1,30 @@
 """
 Helper functions for caching course assets.
+
+Assets small enough are cached whole in the course_assets cache.  Larger
+assets can also be cached on local disk, in files named by their content
+digest, when settings.COURSE_ASSETS_DISK_CACHE_DIR is set.  The metadata
+of an asset cached on disk is kept in the course_assets cache, so that a
+server finds the file for an asset without reading it from the contentstore,
+and a new version of an asset is never served from the file of an old one.
+
+An asset is written to the disk cache as it is streamed from the
+contentstore to a client, rather than before it is served, and by only one
+process at a time.
 """
+import logging
+import os
+import re
+import tempfile
+
+from django.conf import settings
 from django.core.cache import caches
 from django.core.cache.backends.base import InvalidCacheBackendError
 from opaque_keys import InvalidKeyError
 
-from xmodule.contentstore.content import STATIC_CONTENT_VERSION
+from xmodule.contentstore.content import STATIC_CONTENT_VERSION, StaticContentStream
+
+log = logging.getLogger(__name__)
 
 # See if there's a "course_assets" cache configured, and if not, fallback to the default cache.
 CONTENT_CACHE = caches['default']
@@ -47,4 +66,236 @@ def del_cached_content(location):
         # although deprecated keys allowed run=None, new keys don't if there is no version.
         pass
 
-    CONTENT_CACHE.delete_many(locations, version=STATIC_CONTENT_VERSION)
+    disk_cache_keys = [_disk_cache_key(loc) for loc in locations]
+    for metadata in CONTENT_CACHE.get_many(disk_cache_keys, version=STATIC_CONTENT_VERSION).itervalues():
+        _remove_disk_cached_file(metadata['content_digest'])
+
+    CONTENT_CACHE.delete_many(locations + disk_cache_keys, version=STATIC_CONTENT_VERSION)
+
+
+# Content digests are hex md5 digests, and only files named like them are
+# taken to be in the disk cache.
+_CONTENT_DIGEST_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+# Number of seconds a process may take to write an asset to the disk cache
+# before another process may start writing it too.
+_DISK_CACHE_LOCK_TIMEOUT = 600
+
+# Metadata needed to rebuild a StaticContentStream from its file on disk.
+_DISK_CACHED_ATTRS = (
+    'name', 'content_type', 'last_modified_at', 'thumbnail_location', 'import_path', 'length', 'locked',
+    'content_digest',
+)
+
+
+class DiskCachedContent(StaticContentStream):
+    """
+    An asset whose data is streamed from its file in the disk cache.
+    """
+    def __init__(self, loc, path, **kwargs):
+        super(DiskCachedContent, self).__init__(loc, stream=open(path, 'rb'), **kwargs)
+        self.path = path
+
+    @property
+    def file(self):
+        """
+        The open file of the asset.
+        """
+        return self._stream
+
+
+def get_disk_cached_content(location):
+    """
+    Returns a DiskCachedContent of the given location if it is cached on
+    disk, or None.
+    """
+    if not _disk_cache_dir():
+        return None
+    metadata = CONTENT_CACHE.get(_disk_cache_key(location), version=STATIC_CONTENT_VERSION)
+    if metadata is None:
+        return None
+
+    path = _disk_cached_path(metadata['content_digest'])
+    try:
+        content = DiskCachedContent(location, path, **metadata)
+        # Mark the file as recently used, so that it is evicted last.
+        os.utime(path, None)
+    except (IOError, OSError):
+        # The file was evicted, or was cached by another server.
+        return None
+    return content
+
+
+def stream_data_to_disk_cache(content):
+    """
+    Yields the data of the given StaticContentStream, while also writing it
+    to the disk cache if possible.  The asset is only added to the disk cache
+    once all of its data has been streamed, and only one process at a time
+    writes it.  The data is streamed as usual if it can't be written.
+    """
+    digest = content.content_digest
+    if not _disk_cache_dir() or not digest or not _CONTENT_DIGEST_PATTERN.match(digest):
+        for chunk in content.stream_data():
+            yield chunk
+        return
+
+    path = _disk_cached_path(digest)
+    if os.path.exists(path):
+        # Another location's asset has the same data, so only the metadata is missing.
+        _set_disk_cached_metadata(content)
+    elif CONTENT_CACHE.add(_disk_cache_lock_key(digest), True, _DISK_CACHE_LOCK_TIMEOUT,
+                           version=STATIC_CONTENT_VERSION):
+        try:
+            for chunk in _stream_data_to_file(content, path):
+                yield chunk
+            return
+        finally:
+            CONTENT_CACHE.delete(_disk_cache_lock_key(digest), version=STATIC_CONTENT_VERSION)
+
+    # The asset isn't written here, as it is already cached or being cached by another process.
+    for chunk in content.stream_data():
+        yield chunk
+
+
+def _stream_data_to_file(content, path):
+    """
+    Yields the data of the given content, while writing it to a temporary
+    file.  Once all of the data is written, the file is renamed to the given
+    path, and the content's metadata is cached.  The data is still yielded if
+    it can't be written.
+    """
+    try:
+        temp_file, temp_path = _open_temp_file(path)
+    except (IOError, OSError):
+        log.exception(u"Unable to cache %s on disk at %s", unicode(content.location), path)
+        for chunk in content.stream_data():
+            yield chunk
+        return
+
+    writing = True
+    try:
+        for chunk in content.stream_data():
+            if writing:
+                try:
+                    temp_file.write(chunk)
+                except (IOError, OSError):
+                    log.exception(u"Unable to cache %s on disk at %s", unicode(content.location), path)
+                    writing = False
+            yield chunk
+
+        if writing:
+            try:
+                temp_file.close()
+                os.rename(temp_path, path)
+            except (IOError, OSError):
+                log.exception(u"Unable to cache %s on disk at %s", unicode(content.location), path)
+            else:
+                _set_disk_cached_metadata(content)
+                _evict_disk_cached_files()
+    finally:
+        # Also reached when the client disconnects before all of the data is streamed.
+        temp_file.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _set_disk_cached_metadata(content):
+    """
+    Caches the metadata of the given content, whose data is cached on disk.
+    """
+    metadata = {attr: getattr(content, attr) for attr in _DISK_CACHED_ATTRS}
+    CONTENT_CACHE.set(_disk_cache_key(content.location), metadata, version=STATIC_CONTENT_VERSION)
+
+
+def _disk_cache_dir():
+    """
+    Returns the directory of the disk cache, or None if it is disabled.
+    """
+    return getattr(settings, 'COURSE_ASSETS_DISK_CACHE_DIR', None)
+
+
+def _disk_cache_key(location):
+    """
+    Returns the key of the metadata of the disk cached content of the given
+    location, or of the given location already encoded as a cache key.
+    """
+    if not isinstance(location, str):
+        location = unicode(location).encode("utf-8")
+    return 'disk:' + location
+
+
+def _disk_cache_lock_key(digest):
+    """
+    Returns the key of the lock held by the process writing the content with
+    the given digest to the disk cache.
+    """
+    return 'disk-lock:' + digest
+
+
+def _disk_cached_path(digest):
+    """
+    Returns the path of the disk cached file of content with the given digest.
+    """
+    return os.path.join(_disk_cache_dir(), digest[:2], digest)
+
+
+def _open_temp_file(path):
+    """
+    Returns an open temporary file, and its path, in the directory of the
+    given path.  The data is written to the temporary file that is then
+    renamed, so that no other process ever reads a partially written file.
+    """
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        try:
+            os.makedirs(directory)
+        except OSError:
+            # Another process created it first.
+            if not os.path.isdir(directory):
+                raise
+
+    file_descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix='.')
+    return os.fdopen(file_descriptor, 'wb'), temp_path
+
+
+def _remove_disk_cached_file(digest):
+    """
+    Removes the disk cached file of content with the given digest, if any.
+    """
+    if not _disk_cache_dir() or not digest or not _CONTENT_DIGEST_PATTERN.match(digest):
+        return
+    try:
+        os.remove(_disk_cached_path(digest))
+    except OSError:
+        pass
+
+
+def _evict_disk_cached_files():
+    """
+    Removes the least recently used files of the disk cache until their
+    total size is at most settings.COURSE_ASSETS_DISK_CACHE_MAX_SIZE.
+    """
+    max_size = getattr(settings, 'COURSE_ASSETS_DISK_CACHE_MAX_SIZE', None)
+    if max_size is None:
+        return
+
+    cached_files = []
+    for directory, _, file_names in os.walk(_disk_cache_dir()):
+        for file_name in file_names:
+            if _CONTENT_DIGEST_PATTERN.match(file_name):
+                path = os.path.join(directory, file_name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                cached_files.append((stat.st_mtime, stat.st_size, path))
+
+    total_size = sum(size for _, size, _ in cached_files)
+    for _, size, path in sorted(cached_files):
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total_size -= size
@@ -2,25 +2,33 @@
 Middleware to serve assets.
 """
 
+import calendar
 import logging
 import datetime
+import re
 log = logging.getLogger(__name__)
 try:
     import newrelic.agent
 except ImportError:
     newrelic = None  # pylint: disable=invalid-name
+from uuid import uuid4
+
 from django.http import (
     HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
-    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect)
+    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect, StreamingHttpResponse,
+    FileResponse)
+from django.utils.http import parse_http_date_safe
 from student.models import CourseEnrollment
 
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
+from xmodule.contentstore.content import StaticContent, StaticContentStream, XASSET_LOCATION_TAG
 from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
 from openedx.core.djangoapps.header_control import force_header_for_response
-from .caching import get_cached_content, set_cached_content
+from .caching import (
+    DiskCachedContent, get_cached_content, get_disk_cached_content, set_cached_content, stream_data_to_disk_cache
+)
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 
@@ -31,6 +39,24 @@ from .models import CourseAssetCacheTtlConfig, CdnUserAgentsConfig
 
 HTTP_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
 
+# Matches each entity tag, or *, in an If-None-Match header.
+ENTITY_TAG_PATTERN = re.compile(r'\*|(?:W/)?"[^"]*"')
+
+# Assets at least this long aren't cached in the course_assets cache.
+MAX_CACHED_CONTENT_LENGTH = 1048576
+
+# Requests for more ranges than this are sent the full content.
+MAX_BYTE_RANGES = 20
+
+# The header of each part of a multipart/byteranges response.  Parts after
+# the first are separated from the data of the previous part by a CRLF.
+MULTIPART_PART_HEADER = (
+    '{separator}--{boundary}\r\n'
+    'Content-Type: {content_type}\r\n'
+    'Content-Range: {content_range}\r\n'
+    '\r\n'
+)
+
 
 class StaticContentServer(object):
     """
@@ -67,14 +93,14 @@ class StaticContentServer(object):
             except (InvalidLocationError, InvalidKeyError):
                 return HttpResponseBadRequest()
 
-            # Attempt to load the asset to make sure it exists, and grab the asset digest
-            # if we're able to load it.
-            actual_digest = None
+            # Attempt to load the asset's metadata to make sure it exists, and grab the
+            # asset digest if we're able to load it.  Everything up to sending the asset
+            # is decided from its metadata, without loading the asset itself.
             try:
-                content = self.load_asset_from_location(loc)
-                actual_digest = getattr(content, "content_digest", None)
+                metadata = self.load_asset_metadata_from_location(loc)
             except (ItemNotFoundError, NotFoundError):
                 return HttpResponseNotFound()
+            actual_digest = metadata.content_digest
 
             # If this was a versioned asset, and the digest doesn't match, redirect
             # them to the actual version.
@@ -99,20 +125,25 @@ class StaticContentServer(object):
                 newrelic.agent.add_custom_parameter('contentserver.from_cdn', is_from_cdn)
 
                 # Check if this content is locked or not.
-                locked = self.is_content_locked(content)
+                locked = self.is_content_locked(metadata)
                 newrelic.agent.add_custom_parameter('contentserver.locked', locked)
 
             # Check that user has access to the content.
-            if not self.is_user_authorized(request, content, loc):
+            if not self.is_user_authorized(request, metadata, loc):
                 return HttpResponseForbidden('Unauthorized')
 
             # Figure out if the client sent us a conditional request, and let them know
             # if this asset has changed since then.
-            last_modified_at_str = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
-            if 'HTTP_IF_MODIFIED_SINCE' in request.META:
-                if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
-                if if_modified_since == last_modified_at_str:
-                    return HttpResponseNotModified()
+            if self.is_not_modified(request, metadata):
+                response = HttpResponseNotModified()
+                self.set_caching_headers(metadata, response)
+                return response
+
+            try:
+                content = self.cache_asset(self.load_asset_from_location(loc))
+            except (ItemNotFoundError, NotFoundError):
+                # The asset was deleted since its metadata was loaded.
+                return HttpResponseNotFound()
 
             # *** File streaming within a byte range ***
             # If a Range is provided, parse Range attribute of the request
@@ -121,11 +152,7 @@ class StaticContentServer(object):
             # Response -> Content-Range attribute structure: "Content-Range: bytes first-last/totalLength"
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
             response = None
-            if request.META.get('HTTP_RANGE'):
-                # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if isinstance(content, StaticContent):
-                    content = AssetManager.find(loc, as_stream=True)
-
+            if request.META.get('HTTP_RANGE') and self.is_range_current(request, content):
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -138,36 +165,34 @@ class StaticContentServer(object):
                     if unit != 'bytes':
                         # Only accept ranges in bytes
                         log.warning(u"Unknown unit in Range header: %s for content: %s", header_value, unicode(loc))
-                    elif len(ranges) > 1:
-                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
-                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
-                        # But we send back the full content.
+                    elif len(ranges) > MAX_BYTE_RANGES:
+                        # Serving many ranges costs more than serving the full content.
                         log.warning(
-                            u"More than 1 ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            u"Too many ranges in Range header: %s for content: %s", header_value, unicode(loc)
                         )
                     else:
-                        first, last = ranges[0]
-
-                        if 0 <= first <= last < content.length:
-                            # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
-                            response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
-                                first=first, last=last, length=content.length
-                            )
-                            response['Content-Length'] = str(last - first + 1)
-                            response.status_code = 206  # Partial Content
-
-                            if newrelic:
-                                newrelic.agent.add_custom_parameter('contentserver.ranged', True)
-                        else:
+                        # Unsatisfiable ranges are ignored, unless none of the ranges are satisfiable.
+                        ranges = [(first, last) for first, last in ranges if 0 <= first <= last < content.length]
+                        if not ranges:
                             log.warning(
                                 u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
                             )
                             return HttpResponse(status=416)  # Requested Range Not Satisfiable
 
+                        response = self.partial_content_response(content, ranges)
+                        if newrelic:
+                            newrelic.agent.add_custom_parameter('contentserver.ranged', True)
+
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                if isinstance(content, DiskCachedContent):
+                    # Lets the server send the file itself, with sendfile where it can.
+                    response = FileResponse(content.file, content_type=content.content_type)
+                elif isinstance(content, StaticContentStream) and content.length is not None:
+                    # Too large for the cache, so it is cached on disk, if possible, as it is streamed.
+                    response = self.content_response(content, stream_data_to_disk_cache(content))
+                else:
+                    response = self.content_response(content, content.stream_data())
                 response['Content-Length'] = content.length
 
             if newrelic:
@@ -186,6 +211,55 @@ class StaticContentServer(object):
 
             return response
 
+    def content_response(self, content, data):
+        """
+        Returns a response with the given iterable of the content's data.
+
+        The data of content streamed from the contentstore is streamed to
+        the client as it is read, a chunk at a time, so that large assets
+        are never held in memory.  The stream is closed once the response
+        has been sent.
+        """
+        if isinstance(content, StaticContentStream):
+            return StreamingHttpResponse(_close_when_done(content, data), content_type=content.content_type)
+        return HttpResponse(data, content_type=content.content_type)
+
+    def partial_content_response(self, content, ranges):
+        """
+        Returns a 206 Partial Content response with the given satisfiable
+        list of (first, last) byte ranges of the content.
+
+        A single range is sent as the body of the response.  Multiple ranges
+        are sent as a multipart/byteranges message with a part per range.
+        http://www.w3.org/Protocols/rfc2616/rfc2616-sec19.html#sec19.2
+        """
+        if len(ranges) == 1:
+            first, last = ranges[0]
+            response = self.content_response(content, content.stream_data_in_range(first, last))
+            response['Content-Range'] = _content_range(first, last, content.length)
+            response['Content-Length'] = str(last - first + 1)
+        else:
+            boundary = uuid4().hex
+            part_headers = [
+                MULTIPART_PART_HEADER.format(
+                    separator='\r\n' if index else '',
+                    boundary=boundary,
+                    content_type=content.content_type,
+                    content_range=_content_range(first, last, content.length),
+                )
+                for index, (first, last) in enumerate(ranges)
+            ]
+            closing = '\r\n--{boundary}--\r\n'.format(boundary=boundary)
+            response = self.content_response(content, _multipart_byteranges(content, ranges, part_headers, closing))
+            response['Content-Type'] = 'multipart/byteranges; boundary={boundary}'.format(boundary=boundary)
+            response['Content-Length'] = str(
+                sum(len(part_header) for part_header in part_headers) +
+                sum(last - first + 1 for first, last in ranges) +
+                len(closing)
+            )
+        response.status_code = 206  # Partial Content
+        return response
+
     def set_caching_headers(self, content, response):
         """
         Sets caching headers based on whether or not the asset is locked.
@@ -212,12 +286,58 @@ class StaticContentServer(object):
             response['Cache-Control'] = "private, no-cache, no-store"
 
         response['Last-Modified'] = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
+        etag = get_etag(content)
+        if etag is not None:
+            response['ETag'] = etag
 
         # Force the Vary header to only vary responses on Origin, so that XHR and browser requests get cached
         # separately and don't screw over one another. i.e. a browser request that doesn't send Origin, and
         # caches a version of the response without CORS headers, in turn breaking XHR requests.
         force_header_for_response(response, 'Vary', 'Origin')
 
+    def is_not_modified(self, request, content):
+        """
+        Determines whether the given request is conditional on the asset
+        having changed, and it hasn't.
+
+        If-None-Match takes precedence over If-Modified-Since, which is
+        ignored if both are given.
+        https://tools.ietf.org/html/rfc7232#section-6
+        """
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            etags = ENTITY_TAG_PATTERN.findall(if_none_match)
+            if '*' in etags:
+                return True
+            # If-None-Match uses the weak comparison function.
+            etag = get_etag(content)
+            return etag is not None and etag in [_strip_weakness(value) for value in etags]
+
+        if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        if if_modified_since is not None:
+            return _last_modified_timestamp(content) <= if_modified_since
+
+        return False
+
+    def is_range_current(self, request, content):
+        """
+        Determines whether the Range of the given request should be served,
+        i.e. whether it either has no If-Range, or its If-Range matches the
+        current version of the asset.  Otherwise the full content is sent.
+        https://tools.ietf.org/html/rfc7233#section-3.2
+        """
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if if_range is None:
+            return True
+
+        if_range = if_range.strip()
+        if if_range.startswith(('"', 'W/')):
+            # If-Range uses the strong comparison function, so weak entity tags never match.
+            return if_range == get_etag(content)
+
+        if_range_date = parse_http_date_safe(if_range)
+        return if_range_date is not None and if_range_date == _last_modified_timestamp(content)
+
     @staticmethod
     def is_cdn_request(request):
         """
@@ -265,27 +385,49 @@ class StaticContentServer(object):
 
         return True
 
+    def load_asset_metadata_from_location(self, location):
+        """
+        Loads the StaticContentMetadata of an asset based on its location.
+        """
+        return AssetManager.find_metadata(location)
+
     def load_asset_from_location(self, location):
         """
         Loads an asset based on its location, either retrieving it from a cache
-        or loading it directly from the contentstore.
+        or loading it directly from the contentstore.  An asset loaded from the
+        contentstore isn't cached until it's passed to cache_asset.
         """
 
-        # See if we can load this item from cache.
+        # See if we can load this item from cache, or from the disk cache.
         content = get_cached_content(location)
         if content is None:
-            # Not in cache, so just try and load it from the asset manager.
+            content = get_disk_cached_content(location)
+        if content is None:
+            # Not in cache, so just try and load it from the asset manager.  Its data is
+            # streamed, so nothing more than its metadata is read until it is needed.
             try:
                 content = AssetManager.find(location, as_stream=True)
             except (ItemNotFoundError, NotFoundError):
                 raise
 
-            # Now that we fetched it, let's go ahead and try to cache it. We cap this at 1MB
-            # because it's the default for memcached and also we don't want to do too much
-            # buffering in memory when we're serving an actual request.
-            if content.length is not None and content.length < 1048576:
-                content = content.copy_to_in_mem()
-                set_cached_content(content)
+        return content
+
+    def cache_asset(self, content):
+        """
+        Caches the given asset, if it was just loaded from the contentstore
+        and is small enough, and returns the asset to serve.  Larger assets
+        are cached on disk as they are streamed to the client.
+        """
+        if not isinstance(content, StaticContentStream) or isinstance(content, DiskCachedContent):
+            # Already cached.
+            return content
+
+        # Now that we fetched it, let's go ahead and try to cache it. We cap this at 1MB
+        # because it's the default for memcached and also we don't want to do too much
+        # buffering in memory when we're serving an actual request.
+        if content.length is not None and content.length < MAX_CACHED_CONTENT_LENGTH:
+            content = content.copy_to_in_mem()
+            set_cached_content(content)
 
         return content
 
@@ -331,3 +473,60 @@ def parse_range_header(header_value, content_length):
         raise ValueError('Invalid syntax')
 
     return unit, ranges
+
+
+def get_etag(content):
+    """
+    Returns the strong entity tag of the given asset, its quoted content
+    digest, or None if it has no content digest.
+    """
+    digest = getattr(content, 'content_digest', None)
+    if not digest:
+        return None
+    return '"{digest}"'.format(digest=digest)
+
+
+def _strip_weakness(etag):
+    """
+    Returns the given entity tag without any weak indicator.
+    """
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def _last_modified_timestamp(content):
+    """
+    Returns the time the given asset was last modified, in whole seconds
+    since the epoch, as sent in its Last-Modified header.
+    """
+    return calendar.timegm(content.last_modified_at.utctimetuple())
+
+
+def _content_range(first, last, length):
+    """
+    Returns the Content-Range value of the given byte range of content of the given length.
+    """
+    return 'bytes {first}-{last}/{length}'.format(first=first, last=last, length=length)
+
+
+def _multipart_byteranges(content, ranges, part_headers, closing):
+    """
+    Yields the body of a multipart/byteranges message of the given byte ranges
+    of the content, each preceded by its part header, and followed by closing.
+    """
+    for (first, last), part_header in zip(ranges, part_headers):
+        yield part_header
+        for chunk in content.stream_data_in_range(first, last):
+            yield chunk
+    yield closing
+
+
+def _close_when_done(content, data):
+    """
+    Yields the given data of the content stream, and closes the stream once
+    all of it has been yielded, or the response is closed before then.
+    """
+    try:
+        for chunk in data:
+            yield chunk
+    finally:
+        content.close()
@@ -0,0 +1,145 @@
+"""
+Tests for caching course assets on disk.
+"""
+import os
+import shutil
+import tempfile
+from StringIO import StringIO
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+from django.test.utils import override_settings
+from mock import patch
+from opaque_keys.edx.locator import CourseLocator
+
+from xmodule.contentstore.content import StaticContentStream
+
+from .. import caching
+
+
+class DiskCachedContentTest(TestCase):
+    """
+    Tests for the disk cache of course assets.
+    """
+    DATA = 'x' * 5000
+
+    def setUp(self):
+        super(DiskCachedContentTest, self).setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        settings_override = override_settings(
+            COURSE_ASSETS_DISK_CACHE_DIR=self.cache_dir,
+            COURSE_ASSETS_DISK_CACHE_MAX_SIZE=None,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # The course_assets cache is a dummy cache in tests.
+        cache_patcher = patch.object(caching, 'CONTENT_CACHE', LocMemCache('course_assets', {}))
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+        self.course_key = CourseLocator('org', 'course', 'run')
+
+    def make_content(self, name='video.mp4', data=DATA, digest='0123456789abcdef0123456789abcdef'):
+        """
+        Returns a StaticContentStream of the given data.
+        """
+        return StaticContentStream(
+            self.course_key.make_asset_key('asset', name), name, 'video/mp4', StringIO(data),
+            length=len(data), locked=True, content_digest=digest,
+        )
+
+    def cache_on_disk(self, content):
+        """
+        Streams all of the data of the given content to the disk cache, and
+        returns it.
+        """
+        return ''.join(caching.stream_data_to_disk_cache(content))
+
+    def test_round_trip(self):
+        content = self.make_content()
+        data = caching.stream_data_to_disk_cache(content)
+        first_chunk = next(data)
+        # The asset is only cached once all of its data is streamed.
+        self.assertIsNone(caching.get_disk_cached_content(content.location))
+        self.assertEqual(first_chunk + ''.join(data), self.DATA)
+
+        disk_cached_content = caching.get_disk_cached_content(content.location)
+        self.assertIsInstance(disk_cached_content, caching.DiskCachedContent)
+        self.assertEqual(disk_cached_content.path, os.path.join(self.cache_dir, '01', content.content_digest))
+        self.assertEqual(''.join(disk_cached_content.stream_data_in_range(10, 19)), self.DATA[10:20])
+        for attr in ('name', 'content_type', 'length', 'locked', 'content_digest'):
+            self.assertEqual(getattr(disk_cached_content, attr), getattr(content, attr))
+        disk_cached_content.close()
+
+    def test_not_cached(self):
+        self.assertIsNone(caching.get_disk_cached_content(self.make_content().location))
+
+    def test_disabled(self):
+        content = self.make_content()
+        with override_settings(COURSE_ASSETS_DISK_CACHE_DIR=None):
+            self.assertEqual(self.cache_on_disk(content), self.DATA)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_no_digest(self):
+        content = self.make_content(digest=None)
+        self.assertEqual(self.cache_on_disk(content), self.DATA)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_write_failure(self):
+        content = self.make_content()
+        with patch('os.rename', side_effect=OSError):
+            self.assertEqual(self.cache_on_disk(content), self.DATA)
+        self.assertEqual(os.listdir(os.path.join(self.cache_dir, '01')), [])
+        self.assertIsNone(caching.get_disk_cached_content(content.location))
+
+    def test_stream_closed(self):
+        content = self.make_content()
+        data = caching.stream_data_to_disk_cache(content)
+        next(data)
+        # As when the client disconnects before all of the data is streamed.
+        data.close()
+        self.assertEqual(os.listdir(os.path.join(self.cache_dir, '01')), [])
+        self.assertIsNone(caching.get_disk_cached_content(content.location))
+
+        self.assertEqual(self.cache_on_disk(self.make_content()), self.DATA)
+        caching.get_disk_cached_content(content.location).close()
+
+    def test_cached_by_one_process(self):
+        content = self.make_content()
+        data = caching.stream_data_to_disk_cache(content)
+        next(data)
+        # The asset is streamed, but not written, while it is written elsewhere.
+        with patch('tempfile.mkstemp') as mock_mkstemp:
+            self.assertEqual(self.cache_on_disk(self.make_content()), self.DATA)
+        self.assertFalse(mock_mkstemp.called)
+
+        list(data)
+        caching.get_disk_cached_content(content.location).close()
+
+    def test_evicted_file(self):
+        content = self.make_content()
+        self.cache_on_disk(content)
+        os.remove(os.path.join(self.cache_dir, '01', content.content_digest))
+        self.assertIsNone(caching.get_disk_cached_content(content.location))
+
+    def test_del_cached_content(self):
+        content = self.make_content()
+        self.cache_on_disk(content)
+        caching.del_cached_content(content.location)
+        self.assertIsNone(caching.get_disk_cached_content(content.location))
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, '01', content.content_digest)))
+
+    def test_least_recently_used_evicted(self):
+        digests = ['{}'.format(index) * 32 for index in range(3)]
+        with override_settings(COURSE_ASSETS_DISK_CACHE_MAX_SIZE=2 * len(self.DATA)):
+            for index, digest in enumerate(digests):
+                self.cache_on_disk(self.make_content(name=digest, digest=digest))
+                # Make the files' last use times distinct.
+                os.utime(os.path.join(self.cache_dir, digest[:2], digest), (index, index))
+                if index == 1:
+                    # Using the first file makes the second the least recently used.
+                    caching.get_disk_cached_content(self.make_content(name=digests[0]).location).close()
+
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir, '00', digests[0])))
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, '11', digests[1])))
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir, '22', digests[2])))
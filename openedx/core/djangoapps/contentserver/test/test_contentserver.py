@@ -6,10 +6,15 @@ import copy
 import datetime
 import ddt
 import logging
+import os
+import shutil
+import tempfile
 import unittest
 from uuid import uuid4
 
 from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import FileResponse
 from django.test import RequestFactory
 from django.test.client import Client
 from django.test.utils import override_settings
@@ -27,6 +32,7 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory, AdminFactory
 
+from ..caching import del_cached_content
 from ..middleware import parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
 
 log = logging.getLogger(__name__)
@@ -100,6 +106,7 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
         cls.url_unlocked_versioned = get_versioned_asset_url(cls.url_unlocked)
         cls.url_unlocked_versioned_old_style = get_old_style_versioned_asset_url(cls.url_unlocked)
         cls.length_unlocked = cls.contentstore.get_attr(cls.unlocked_asset, 'length')
+        cls.etag_unlocked = '"{}"'.format(cls.contentstore.find(cls.unlocked_asset).content_digest)
 
     def setUp(self):
         """
@@ -187,6 +194,15 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
         resp = self.client.get(self.url_locked)
         self.assertEqual(resp.status_code, 403)
 
+    def test_locked_asset_not_loaded(self):
+        """
+        Test that requests for locked assets are refused without loading the asset.
+        """
+        with patch.object(StaticContentServer, 'load_asset_from_location') as mock_load_asset:
+            resp = self.client.get(self.url_locked)
+        self.assertEqual(resp.status_code, 403)
+        self.assertFalse(mock_load_asset.called)
+
     def test_locked_asset_registered(self):
         """
         Test that locked assets behave appropriately in case user is logged in
@@ -240,19 +256,90 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
             first=first_byte, last=last_byte, length=self.length_unlocked))
         self.assertEqual(resp['Content-Length'], str(last_byte - first_byte + 1))
 
+    def assert_multipart_byteranges(self, resp, ranges, content):
+        """
+        Asserts that the given response is a multipart/byteranges message
+        with a part for each of the given ranges of the content.
+        """
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertNotIn('Content-Range', resp)
+        content_type, boundary = resp['Content-Type'].split('; boundary=')
+        self.assertEqual(content_type, 'multipart/byteranges')
+
+        body = ''.join(resp.streaming_content) if resp.streaming else resp.content
+        self.assertEqual(resp['Content-Length'], str(len(body)))
+        expected_parts = [
+            'Content-Type: text/plain\r\nContent-Range: bytes {first}-{last}/{length}\r\n\r\n{data}'.format(
+                first=first, last=last, length=self.length_unlocked, data=content[first:last + 1],
+            )
+            for first, last in ranges
+        ]
+        self.assertEqual(body, ''.join(
+            '{separator}--{boundary}\r\n{part}'.format(separator='\r\n' if index else '', boundary=boundary, part=part)
+            for index, part in enumerate(expected_parts)
+        ) + '\r\n--{boundary}--\r\n'.format(boundary=boundary))
+
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request outputs a multipart message with a part per range.
         """
         first_byte = self.length_unlocked / 4
         last_byte = self.length_unlocked / 2
         resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}, -100'.format(
             first=first_byte, last=last_byte))
 
+        content = self.contentstore.find(self.unlocked_asset).data
+        self.assert_multipart_byteranges(
+            resp, [(first_byte, last_byte), (self.length_unlocked - 100, self.length_unlocked - 1)], content,
+        )
+
+    def test_range_request_multiple_ranges_streamed(self):
+        """
+        Test that multiple ranges of content that isn't cached are streamed.
+        """
+        with patch('openedx.core.djangoapps.contentserver.middleware.MAX_CACHED_CONTENT_LENGTH', 0):
+            resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9, 20-29')
+
+        self.assertTrue(resp.streaming)
+        content = self.contentstore.find(self.unlocked_asset).data
+        self.assert_multipart_byteranges(resp, [(0, 9), (20, 29)], content)
+
+    def test_range_request_multiple_ranges_unsatisfiable(self):
+        """
+        Test that unsatisfiable ranges among multiple ranges are ignored.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9, {first}-'.format(
+            first=self.length_unlocked))
+
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertEqual(resp['Content-Range'], 'bytes 0-9/{length}'.format(length=self.length_unlocked))
+        self.assertEqual(resp['Content-Length'], '10')
+
+    def test_range_request_too_many_ranges(self):
+        """
+        Test that a request for too many ranges outputs the full content.
+        """
+        with patch('openedx.core.djangoapps.contentserver.middleware.MAX_BYTE_RANGES', 1):
+            resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9, 20-29')
+
         self.assertEqual(resp.status_code, 200)
         self.assertNotIn('Content-Range', resp)
         self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
 
+    def test_full_content_streamed(self):
+        """
+        Test that content that isn't cached is streamed, and its stream closed once sent.
+        """
+        content = AssetManager.find(self.unlocked_asset, as_stream=True)
+        with patch.object(StaticContentServer, 'load_asset_from_location', return_value=content):
+            with patch('openedx.core.djangoapps.contentserver.middleware.MAX_CACHED_CONTENT_LENGTH', 0), \
+                    patch.object(content, 'close', wraps=content.close) as mock_close:
+                resp = self.client.get(self.url_unlocked)
+                self.assertTrue(resp.streaming)
+                self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
+                self.assertEqual(len(''.join(resp.streaming_content)), self.length_unlocked)
+                self.assertTrue(mock_close.called)
+
     @ddt.data(
         'bytes 0-',
         'bits=0-',
@@ -285,6 +372,123 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
             first=(self.length_unlocked), last=(self.length_unlocked)))
         self.assertEqual(resp.status_code, 416)
 
+    def test_disk_cached_asset(self):
+        """
+        Test that assets too large for the cache are cached on disk as they are
+        streamed from the contentstore, and then served from disk.
+        """
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.addCleanup(del_cached_content, self.unlocked_asset)
+        content = self.contentstore.find(self.unlocked_asset)
+        cached_path = os.path.join(cache_dir, content.content_digest[:2], content.content_digest)
+        # The course_assets cache, which holds the metadata of assets cached on disk, is a dummy cache in tests.
+        cache_patcher = patch('openedx.core.djangoapps.contentserver.caching.CONTENT_CACHE', LocMemCache('assets', {}))
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+
+        with override_settings(COURSE_ASSETS_DISK_CACHE_DIR=cache_dir):
+            with patch('openedx.core.djangoapps.contentserver.middleware.MAX_CACHED_CONTENT_LENGTH', 0):
+                # Range requests are streamed from the contentstore without being cached.
+                resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9')
+                self.assertEqual(resp.status_code, 206)
+                self.assertEqual(''.join(resp.streaming_content), content.data[:10])
+                resp.close()
+                self.assertFalse(os.path.exists(cached_path))
+
+                resp = self.client.get(self.url_unlocked)
+                self.assertEqual(resp.status_code, 200)
+                self.assertNotIsInstance(resp, FileResponse)
+                self.assertEqual(''.join(resp.streaming_content), content.data)
+                resp.close()
+                self.assertTrue(os.path.exists(cached_path))
+
+                resp = self.client.get(self.url_unlocked)
+                self.assertEqual(resp.status_code, 200)
+                self.assertIsInstance(resp, FileResponse)
+                self.assertEqual(''.join(resp.streaming_content), content.data)
+                resp.close()
+
+                resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9')
+                self.assertEqual(resp.status_code, 206)
+                self.assertEqual(''.join(resp.streaming_content), content.data[:10])
+                resp.close()
+
+    def assert_not_modified(self, resp):
+        """
+        Asserts that the given response is a 304 Not Modified with the asset's validators.
+        """
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], self.etag_unlocked)
+        self.assertIn('Last-Modified', resp)
+
+    def test_etag(self):
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['ETag'], self.etag_unlocked)
+
+    @ddt.data(
+        '"{etag}"',
+        'W/"{etag}"',
+        '"other", "{etag}"',
+        '*',
+    )
+    def test_if_none_match(self, header_value):
+        digest = self.contentstore.find(self.unlocked_asset).content_digest
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=header_value.format(etag=digest))
+        self.assert_not_modified(resp)
+
+    def test_if_none_match_changed(self):
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"{}"'.format(FAKE_MD5_HASH))
+        self.assertEqual(resp.status_code, 200)
+
+    def test_if_none_match_takes_precedence(self):
+        last_modified = self.client.get(self.url_unlocked)['Last-Modified']
+        resp = self.client.get(
+            self.url_unlocked,
+            HTTP_IF_NONE_MATCH='"{}"'.format(FAKE_MD5_HASH),
+            HTTP_IF_MODIFIED_SINCE=last_modified,
+        )
+        self.assertEqual(resp.status_code, 200)
+
+    @ddt.data(
+        (datetime.timedelta(0), 304),
+        (datetime.timedelta(days=1), 304),
+        (datetime.timedelta(days=-1), 200),
+    )
+    @ddt.unpack
+    def test_if_modified_since(self, offset, status_code):
+        last_modified = self.client.get(self.url_unlocked)['Last-Modified']
+        if_modified_since = datetime.datetime.strptime(last_modified, HTTP_DATE_FORMAT) + offset
+        resp = self.client.get(self.url_unlocked, HTTP_IF_MODIFIED_SINCE=if_modified_since.strftime(HTTP_DATE_FORMAT))
+        self.assertEqual(resp.status_code, status_code)
+
+    def test_not_modified_without_reading_data(self):
+        with patch.object(StaticContentServer, 'cache_asset') as mock_cache_asset:
+            resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=self.etag_unlocked)
+        self.assert_not_modified(resp)
+        self.assertFalse(mock_cache_asset.called)
+
+    def test_if_range(self):
+        last_modified = self.client.get(self.url_unlocked)['Last-Modified']
+        for if_range in (self.etag_unlocked, last_modified):
+            resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=if_range)
+            self.assertEqual(resp.status_code, 206)
+            self.assertEqual(resp['Content-Length'], '10')
+
+    @ddt.data(
+        '"{}"'.format(FAKE_MD5_HASH),
+        'W/"{etag}"',
+        'Thu, 01 Jan 1970 00:00:00 GMT',
+        'not a date',
+    )
+    def test_if_range_changed(self, if_range):
+        digest = self.contentstore.find(self.unlocked_asset).content_digest
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=if_range.format(etag=digest))
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn('Content-Range', resp)
+        self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
+
     def test_vary_header_sent(self):
         """
         Tests that we're properly setting the Vary header to ensure browser requests don't get